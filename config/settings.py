@@ -42,6 +42,7 @@
     "feed",
     "quiz",
     "moderation",
+    "exports",
     "searchx",
     "community",
     "django.contrib.auth",
@@ -221,9 +222,93 @@
 # Do NOT hardcode API keys here. Set `OPENAI_API_KEY` in your environment or in a .env file.
 # TESSERACT_CMD can be overridden by env; default to 'tesseract' which works if tesseract is on PATH.
 
+# HuggingFace model registry (one copy per worker, see searchx/model_registry.py)
+AI_MODEL_MAX_LOADED = int(os.environ.get('AI_MODEL_MAX_LOADED', '4'))
+AI_MODEL_IDLE_TIMEOUT = int(os.environ.get('AI_MODEL_IDLE_TIMEOUT', '3600'))  # seconds, 0 = never
+AI_MODEL_MEMORY_BUDGET_MB = int(os.environ.get('AI_MODEL_MEMORY_BUDGET_MB', '0'))  # 0 = unlimited
+# Models preloaded at worker boot, e.g. "encoder:sentence-transformers/all-MiniLM-L6-v2,summarization:facebook/bart-large-cnn"
+AI_MODEL_WARMUP = [s.strip() for s in os.environ.get('AI_MODEL_WARMUP', '').split(',') if s.strip()]
+
 # Semantic Search Config
 EMBEDDING_MODEL = os.environ.get('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
 VECTOR_SIMILARITY_THRESHOLD = float(os.environ.get('VECTOR_SIMILARITY_THRESHOLD', '0.7'))
+# Persistent concept embedding index (memory-mapped .npy files, one folder per model)
+SEARCHX_INDEX_DIR = Path(os.environ.get('SEARCHX_INDEX_DIR', BASE_DIR / 'var' / 'searchx'))
+# Models semantic-emb may use (the first is the default); any other model falls back to it
+SEARCHX_EMBEDDING_MODELS = [s.strip() for s in os.environ.get('SEARCHX_EMBEDDING_MODELS', 'sentence-transformers/all-MiniLM-L6-v2').split(',') if s.strip()]
+# Half-life of behavior signals in the recommendation profiles
+SEARCHX_BEHAVIOR_HALF_LIFE_DAYS = float(os.environ.get('SEARCHX_BEHAVIOR_HALF_LIFE_DAYS', '14'))
+# Interaction beacons are buffered in memory and written in batches (searchx/ingestion.py)
+SEARCHX_INGEST_ASYNC = os.environ.get('SEARCHX_INGEST_ASYNC', 'True').lower() in ['true', '1', 'yes']
+SEARCHX_INGEST_QUEUE_SIZE = int(os.environ.get('SEARCHX_INGEST_QUEUE_SIZE', '10000'))
+SEARCHX_INGEST_BATCH_SIZE = int(os.environ.get('SEARCHX_INGEST_BATCH_SIZE', '200'))
+SEARCHX_INGEST_FLUSH_SECONDS = float(os.environ.get('SEARCHX_INGEST_FLUSH_SECONDS', '2'))
+
+# Feed
+# Statistiques du bandeau de feed_list mises en cache (secondes)
+FEED_STATS_TTL = int(os.environ.get('FEED_STATS_TTL', '60'))
+# 'text' (index texte MongoDB, tri par pertinence) ou 'regex' (motif échappé)
+FEED_SEARCH_MODE = os.environ.get('FEED_SEARCH_MODE', 'text')
+# Cache des auteurs résolus par lot (secondes)
+FEED_AUTHOR_CACHE_TTL = int(os.environ.get('FEED_AUTHOR_CACHE_TTL', '300'))
+# Génération vidéo TikTok en arrière-plan (feed/jobs.py)
+# Threads lancés dans chaque processus web ; 0 si `manage.py run_video_worker` tourne à part
+FEED_VIDEO_INLINE_WORKERS = int(os.environ.get('FEED_VIDEO_INLINE_WORKERS', '1'))
+FEED_VIDEO_POLL_SECONDS = float(os.environ.get('FEED_VIDEO_POLL_SECONDS', '2'))
+FEED_VIDEO_JOB_TIMEOUT = int(os.environ.get('FEED_VIDEO_JOB_TIMEOUT', '900'))
+FEED_VIDEO_JOB_MAX_ATTEMPTS = int(os.environ.get('FEED_VIDEO_JOB_MAX_ATTEMPTS', '3'))
+SHOTSTACK_API_KEY = os.environ.get('SHOTSTACK_API_KEY', '')
+SHOTSTACK_BASE_URL = os.environ.get('SHOTSTACK_BASE_URL', 'https://api.shotstack.io/edit/v1')
+SHOTSTACK_POLL_SECONDS = float(os.environ.get('SHOTSTACK_POLL_SECONDS', '10'))
+SHOTSTACK_MAX_POLLS = int(os.environ.get('SHOTSTACK_MAX_POLLS', '30'))
+VIDEO_UPLOAD_URL = os.environ.get('VIDEO_UPLOAD_URL', 'https://litterbox.catbox.moe/resources/internals/api.php')
+# Moteur de rendu vidéo : 'shotstack' (API cloud) ou 'local' (ffmpeg), voir feed/render_backends.py
+VIDEO_RENDER_BACKEND = os.environ.get('VIDEO_RENDER_BACKEND', 'shotstack')
+VIDEO_HTTP_TIMEOUT = float(os.environ.get('VIDEO_HTTP_TIMEOUT', '60'))
+# Vide : ffmpeg du PATH (ou d'imageio-ffmpeg s'il est installé)
+VIDEO_FFMPEG_BINARY = os.environ.get('VIDEO_FFMPEG_BINARY', '')
+VIDEO_LOCAL_FPS = int(os.environ.get('VIDEO_LOCAL_FPS', '25'))
+VIDEO_LOCAL_PRESET = os.environ.get('VIDEO_LOCAL_PRESET', 'veryfast')
+# Cache disque des scripts / MP3 / sous-titres générés (feed/artifact_cache.py)
+FEED_ARTIFACT_CACHE_DIR = Path(os.environ.get('FEED_ARTIFACT_CACHE_DIR', BASE_DIR / 'var' / 'feed_artifacts'))
+FEED_ARTIFACT_CACHE_MAX_MB = int(os.environ.get('FEED_ARTIFACT_CACHE_MAX_MB', '500'))
+# Tableau de bord IA lu depuis l'agrégat quotidien (construire avec `manage.py rollup_feed_stats`)
+FEED_DASHBOARD_ROLLUP = os.environ.get('FEED_DASHBOARD_ROLLUP', 'False').lower() in ['true', '1', 'yes']
+
+# Exports PDF du feed et de la modération (exports/jobs.py)
+# Au-delà de EXPORT_SYNC_MAX_ROWS lignes, l'export part en arrière-plan
+EXPORT_SYNC_MAX_ROWS = int(os.environ.get('EXPORT_SYNC_MAX_ROWS', '300'))
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', '100'))
+EXPORT_WORKERS = int(os.environ.get('EXPORT_WORKERS', '2'))
+EXPORT_DIR = Path(os.environ.get('EXPORT_DIR', BASE_DIR / 'var' / 'exports'))
+# Réutilisation d'un export identique récent (secondes) et conservation des fichiers (heures)
+EXPORT_CACHE_TTL = int(os.environ.get('EXPORT_CACHE_TTL', '900'))
+EXPORT_RETENTION_HOURS = int(os.environ.get('EXPORT_RETENTION_HOURS', '24'))
+EXPORT_JOB_TIMEOUT = int(os.environ.get('EXPORT_JOB_TIMEOUT', '1800'))
+
+# Analyses IA des objectifs en arrière-plan (objectif/analysis.py)
+GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', '')
+GEMINI_ANALYSIS_MODEL = os.environ.get('GEMINI_ANALYSIS_MODEL', 'gemini-2.5-flash')
+# Par processus (chaque worker gunicorn a son propre budget) : appels simultanés
+# et appels par minute (quota de l'API)
+GEMINI_MAX_CONCURRENCY = int(os.environ.get('GEMINI_MAX_CONCURRENCY', '2'))
+GEMINI_RATE_PER_MINUTE = int(os.environ.get('GEMINI_RATE_PER_MINUTE', '10'))
+GEMINI_TIMEOUT = float(os.environ.get('GEMINI_TIMEOUT', '30'))
+# Reprises des erreurs 429/5xx : délai initial doublé à chaque essai
+GEMINI_MAX_RETRIES = int(os.environ.get('GEMINI_MAX_RETRIES', '3'))
+GEMINI_BACKOFF_SECONDS = float(os.environ.get('GEMINI_BACKOFF_SECONDS', '2'))
+GEMINI_ANALYSIS_JOB_TIMEOUT = int(os.environ.get('GEMINI_ANALYSIS_JOB_TIMEOUT', '300'))
+
+# Bilans PDF des objectifs (objectif/bilans.py) : cache disque et export zip groupé
+BILAN_CACHE_DIR = Path(os.environ.get('BILAN_CACHE_DIR', BASE_DIR / 'var' / 'bilans'))
+# Processus de rendu de l'export groupé et nombre maximal d'objectifs par archive
+BILAN_PROCESSES = int(os.environ.get('BILAN_PROCESSES', '2'))
+# En dessous de ce nombre de bilans à construire, rendu dans le processus web
+BILAN_POOL_MIN_PENDING = int(os.environ.get('BILAN_POOL_MIN_PENDING', '50'))
+BILAN_EXPORT_MAX_OBJECTIVES = int(os.environ.get('BILAN_EXPORT_MAX_OBJECTIVES', '500'))
+
+# Durée de cache (privé, navigateur seulement) des QR codes des objectifs (objectif/qr.py), l'URL encodée ne changeant pas
+QR_CACHE_MAX_AGE = int(os.environ.get('QR_CACHE_MAX_AGE', str(365 * 24 * 3600)))
 
 
 # Your stuff...
@@ -25,6 +25,8 @@
     path("dashboard/", include("apps.dashboards.urls")),
     path("objectives/", include(("objectif.urls", "objectifs"), namespace="objectifs")),
     path("moderation/", include("moderation.urls", namespace="moderation")),
+    # Suivi et téléchargement des exports PDF en arrière-plan
+    path("exports/", include("exports.urls", namespace="exports")),
     # layouts urls
     path("", include("apps.layouts.urls")),
     path('feed/', include('feed.urls', namespace='feed')),  # ✅
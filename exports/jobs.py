@@ -0,0 +1,216 @@
+"""Exports PDF à mémoire bornée, en arrière-plan quand ils sont volumineux.
+
+- Chaque exporteur (``EXPORTERS`` : ``feed.exports.FeedExport``,
+  ``moderation.exports.ReportsExport``) lit ses éléments depuis un curseur
+  MongoDB et construit un seul document reportlab par tranches de
+  ``EXPORT_CHUNK_SIZE`` lignes (``LazyFlowables``). Il expose
+  ``filename_prefix``, ``count(params)`` et ``write(params, dest)``.
+- Jusqu'à ``EXPORT_SYNC_MAX_ROWS`` lignes, le PDF est écrit dans un fichier
+  temporaire pendant la requête puis envoyé par blocs (``FileResponse``).
+- Au-delà, une ``ExportJob`` est créée et exécutée en arrière-plan
+  (``EXPORT_WORKERS`` threads par processus) ; la page de suivi
+  (``exports:status``) affiche le lien de téléchargement une fois le
+  fichier prêt.
+- Un export identique (même type, mêmes filtres) terminé depuis moins de
+  ``EXPORT_CACHE_TTL`` secondes est servi tel quel, et une demande identique
+  déjà en cours est rejointe au lieu d'être relancée.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse
+from django.shortcuts import redirect
+from django.utils.module_loading import import_string
+from mongoengine.errors import NotUniqueError
+
+from web_project.background import JobExecutor, finish_job, live_job, start_job
+
+from .models import ExportJob
+
+EXPORTERS = {
+    'feed': 'feed.exports.FeedExport',
+    'moderation_reports': 'moderation.exports.ReportsExport',
+}
+
+
+class ExportError(Exception):
+    pass
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def chunk_size():
+    return max(1, _setting('EXPORT_CHUNK_SIZE', 100))
+
+
+def chunked(iterable, size):
+    """Découpe ``iterable`` en listes de ``size`` éléments au plus, sans tout charger."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class LazyFlowables(list):
+    """Liste de flowables reportlab remplie tranche par tranche pendant ``doc.build``.
+
+    ``BaseDocTemplate.build`` consomme la liste par le début tant que
+    ``len()`` est non nul : la tranche suivante n'est produite que lorsque
+    la précédente a été mise en page.
+    """
+
+    def __init__(self, chunks):
+        super().__init__()
+        self._chunks = iter(chunks)
+
+    def __len__(self):
+        if not super().__len__():
+            self.extend(next(self._chunks, ()))
+        return super().__len__()
+
+
+def get_exporter(kind):
+    try:
+        return import_string(EXPORTERS[kind])()
+    except KeyError:
+        raise ExportError(f"Type d'export inconnu: {kind}")
+
+
+def export_key(kind, params):
+    payload = json.dumps([kind, params], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def export_filename(exporter, when=None):
+    return f"{exporter.filename_prefix}_{(when or datetime.now()).strftime('%Y%m%d_%H%M%S')}.pdf"
+
+
+# ========== TÂCHES EN ARRIÈRE-PLAN ==========
+
+def export_dir():
+    path = Path(_setting('EXPORT_DIR', Path(settings.BASE_DIR) / 'var' / 'exports'))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def job_path(job):
+    return export_dir() / f"{job.pk}.pdf"
+
+
+def cached_export(key):
+    """Export identique terminé récemment et dont le fichier existe encore, ou None."""
+    since = datetime.utcnow() - timedelta(seconds=_setting('EXPORT_CACHE_TTL', 900))
+    for job in ExportJob.objects(key=key, status='completed', finished_at__gte=since).order_by('-finished_at'):
+        if job_path(job).exists():
+            return job
+    return None
+
+
+def submit(kind, params, requested_by=None, item_count=0):
+    """Met l'export en file ; retourne ``(job, created)``.
+
+    Un export identique récent ou en cours est renvoyé avec ``created=False``.
+    """
+    key = export_key(kind, params)
+    job = cached_export(key)
+    if job is not None:
+        return job, False
+    job = live_job(ExportJob, ExportJob.objects(key=key, active=True).first(), _setting('EXPORT_JOB_TIMEOUT', 1800))
+    if job is not None:
+        return job, False
+    purge_expired()
+    job = ExportJob(
+        kind=kind, params=params, key=key, item_count=item_count,
+        requested_by=str(requested_by) if requested_by else None,
+    )
+    try:
+        job.save()
+    except NotUniqueError:
+        # Demande concurrente identique : l'autre requête a gagné
+        return ExportJob.objects(key=key, active=True).first(), False
+    executor.submit(run_job, job.pk)
+    return job, True
+
+
+def run_job(job_id):
+    job = start_job(ExportJob, job_id)
+    if job is None:
+        return
+    path = job_path(job)
+    partial = path.with_suffix('.part')
+    try:
+        exporter = get_exporter(job.kind)
+        with open(partial, 'wb') as dest:
+            count = exporter.write(job.params, dest)
+        os.replace(partial, path)
+    except Exception as e:
+        print(f"❌ [export {job.pk}] ERREUR: {e}")
+        try:
+            os.remove(partial)
+        except OSError:
+            pass
+        finish_job(ExportJob, job.pk, 'failed', error=str(e))
+    else:
+        finish_job(
+            ExportJob, job.pk, 'completed', item_count=count, size=path.stat().st_size,
+            file_name=export_filename(exporter, job.created_at),
+        )
+
+
+def purge_expired():
+    """Supprime les exports (fichiers et tâches) plus anciens que la durée de conservation."""
+    limit = datetime.utcnow() - timedelta(hours=_setting('EXPORT_RETENTION_HOURS', 24))
+    expired = ExportJob.objects(finished_at__lt=limit)
+    for job in expired.only('id'):
+        try:
+            os.remove(job_path(job))
+        except OSError:
+            pass
+    expired.delete()
+
+
+executor = JobExecutor('EXPORT_WORKERS', 2, 'pdf-export')
+
+
+# ========== RÉPONSES ==========
+
+def download_response(job):
+    return FileResponse(
+        open(job_path(job), 'rb'), as_attachment=True,
+        filename=job.file_name or f"{job.kind}.pdf", content_type='application/pdf',
+    )
+
+
+def stream_export(exporter, params):
+    """PDF construit dans un fichier temporaire puis envoyé par blocs."""
+    dest = tempfile.TemporaryFile()
+    try:
+        exporter.write(params, dest)
+    except Exception:
+        dest.close()
+        raise
+    dest.seek(0)
+    return FileResponse(dest, as_attachment=True, filename=export_filename(exporter), content_type='application/pdf')
+
+
+def export_response(request, kind, params):
+    """Réponse d'une demande d'export : fichier en cache, PDF direct ou suivi de la tâche."""
+    job = cached_export(export_key(kind, params))
+    if job is not None:
+        return download_response(job)
+    exporter = get_exporter(kind)
+    count = exporter.count(params)
+    if count <= _setting('EXPORT_SYNC_MAX_ROWS', 300):
+        return stream_export(exporter, params)
+    job, _ = submit(kind, params, requested_by=request.session.get('_auth_user_id'), item_count=count)
+    return redirect('exports:status', job_id=str(job.pk))
@@ -0,0 +1,67 @@
+from datetime import datetime
+
+from mongoengine import BooleanField, DateTimeField, DictField, Document, IntField, StringField
+
+
+class ExportJob(Document):
+    """
+    Export PDF volumineux construit en arrière-plan (voir exports/jobs.py)
+    """
+    STATUS_CHOICES = [
+        ('queued', 'En file d\'attente'),
+        ('running', 'En cours'),
+        ('completed', 'Terminé'),
+        ('failed', 'Échec'),
+    ]
+    ACTIVE_STATUSES = ('queued', 'running')
+
+    kind = StringField(max_length=40, required=True)
+    params = DictField()
+    # Empreinte (type + filtres) : exports identiques partagés
+    key = StringField(max_length=40, required=True)
+    requested_by = StringField(max_length=24)
+    status = StringField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    # Vrai tant que l'export est en file ou en cours : un seul par empreinte
+    active = BooleanField(default=True)
+    item_count = IntField(default=0)
+    file_name = StringField(max_length=200)
+    size = IntField(default=0)
+    error = StringField()
+    created_at = DateTimeField(default=datetime.utcnow)
+    started_at = DateTimeField(null=True)
+    finished_at = DateTimeField(null=True)
+
+    meta = {
+        # Collection d'origine (modèle déplacé depuis feed) : tâches et fichiers existants conservés
+        'collection': 'feed_exportjob',
+        'ordering': ['-created_at'],
+        'indexes': [
+            ('key', 'status', '-finished_at'),
+            'finished_at',
+            {
+                'fields': ['key'],
+                'unique': True,
+                'partialFilterExpression': {'active': True},
+                'name': 'one_active_export_per_key',
+            },
+        ]
+    }
+
+    def __str__(self):
+        return f"ExportJob {self.kind} {self.pk} ({self.status})"
+
+    @property
+    def is_active(self):
+        return self.status in self.ACTIVE_STATUSES
+
+    def as_dict(self):
+        return {
+            'id': str(self.pk),
+            'kind': self.kind,
+            'status': self.status,
+            'item_count': self.item_count,
+            'size': self.size,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from bson import ObjectId
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from web_project import background
+
+from . import jobs
+
+
+class ExportJobTests(SimpleTestCase):
+    def test_chunked_and_stable_key(self):
+        self.assertEqual(list(jobs.chunked(range(5), 2)), [[0, 1], [2, 3], [4]])
+        self.assertEqual(
+            jobs.export_key('feed', {'search_query': 'td', 'content_type': 'echeance'}),
+            jobs.export_key('feed', {'content_type': 'echeance', 'search_query': 'td'}),
+        )
+        self.assertNotEqual(jobs.export_key('feed', {}), jobs.export_key('moderation_reports', {}))
+
+    def test_response_streams_small_and_queues_large_exports(self):
+        request = RequestFactory().get('/feed/export/pdf/')
+        request.session = {'_auth_user_id': '1'}
+        exporter = mock.Mock(filename_prefix='feed_export')
+        exporter.write.side_effect = lambda params, dest: dest.write(b'%PDF-1.4')
+        job = SimpleNamespace(pk=ObjectId())
+        with override_settings(EXPORT_SYNC_MAX_ROWS=10), \
+                mock.patch.object(jobs, 'cached_export', return_value=None), \
+                mock.patch.object(jobs, 'get_exporter', return_value=exporter), \
+                mock.patch.object(jobs, 'submit', return_value=(job, True)) as submit:
+            exporter.count.return_value = 10
+            response = jobs.export_response(request, 'feed', {})
+            self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.4')
+            submit.assert_not_called()
+
+            exporter.count.return_value = 11
+            response = jobs.export_response(request, 'feed', {})
+            self.assertEqual(response.status_code, 302)
+            self.assertEqual(response.url, f'/exports/{job.pk}/')
+            submit.assert_called_once_with('feed', {}, requested_by='1', item_count=11)
+
+    def test_stale_active_job_is_failed(self):
+        model = mock.Mock()
+        fresh = SimpleNamespace(pk=1, created_at=datetime.utcnow())
+        stale = SimpleNamespace(pk=2, created_at=datetime.utcnow() - timedelta(hours=1))
+        self.assertIs(background.live_job(model, fresh, 60), fresh)
+        self.assertIsNone(background.live_job(model, stale, 60))
+        model.objects.assert_called_once_with(id=2)
+        update = model.objects.return_value.update.call_args.kwargs
+        self.assertEqual((update['set__status'], update['set__active'], update['set__error']), ('failed', False, 'Délai dépassé'))
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'exports'
+
+urlpatterns = [
+    path('<str:job_id>/', views.export_status, name='status'),
+    path('<str:job_id>/download/', views.export_download, name='download'),
+]
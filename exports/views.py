@@ -0,0 +1,46 @@
+from django.contrib import messages
+from django.http import JsonResponse
+from django.shortcuts import redirect, render
+from django.urls import reverse
+from bson.errors import InvalidId
+from mongoengine.errors import ValidationError
+
+from . import jobs
+from .models import ExportJob
+
+
+def _export_job(job_id):
+    try:
+        return ExportJob.objects(id=job_id).first()
+    except (InvalidId, ValidationError):
+        return None
+
+
+def export_status(request, job_id):
+    """Suivi d'un export PDF en arrière-plan (JSON pour le polling, sinon page)"""
+    job = _export_job(job_id)
+    is_ajax = request.headers.get('x-requested-with') == 'XMLHttpRequest'
+    if job is None:
+        if is_ajax:
+            return JsonResponse({'success': False, 'error': 'Export introuvable'}, status=404)
+        messages.error(request, '❌ Export introuvable.')
+        return redirect('index')
+
+    data = job.as_dict()
+    if job.status == 'completed':
+        data['download_url'] = reverse('exports:download', args=[job_id])
+    if is_ajax:
+        return JsonResponse({'success': True, 'job': data})
+    return render(request, 'exports/export_status.html', {
+        'job': data,
+        'page_title': 'Export PDF',
+    })
+
+
+def export_download(request, job_id):
+    """Télécharge un export PDF terminé"""
+    job = _export_job(job_id)
+    if job is None or job.status != 'completed' or not jobs.job_path(job).exists():
+        messages.error(request, '❌ Export introuvable ou expiré.')
+        return redirect('index')
+    return jobs.download_response(job)
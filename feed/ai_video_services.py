@@ -8,11 +8,18 @@
 from pathlib import Path
 from django.conf import settings
 
+from .artifact_cache import get_cache, make_key
+from .audio_info import mp3_duration
+
+# Paramètres de voix gTTS (font partie de la clé de cache audio)
+TTS_LANG = 'fr'
+TTS_SLOW = True
+
 class AIVideoGenerator:
     """Service IA utilisant des APIs externes gratuites"""
     
-    def __init__(self):
-        pass
+    def __init__(self, cache=None):
+        self.cache = cache or get_cache()
     
     def generate_tiktok_script(self, feed_item):
       
@@ -26,6 +33,15 @@ def generate_tiktok_script(self, feed_item):
                 # Fallback: Script basique sans IA
                 return self._generate_basic_script(feed_item)
             
+            # Même texte source -> même script : pas de nouvel appel Gemini
+            cache_key = make_key(
+                'script', feed_item.title, feed_item.content_type, feed_item.description[:200],
+                model='gemini-pro'
+            )
+            cached = self.cache.get_json(cache_key)
+            if cached:
+                return {**cached, 'cached': True}
+            
             genai.configure(api_key=GEMINI_API_KEY)
             model = genai.GenerativeModel('gemini-pro')
             
@@ -55,12 +71,14 @@ def generate_tiktok_script(self, feed_item):
             if len(words) > 180:
                 script = ' '.join(words[:180])
             
-            return {
+            result = {
                 'success': True,
                 'script': script,
                 'model': 'gemini-pro',
                 'word_count': len(script.split())
             }
+            self.cache.put_json(cache_key, result)
+            return result
             
         except Exception as e:
             print(f"⚠️ Gemini API error: {e}")
@@ -139,15 +157,26 @@ def _generate_basic_script(self, feed_item):
     def generate_audio(self, text, output_path):
         """
         Génère l'audio avec gTTS (GRATUIT, aucun téléchargement)
+        Le MP3 est réutilisé depuis le cache si le texte et la voix n'ont pas changé
         """
         try:
+            cache_key = make_key('audio', text, lang=TTS_LANG, slow=TTS_SLOW)
+            if self.cache.copy_to(cache_key, 'mp3', output_path):
+                print(f"♻️ Audio repris du cache: {output_path}")
+                return {
+                    'success': True,
+                    'audio_path': output_path,
+                    'cached': True
+                }
+            
             from gtts import gTTS
             
             print(f"🎙️ Génération audio avec gTTS...")
             
             # Générer avec Google TTS (gratuit), slow=True pour rallonger la durée
-            tts = gTTS(text=text, lang='fr', slow=True)
+            tts = gTTS(text=text, lang=TTS_LANG, slow=TTS_SLOW)
             tts.save(output_path)
+            self.cache.put_file(cache_key, 'mp3', output_path)
             
             print(f"✅ Audio généré: {output_path}")
             
@@ -170,10 +199,13 @@ def generate_subtitles(self, audio_path, script_text):
         try:
             print("📝 Génération sous-titres (sans Whisper)...")
             
-            # Obtenir durée audio
-            from pydub import AudioSegment
-            audio = AudioSegment.from_file(audio_path)
-            duration = len(audio) / 1000.0  # En secondes
+            # Obtenir durée audio (en-têtes MP3, décodage complet en dernier recours)
+            duration = self.get_audio_duration(audio_path)
+            
+            cache_key = make_key('srt', script_text, duration=round(duration, 2))
+            cached = self.cache.get_json(cache_key)
+            if cached:
+                return {**cached, 'cached': True}
             
             # Découper le script en segments
             sentences = self._split_into_sentences(script_text)
@@ -195,12 +227,14 @@ def generate_subtitles(self, audio_path, script_text):
             
             print(f"✅ Sous-titres générés ({len(sentences)} segments)")
             
-            return {
+            result = {
                 'success': True,
                 'srt': srt_string,
                 'segments': [{'start': i*time_per_sentence, 'end': (i+1)*time_per_sentence, 'text': s} 
                            for i, s in enumerate(sentences)]
             }
+            self.cache.put_json(cache_key, result)
+            return result
             
         except Exception as e:
             print(f"❌ Erreur sous-titres: {e}")
@@ -209,6 +243,15 @@ def generate_subtitles(self, audio_path, script_text):
                 'error': str(e)
             }
     
+    def get_audio_duration(self, audio_path):
+        """Durée en secondes depuis les en-têtes MP3 (pydub seulement si illisibles)"""
+        duration = mp3_duration(audio_path)
+        if duration is not None:
+            return duration
+        from pydub import AudioSegment
+        audio = AudioSegment.from_file(audio_path)
+        return len(audio) / 1000.0
+    
     def _split_into_sentences(self, text):
         """Découpe le texte en phrases"""
         import re
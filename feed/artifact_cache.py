@@ -0,0 +1,189 @@
+"""Cache disque adressé par contenu pour les artefacts vidéo (script, MP3, SRT).
+
+La clé est le SHA-256 du type d'artefact, du texte source et des paramètres
+(voix, langue, modèle...) : une régénération ou une nouvelle tentative avec
+le même texte réutilise le fichier au lieu de rappeler Gemini / gTTS.
+Les fichiers sont écrits de façon atomique (fichier temporaire puis
+``os.replace``) ; quand le volume dépasse ``FEED_ARTIFACT_CACHE_MAX_MB`` les
+moins récemment utilisés (mtime rafraîchi à chaque lecture) sont supprimés.
+Le volume est suivi en mémoire à chaque écriture : le répertoire n'est
+parcouru que pour évincer, ou pour recaler ce compteur sur les écritures des
+autres processus (au plus toutes les ``RESCAN_SECONDS``).
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+
+def make_key(kind, *parts, **params):
+    payload = json.dumps([kind, parts, params], sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ArtifactCache:
+    # Une éviction redescend sous cette fraction de max_bytes, pour ne pas
+    # reparcourir le répertoire à chaque écriture suivante
+    LOW_WATERMARK = 0.9
+    RESCAN_SECONDS = 300
+
+    def __init__(self, directory, max_bytes):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None
+        self._scanned_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, key, ext):
+        return self.directory / key[:2] / f"{key}.{ext}"
+
+    def _lookup(self, key, ext):
+        path = self.path_for(key, ext)
+        try:
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+    def get_bytes(self, key, ext):
+        path = self._lookup(key, ext)
+        if path is None:
+            return None
+        try:
+            return path.read_bytes()
+        except OSError:
+            return None
+
+    def get_text(self, key, ext='txt'):
+        data = self.get_bytes(key, ext)
+        return data.decode('utf-8') if data is not None else None
+
+    def get_json(self, key):
+        text = self.get_text(key, 'json')
+        return json.loads(text) if text is not None else None
+
+    def copy_to(self, key, ext, destination):
+        """Copie l'artefact vers ``destination`` ; False s'il n'est pas en cache."""
+        path = self._lookup(key, ext)
+        if path is None:
+            return False
+        try:
+            shutil.copyfile(path, destination)
+        except OSError:
+            return False
+        return True
+
+    # ------------------------------------------------------------------
+    # Écriture
+    # ------------------------------------------------------------------
+    def put_bytes(self, key, ext, data):
+        path = self.path_for(key, ext)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            previous = path.stat().st_size
+        except OSError:
+            previous = 0
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"[feed] Écriture du cache d'artefacts impossible: {e}")
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return None
+        self._track(len(data) - previous)
+        return path
+
+    def put_text(self, key, text, ext='txt'):
+        return self.put_bytes(key, ext, text.encode('utf-8'))
+
+    def put_json(self, key, value):
+        return self.put_bytes(key, 'json', json.dumps(value, ensure_ascii=False).encode('utf-8'))
+
+    def put_file(self, key, ext, source):
+        try:
+            data = Path(source).read_bytes()
+        except OSError:
+            return None
+        return self.put_bytes(key, ext, data)
+
+    # ------------------------------------------------------------------
+    # Éviction
+    # ------------------------------------------------------------------
+    def size(self):
+        return sum(f.stat().st_size for f in self.directory.glob('*/*') if f.is_file())
+
+    def _track(self, delta):
+        """Met à jour le volume suivi et n'évince que s'il dépasse ``max_bytes``."""
+        if not self.max_bytes:
+            return
+        with self._lock:
+            if self._size is None or time.monotonic() - self._scanned_at > self.RESCAN_SECONDS:
+                self._size = self.size()
+                self._scanned_at = time.monotonic()
+            else:
+                self._size += delta
+            over = self._size > self.max_bytes
+        if over:
+            self.evict()
+
+    def evict(self):
+        """Supprime les artefacts les moins récemment utilisés au-delà de ``max_bytes``."""
+        if not self.max_bytes:
+            return 0
+        with self._lock:
+            entries = []
+            total = 0
+            for f in self.directory.glob('*/*'):
+                try:
+                    st = f.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, f))
+                total += st.st_size
+            removed = 0
+            if total > self.max_bytes:
+                target = self.max_bytes * self.LOW_WATERMARK
+                for _, size, f in sorted(entries, key=lambda e: e[0]):
+                    if total <= target:
+                        break
+                    try:
+                        f.unlink()
+                    except OSError:
+                        continue
+                    total -= size
+                    removed += 1
+            self._size = total
+            self._scanned_at = time.monotonic()
+            return removed
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            directory = getattr(settings, 'FEED_ARTIFACT_CACHE_DIR', Path(settings.BASE_DIR) / 'var' / 'feed_artifacts')
+            max_mb = getattr(settings, 'FEED_ARTIFACT_CACHE_MAX_MB', 500)
+            _cache = ArtifactCache(directory, int(max_mb * 1024 * 1024))
+        return _cache
@@ -0,0 +1,96 @@
+"""Durée d'un MP3 lue dans les en-têtes, sans décoder l'audio.
+
+On saute l'étiquette ID3v2, on lit l'en-tête de la première trame MPEG puis :
+- en-tête ``Xing`` (VBR) ou ``VBRI`` : nombre de trames * échantillons / fréquence ;
+- sinon (CBR, ``Info`` compris) : taille des données audio / débit. gTTS
+  concatène plusieurs flux CBR, d'où le calcul sur la taille totale.
+"""
+import os
+import struct
+
+# Débits (kbit/s) de la couche III : MPEG-1, puis MPEG-2 / 2.5
+_BITRATES = {
+    'v1': (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    'v2': (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Fréquences d'échantillonnage par bits de version (3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5)
+_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+_HEAD_BYTES = 64 * 1024
+
+
+def _id3v2_size(data):
+    if len(data) < 10 or data[:3] != b'ID3':
+        return 0
+    size = 0
+    for b in data[6:10]:
+        size = (size << 7) | (b & 0x7F)
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _parse_frame_header(data, offset):
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+    version = (b1 >> 3) & 0x03
+    layer = (b1 >> 1) & 0x03
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 0x03
+    # Couche III uniquement (celle produite par gTTS)
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    bitrate = _BITRATES['v1' if version == 3 else 'v2'][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    mono = (b3 >> 6) == 3
+    return {
+        'bitrate': bitrate,
+        'sample_rate': sample_rate,
+        'samples_per_frame': 1152 if version == 3 else 576,
+        'side_info': (17 if mono else 32) if version == 3 else (9 if mono else 17),
+    }
+
+
+def _find_frame(data, start):
+    offset = start
+    while offset + 4 <= len(data):
+        offset = data.find(b'\xff', offset)
+        if offset < 0 or offset + 4 > len(data):
+            return None, None
+        if (data[offset + 1] & 0xE0) == 0xE0:
+            header = _parse_frame_header(data, offset)
+            if header:
+                return offset, header
+        offset += 1
+    return None, None
+
+
+def mp3_duration(path):
+    """Durée en secondes, ou None si l'en-tête est illisible."""
+    try:
+        file_size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            data = f.read(_HEAD_BYTES)
+            if file_size >= 128:
+                f.seek(-128, os.SEEK_END)
+                has_id3v1 = f.read(3) == b'TAG'
+            else:
+                has_id3v1 = False
+    except OSError:
+        return None
+
+    offset, header = _find_frame(data, _id3v2_size(data))
+    if header is None:
+        return None
+
+    xing = offset + 4 + header['side_info']
+    if data[xing:xing + 4] == b'Xing' and len(data) >= xing + 12:
+        flags = struct.unpack('>I', data[xing + 4:xing + 8])[0]
+        if flags & 0x1:
+            frames = struct.unpack('>I', data[xing + 8:xing + 12])[0]
+            return frames * header['samples_per_frame'] / header['sample_rate']
+    vbri = offset + 36
+    if data[vbri:vbri + 4] == b'VBRI' and len(data) >= vbri + 18:
+        frames = struct.unpack('>I', data[vbri + 14:vbri + 18])[0]
+        return frames * header['samples_per_frame'] / header['sample_rate']
+
+    audio_bytes = file_size - offset - (128 if has_id3v1 else 0)
+    return max(audio_bytes, 0) * 8 / header['bitrate']
@@ -0,0 +1,79 @@
+"""Résolution groupée des auteurs des FeedItems.
+
+``hydrate_authors(items)`` charge tous les ``author_id`` distincts d'une page
+en une seule requête ``$in`` et les attache aux éléments : ``item.author`` et
+``get_author_username()`` ne déclenchent alors plus de requête par ligne.
+Les utilisateurs résolus (y compris les identifiants inconnus) sont gardés
+dans un petit cache de processus à durée de vie limitée
+(``FEED_AUTHOR_CACHE_TTL`` secondes).
+"""
+import threading
+import time
+
+from bson import ObjectId
+from django.conf import settings
+
+MAX_CACHED_USERS = 5000
+
+# author_id -> (expiration, User | None)
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _ttl():
+    return getattr(settings, 'FEED_AUTHOR_CACHE_TTL', 300)
+
+
+def _load_users(ids):
+    from accounts.models import User
+    valid = [ObjectId(i) for i in ids if ObjectId.is_valid(i)]
+    if not valid:
+        return {}
+    users = User.objects(id__in=valid).only('id', 'username', 'role', 'profile_image')
+    return {str(user.id): user for user in users}
+
+
+def get_users(author_ids):
+    """``{author_id: User | None}`` ; une requête au plus pour les absents du cache."""
+    now = time.monotonic()
+    found, missing = {}, set()
+    with _cache_lock:
+        for author_id in set(filter(None, author_ids)):
+            entry = _cache.get(author_id)
+            if entry is not None and entry[0] > now:
+                found[author_id] = entry[1]
+            else:
+                missing.add(author_id)
+    if missing:
+        try:
+            loaded = _load_users(missing)
+        except Exception as e:
+            print(f"[feed] Erreur chargement auteurs: {e}")
+            return {**found, **{author_id: None for author_id in missing}}
+        expires = now + _ttl()
+        with _cache_lock:
+            if len(_cache) + len(missing) > MAX_CACHED_USERS:
+                _cache.clear()
+            for author_id in missing:
+                user = loaded.get(author_id)
+                _cache[author_id] = (expires, user)
+                found[author_id] = user
+    return found
+
+
+def get_user(author_id):
+    return get_users([author_id]).get(author_id) if author_id else None
+
+
+def hydrate_authors(items):
+    """Attache l'auteur à chaque élément de ``items`` ; retourne la liste."""
+    items = list(items)
+    users = get_users(item.author_id for item in items)
+    for item in items:
+        item._author = users.get(item.author_id)
+    return items
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,240 @@
+"""Statistiques du tableau de bord IA et des analyses hebdomadaires.
+
+Tout est calculé par MongoDB (``$match`` + ``$facet`` / ``$group``) au lieu de
+charger chaque FeedItem en Python :
+
+- ``summarize(match)`` : total, somme des scores qualité, répartition par type
+  et par ton des posts correspondant à ``match`` ;
+- ``weekly_stats()`` : même chose sur les 7 derniers jours, plus les auteurs et
+  les prochaines échéances (``$sort`` + ``$limit``) ;
+- top qualité et posts urgents : requêtes triées et limitées servies par les
+  index ``(is_active, -ai_quality_score, -created_at)`` et ``(is_active, deadline)``.
+
+Avec ``FEED_DASHBOARD_ROLLUP``, le tableau de bord lit la collection
+``feed_daily_stats`` (un document par jour de création) : son coût ne dépend
+plus du nombre de posts. ``FeedItem.save`` / ``delete`` marquent le jour du
+post comme à recalculer ; seuls ces jours sont ré-agrégés à la lecture.
+Construire l'agrégat une première fois avec ``manage.py rollup_feed_stats``.
+"""
+from datetime import datetime, timedelta
+
+from django.conf import settings
+
+from .authors import get_users
+from .models import FeedDailyStats, FeedItem
+
+UNDEFINED_TONE = 'non défini'
+
+# Valeurs par défaut des champs absents (comme le ferait MongoEngine au chargement)
+TYPE_EXPR = {'$ifNull': ['$content_type', 'programme']}
+QUALITY_EXPR = {'$ifNull': ['$ai_quality_score', 0]}
+# Ton absent ou vide -> 'non défini'
+TONE_EXPR = {'$cond': [{'$gt': [{'$ifNull': ['$ai_tone', '']}, '']}, '$ai_tone', UNDEFINED_TONE]}
+
+URGENT_DAYS = 4  # FeedItem.is_urgent : (deadline - maintenant).days <= 3
+
+
+def rollup_enabled():
+    return getattr(settings, 'FEED_DASHBOARD_ROLLUP', False)
+
+
+def _ordered(counts):
+    """Répartition triée par effectif décroissant (puis par clé)."""
+    return dict(sorted(counts.items(), key=lambda kv: (-kv[1], str(kv[0]))))
+
+
+def _aggregate(match, facets):
+    cursor = FeedItem._get_collection().aggregate([{'$match': match}, {'$facet': facets}])
+    return next(iter(cursor), None) or {}
+
+
+def _summary_facets():
+    return {
+        'totals': [{'$group': {'_id': None, 'total': {'$sum': 1}, 'quality_sum': {'$sum': QUALITY_EXPR}}}],
+        'by_type': [{'$group': {'_id': TYPE_EXPR, 'count': {'$sum': 1}}}],
+        'by_tone': [{'$group': {'_id': TONE_EXPR, 'count': {'$sum': 1}}}],
+    }
+
+
+def _read_summary(result):
+    totals = (result.get('totals') or [{}])[0]
+    return {
+        'total': totals.get('total', 0),
+        'quality_sum': totals.get('quality_sum', 0.0),
+        'by_type': _ordered({row['_id']: row['count'] for row in result.get('by_type', [])}),
+        'by_tone': _ordered({row['_id']: row['count'] for row in result.get('by_tone', [])}),
+    }
+
+
+def summarize(match):
+    """Total, somme des scores et répartitions des posts correspondant à ``match``."""
+    return _read_summary(_aggregate(match, _summary_facets()))
+
+
+def recent_match(days=7, now=None):
+    since = (now or datetime.utcnow()) - timedelta(days=days)
+    return {'is_active': True, 'created_at': {'$gte': since}}
+
+
+# ========== TABLEAU DE BORD ==========
+
+def dashboard_summary():
+    """Statistiques globales des posts actifs (agrégat quotidien si activé)."""
+    if rollup_enabled():
+        for doc in FeedDailyStats.objects(dirty=True).only('day'):
+            refresh_day(doc.day)
+        return merge_rollups(FeedDailyStats.objects.only('total', 'quality_sum', 'by_type', 'by_tone'))
+    return summarize({'is_active': True})
+
+
+def top_quality_items(limit=5):
+    return list(FeedItem.objects(is_active=True).order_by('-ai_quality_score', '-created_at').limit(limit))
+
+
+def urgent_items(now=None):
+    """Posts dont l'échéance est dépassée ou dans moins de 4 jours (cf. ``is_urgent``)."""
+    now = now or datetime.utcnow()
+    return list(FeedItem.objects(is_active=True, deadline__lt=now + timedelta(days=URGENT_DAYS)))
+
+
+# ========== RÉSUMÉ HEBDOMADAIRE ==========
+
+def weekly_stats(days=7, now=None):
+    """Statistiques des ``days`` derniers jours pour ``generate_weekly_summary``."""
+    now = now or datetime.utcnow()
+    upcoming = {'deadline': {'$gt': now}}
+    facets = _summary_facets()
+    facets.update({
+        'by_author': [{'$group': {'_id': '$author_id', 'count': {'$sum': 1}}}],
+        'upcoming_count': [{'$match': upcoming}, {'$count': 'n'}],
+        'upcoming': [
+            {'$match': upcoming},
+            {'$sort': {'deadline': 1}},
+            {'$limit': 5},
+            {'$project': {'title': 1, 'deadline': 1}},
+        ],
+    })
+    result = _aggregate(recent_match(days, now), facets)
+    stats = _read_summary(result)
+    stats.update({
+        'days': days,
+        'by_author': author_counts(result.get('by_author', [])),
+        'upcoming_count': (result.get('upcoming_count') or [{}])[0].get('n', 0),
+        'upcoming': [(row.get('title', ''), row['deadline']) for row in result.get('upcoming', [])],
+    })
+    return stats
+
+
+def author_counts(rows):
+    """Publications par nom d'auteur (auteurs résolus en une requête)."""
+    users = get_users([row['_id'] for row in rows if row['_id']])
+    counts = {}
+    for row in rows:
+        user = users.get(row['_id'])
+        name = user.username if user else "Utilisateur inconnu"
+        counts[name] = counts.get(name, 0) + row['count']
+    return _ordered(counts)
+
+
+# ========== AGRÉGAT QUOTIDIEN ==========
+
+def _day(value):
+    return datetime(value.year, value.month, value.day)
+
+
+def _pairs(counts):
+    return [{'key': key, 'count': count} for key, count in counts.items()]
+
+
+def merge_rollups(docs):
+    """Additionne des agrégats quotidiens (documents ou objets équivalents)."""
+    total, quality_sum, by_type, by_tone = 0, 0.0, {}, {}
+    for doc in docs:
+        total += doc.total
+        quality_sum += doc.quality_sum
+        for target, pairs in ((by_type, doc.by_type), (by_tone, doc.by_tone)):
+            for pair in pairs:
+                target[pair['key']] = target.get(pair['key'], 0) + pair['count']
+    return {
+        'total': total,
+        'quality_sum': quality_sum,
+        'by_type': _ordered({k: v for k, v in by_type.items() if v}),
+        'by_tone': _ordered({k: v for k, v in by_tone.items() if v}),
+    }
+
+
+def fold_day_rows(rows):
+    """Regroupe les lignes (jour, type, ton) de ``rebuild`` en un agrégat par jour."""
+    days = {}
+    for row in rows:
+        key = row['_id']
+        day = days.setdefault(key['day'], {'total': 0, 'quality_sum': 0.0, 'by_type': {}, 'by_tone': {}})
+        day['total'] += row['count']
+        day['quality_sum'] += row['quality_sum']
+        day['by_type'][key['type']] = day['by_type'].get(key['type'], 0) + row['count']
+        day['by_tone'][key['tone']] = day['by_tone'].get(key['tone'], 0) + row['count']
+    return {datetime.strptime(day, '%Y-%m-%d'): stats for day, stats in days.items()}
+
+
+def _store_day(day, stats, version=None):
+    fields = {
+        'set__total': stats['total'],
+        'set__quality_sum': stats['quality_sum'],
+        'set__by_type': _pairs(stats['by_type']),
+        'set__by_tone': _pairs(stats['by_tone']),
+        'set__dirty': False,
+        'set__computed_at': datetime.utcnow(),
+    }
+    if version is None:
+        return FeedDailyStats.objects(day=day).update_one(upsert=True, **fields)
+    # Ignoré si le jour a de nouveau été modifié pendant le calcul (il reste à recalculer)
+    return FeedDailyStats.objects(day=day, version=version).update_one(**fields)
+
+
+def refresh_day(day):
+    """Recalcule l'agrégat d'un jour à partir des posts créés ce jour-là."""
+    day = _day(day)
+    doc = FeedDailyStats.objects(day=day).only('version').first()
+    stats = summarize({'is_active': True, 'created_at': {'$gte': day, '$lt': day + timedelta(days=1)}})
+    _store_day(day, stats, version=doc.version if doc else None)
+    return stats
+
+
+def mark_day_dirty(created_at):
+    """Appelé à chaque écriture d'un post : son jour sera ré-agrégé à la prochaine lecture."""
+    if not rollup_enabled() or not created_at:
+        return
+    try:
+        FeedDailyStats.objects(day=_day(created_at)).update_one(
+            set__dirty=True, inc__version=1, upsert=True
+        )
+    except Exception as e:
+        print(f"[feed] Agrégat quotidien non invalidé: {e}")
+
+
+def rebuild(since=None):
+    """Reconstruit l'agrégat quotidien en une seule agrégation (depuis ``since`` ou tout l'historique)."""
+    match = {'is_active': True, 'created_at': {'$type': 'date'}}
+    if since:
+        match['created_at']['$gte'] = _day(since)
+    rows = FeedItem._get_collection().aggregate([
+        {'$match': match},
+        {'$group': {
+            '_id': {
+                'day': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$created_at'}},
+                'type': TYPE_EXPR,
+                'tone': TONE_EXPR,
+            },
+            'count': {'$sum': 1},
+            'quality_sum': {'$sum': QUALITY_EXPR},
+        }},
+    ])
+    days = fold_day_rows(rows)
+    for day, stats in days.items():
+        _store_day(day, stats)
+    # Jours sans post actif restant
+    stale = FeedDailyStats.objects(day__nin=list(days))
+    if since:
+        stale = stale.filter(day__gte=_day(since))
+    stale.delete()
+    return len(days)
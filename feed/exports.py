@@ -0,0 +1,148 @@
+"""Export PDF du feed (voir exports/jobs.py pour les tâches et les réponses).
+
+Les posts filtrés sont lus par tranches de ``EXPORT_CHUNK_SIZE`` depuis un
+curseur MongoDB ; chaque tranche devient une table d'un même document
+reportlab, créée seulement quand la mise en page l'atteint
+(``LazyFlowables``) : la mémoire ne dépend pas du nombre de posts.
+"""
+from datetime import datetime
+
+from django.utils.html import escape
+from django.utils.text import Truncator
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import cm
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from exports.jobs import LazyFlowables, chunk_size, chunked
+
+from .authors import hydrate_authors
+from .forms import FeedItemSearchForm
+from .models import FeedItem
+from .pagination import filter_feed_items, order_queryset
+
+HEADER = ["Titre", "Type", "Auteur", "Créé le", "Échéance", "Description"]
+COL_WIDTHS = [4.5 * cm, 2.2 * cm, 2.2 * cm, 2.2 * cm, 2.2 * cm, 4.7 * cm]
+TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#667eea")),  # en-tête
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 9),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('LINEBELOW', (0, 0), (-1, -1), 0.5, colors.HexColor("#e2e8f0")),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor("#f8fafc")]),
+])
+EMPTY_STYLE = [('SPAN', (0, 1), (-1, 1)), ('ALIGN', (0, 1), (-1, 1), 'CENTER')]
+
+
+def _styles():
+    styles = getSampleStyleSheet()
+    return {
+        'title': styles['Title'],
+        'normal': styles['Normal'],
+        'cell': ParagraphStyle('cell', parent=styles['Normal'], fontSize=8, leading=10),
+        'muted': ParagraphStyle('muted', parent=styles['Normal'], fontSize=8, leading=10,
+                                textColor=colors.HexColor("#64748b")),
+    }
+
+
+def _date(value):
+    return value.strftime('%d/%m/%Y %H:%M') if value else ''
+
+
+def feed_row(item, styles):
+    title = f"<b>{escape(item.title)}</b>"
+    if item.is_urgent():
+        title += ' <font color="#ef4444"><b>URGENT</b></font>'
+    if item.is_ai_generated:
+        title += ' <font color="#4facfe"><b>IA</b></font>'
+    description = escape(Truncator(item.description or '').words(40))
+    if item.ai_quality_score:
+        description += f' <font color="#64748b">(qualité {item.ai_quality_score:g}/10)</font>'
+    return [
+        Paragraph(title, styles['cell']),
+        Paragraph(escape(item.get_content_type_display()), styles['cell']),
+        Paragraph(escape(item.get_author_username()), styles['muted']),
+        Paragraph(_date(item.created_at), styles['muted']),
+        Paragraph(_date(item.deadline) or 'Aucune échéance', styles['muted']),
+        Paragraph(description, styles['cell']),
+    ]
+
+
+def feed_table(rows, styles):
+    empty = not rows
+    if empty:
+        rows = [[Paragraph("Aucun contenu trouvé correspondant aux critères.", styles['muted'])] + [''] * 5]
+    table = Table([HEADER] + rows, repeatRows=1, colWidths=COL_WIDTHS)
+    table.setStyle(TABLE_STYLE)
+    if empty:
+        table.setStyle(TableStyle(EMPTY_STYLE))
+    return table
+
+
+def add_page_number(canvas, doc):
+    canvas.setFont('Helvetica', 8)
+    canvas.drawRightString(A4[0] - 1.5 * cm, 1 * cm, f"EduSocial - Page {canvas.getPageNumber()}")
+
+
+class FeedExport:
+    """Liste des posts filtrés : en-tête, une table par tranche, pied de page."""
+    filename_prefix = 'feed_export'
+
+    def __init__(self):
+        self.rows = 0
+
+    @staticmethod
+    def params_from(query):
+        """Filtres de la liste retenus pour l'export (et pour sa clé de cache)."""
+        return {name: query.get(name) for name in FeedItemSearchForm.base_fields if query.get(name)}
+
+    def queryset(self, params):
+        feed_items, ordering = filter_feed_items(FeedItem.objects(is_active=True), FeedItemSearchForm(params))
+        return order_queryset(feed_items, ordering)
+
+    def count(self, params):
+        return self.queryset(params).count()
+
+    def chunks(self, params, size):
+        return chunked(self.queryset(params).batch_size(size), size)
+
+    def flowables(self, params, size, stats):
+        """En-tête, puis une table (en-tête répété) par tranche de posts, puis le pied de page."""
+        styles = _styles()
+        yield [
+            Paragraph("Rapport de Contenus EduSocial", styles['title']),
+            Paragraph("Plateforme éducative augmentée par l'IA", styles['normal']),
+            Spacer(1, 12),
+            Paragraph(f"<b>Date d'export :</b> {stats['export_date']}", styles['normal']),
+            Paragraph("<b>Statut :</b> Contenus actifs uniquement", styles['normal']),
+            Paragraph(f"<b>Total contenus :</b> {stats['total_items']}", styles['normal']),
+            Spacer(1, 16),
+        ]
+        for chunk in self.chunks(params, size):
+            self.rows += len(chunk)
+            yield [feed_table([feed_row(item, styles) for item in hydrate_authors(chunk)], styles)]
+        if not self.rows:
+            yield [feed_table([], styles)]
+        yield [
+            Spacer(1, 24),
+            Paragraph("<b>Document confidentiel</b> - Généré automatiquement par l'IA", styles['muted']),
+            Paragraph(stats['export_date'], styles['muted']),
+        ]
+
+    def write(self, params, dest):
+        stats = {
+            'total_items': self.count(params),
+            'export_date': datetime.now().strftime('%d/%m/%Y %H:%M'),
+        }
+        doc = SimpleDocTemplate(
+            dest, pagesize=A4, title='Export PDF - Feed',
+            rightMargin=1.5 * cm, leftMargin=1.5 * cm, topMargin=2 * cm, bottomMargin=2 * cm,
+        )
+        self.rows = 0
+        doc.build(
+            LazyFlowables(self.flowables(params, chunk_size(), stats)),
+            onFirstPage=add_page_number, onLaterPages=add_page_number,
+        )
+        return self.rows
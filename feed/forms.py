@@ -223,6 +223,7 @@ class FeedItemSearchForm(forms.Form):
         choices=[
             ('-created_at', 'Plus récent'),
             ('created_at', 'Plus ancien'),
+            ('relevance', 'Pertinence'),
             ('title', 'Titre A-Z'),
             ('-title', 'Titre Z-A'),
         ],
@@ -0,0 +1,123 @@
+"""Rendu des images des vidéos TikTok.
+
+- Dégradé de fond calculé d'un bloc avec NumPy (plus de ``draw.line`` par ligne).
+- Fond complet (dégradé + pastille + émoji) pré-rendu une fois par type de
+  contenu et par taille, puis copié pour chaque post.
+- Polices chargées une seule fois (``load_font`` mis en cache).
+- Contour du titre dessiné en une passe avec ``stroke_width`` au lieu de 25
+  appels ``draw.text`` décalés.
+"""
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+COLORS = {
+    'programme': ((100, 150, 255), (50, 50, 200)),
+    'echeance': ((255, 100, 100), (200, 50, 50)),
+    'difficulte': ((255, 200, 100), (200, 150, 50)),
+    'ressource': ((100, 255, 150), (50, 200, 100)),
+    'annonce': ((200, 100, 255), (150, 50, 200))
+}
+
+EMOJIS = {
+    'programme': '📚',
+    'echeance': '⏰',
+    'difficulte': '🤔',
+    'ressource': '📖',
+    'annonce': '📢'
+}
+
+# Polices essayées dans l'ordre : (fichier, taille) pour une taille de référence 1080 px
+EMOJI_FONTS = (("seguiemj.ttf", 100), ("arial.ttf", 80))
+TITLE_FONTS = (("arial.ttf", 50),)
+
+TITLE_MAX_CHARS = 40
+
+
+@lru_cache(maxsize=32)
+def load_font(candidates, scale=1.0):
+    """Première police disponible parmi ``candidates`` (sinon la police par défaut)."""
+    for name, size in candidates:
+        try:
+            return ImageFont.truetype(name, max(1, int(size * scale)))
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+def gradient(width, height, top, bottom):
+    """Dégradé vertical ``top`` -> ``bottom`` (mêmes valeurs que l'ancien tracé ligne à ligne)."""
+    ratio = (np.arange(height, dtype=np.float64) / height)[:, None]
+    rows = np.asarray(top, dtype=np.float64) * (1 - ratio) + np.asarray(bottom, dtype=np.float64) * ratio
+    rows = rows.astype(np.uint8)
+    pixels = np.ascontiguousarray(np.broadcast_to(rows[:, None, :], (height, width, 3)))
+    return Image.fromarray(pixels, 'RGB')
+
+
+@lru_cache(maxsize=32)
+def background(content_type, width, height):
+    """Fond pré-rendu d'un type de contenu ; ne pas modifier (utiliser ``.copy()``)."""
+    color_top, color_bottom = COLORS.get(content_type, COLORS['programme'])
+    scale = width / 1080
+    img = gradient(width, height, color_top, color_bottom)
+    draw = ImageDraw.Draw(img)
+
+    cx, cy = width // 2, int(400 * scale)
+    radius = int(150 * scale)
+    draw.ellipse(
+        [cx - radius, cy - radius, cx + radius, cy + radius],
+        fill=(255, 255, 255),
+        outline=(100, 100, 255),
+        width=max(1, int(5 * scale))
+    )
+
+    emoji = EMOJIS.get(content_type, '📝')
+    font_emoji = load_font(EMOJI_FONTS, scale)
+    bbox = draw.textbbox((0, 0), emoji, font=font_emoji)
+    tw = bbox[2] - bbox[0]
+    th = bbox[3] - bbox[1]
+    draw.text((cx - tw // 2, cy - th // 2), emoji, font=font_emoji, fill=(50, 50, 50))
+    return img
+
+
+def wrap_text(text, font, max_width):
+    """Découpe ``text`` en lignes d'au plus ``max_width`` pixels"""
+    lines = []
+    current_line = []
+    for word in text.split():
+        test_line = ' '.join(current_line + [word])
+        if font.getlength(test_line) <= max_width or not current_line:
+            current_line.append(word)
+        else:
+            lines.append(' '.join(current_line))
+            current_line = [word]
+    if current_line:
+        lines.append(' '.join(current_line))
+    return lines
+
+
+def render_frame(title, content_type, width=1080, height=1920):
+    """Image principale d'un post : fond du type de contenu + titre contouré."""
+    img = background(content_type, width, height).copy()
+    draw = ImageDraw.Draw(img)
+    scale = width / 1080
+
+    if len(title) > TITLE_MAX_CHARS:
+        title = title[:TITLE_MAX_CHARS - 3] + "..."
+
+    font_title = load_font(TITLE_FONTS, scale)
+    stroke = max(1, int(2 * scale))
+    y_text = int(700 * scale)
+    for line in wrap_text(title, font_title, width - int(100 * scale)):
+        bbox = draw.textbbox((0, 0), line, font=font_title)
+        x_text = (width - (bbox[2] - bbox[0])) // 2
+        draw.text((x_text, y_text), line, font=font_title, fill=(255, 255, 255),
+                  stroke_width=stroke, stroke_fill=(0, 0, 0))
+        y_text += int(60 * scale)
+    return img
+
+
+def render_thumbnail(title, content_type, width=270):
+    """Vignette au format 9:16 rendue directement à petite taille."""
+    return render_frame(title, content_type, width, width * 16 // 9)
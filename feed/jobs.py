@@ -0,0 +1,273 @@
+"""Génération des vidéos TikTok hors du cycle requête/réponse.
+
+La vue ne fait plus qu'enregistrer une ``VideoJob`` (collection
+``feed_videojob``) ; un pool de threads la réclame de façon atomique
+(``find_one_and_update``) et exécute script, audio, rendu et téléchargement.
+Le pool tourne soit dans le processus web (``FEED_VIDEO_INLINE_WORKERS``
+threads, démarrés à la première soumission), soit dans un processus dédié :
+
+    python manage.py run_video_worker --workers 2
+
+- Resoumission idempotente : un index unique partiel garantit une seule
+  tâche active (en file ou en cours) par FeedItem ; ``submit`` la renvoie.
+- Annulation : immédiate pour une tâche en file ; pour une tâche en cours,
+  le drapeau ``cancel_requested`` est lu à chaque rapport de progression.
+- Reprise : une tâche ``running`` sans battement de cœur depuis
+  ``FEED_VIDEO_JOB_TIMEOUT`` secondes (worker tué) est réclamée à nouveau,
+  au plus ``FEED_VIDEO_JOB_MAX_ATTEMPTS`` fois.
+"""
+import os
+import socket
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from mongoengine.errors import NotUniqueError
+from mongoengine.queryset.visitor import Q
+
+from .ai_video_services import AIVideoGenerator
+from .models import FeedItem, VideoJob
+from .video_generator import RenderCancelled, TikTokVideoGenerator
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ========== FILE DE TÂCHES ==========
+
+def active_job(feed_item_id):
+    return VideoJob.objects(feed_item_id=str(feed_item_id), active=True).first()
+
+
+def latest_job(feed_item_id):
+    return VideoJob.objects(feed_item_id=str(feed_item_id)).order_by('-created_at').first()
+
+
+def submit(feed_item, requested_by=None, start_workers=True):
+    """Met en file la génération vidéo de ``feed_item``.
+
+    Retourne ``(job, created)`` ; si une tâche est déjà active pour cet
+    élément, elle est renvoyée avec ``created=False``.
+    """
+    job = active_job(feed_item.pk)
+    if job is not None:
+        return job, False
+    job = VideoJob(feed_item_id=str(feed_item.pk), requested_by=str(requested_by) if requested_by else None)
+    try:
+        job.save()
+    except NotUniqueError:
+        # Soumission concurrente : l'autre requête a gagné
+        return active_job(feed_item.pk), False
+    FeedItem.objects(id=feed_item.pk).update(set__tiktok_video_status='queued')
+    feed_item.tiktok_video_status = 'queued'
+    if start_workers:
+        runner.ensure_started()
+    return job, True
+
+
+def cancel(job):
+    """Annule ``job`` ; False si la tâche est déjà terminée."""
+    now = datetime.utcnow()
+    if VideoJob.objects(id=job.pk, status='queued').update(
+        set__status='cancelled', set__active=False, set__cancel_requested=True, set__finished_at=now
+    ):
+        FeedItem.objects(id=job.feed_item_id).update(set__tiktok_video_status='cancelled')
+        return True
+    # En cours : le worker s'arrêtera au prochain rapport de progression
+    return bool(VideoJob.objects(id=job.pk, status='running').update(set__cancel_requested=True))
+
+
+def claim(worker_name):
+    """Réserve la plus ancienne tâche disponible, ou None."""
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=_setting('FEED_VIDEO_JOB_TIMEOUT', 900))
+    job = VideoJob.objects(
+        Q(status='queued') | Q(status='running', heartbeat_at__lt=stale)
+    ).order_by('created_at').modify(
+        new=True,
+        set__status='running',
+        set__worker=worker_name,
+        set__started_at=now,
+        set__heartbeat_at=now,
+        inc__attempts=1,
+    )
+    if job is not None and job.attempts > _setting('FEED_VIDEO_JOB_MAX_ATTEMPTS', 3):
+        _finish(job, 'failed', error='Nombre maximal de tentatives atteint')
+        FeedItem.objects(id=job.feed_item_id).update(set__tiktok_video_status='failed')
+        return claim(worker_name)
+    return job
+
+
+def _finish(job, status, error=None, result=None):
+    updates = {
+        'set__status': status,
+        'set__active': False,
+        'set__finished_at': datetime.utcnow(),
+        'set__error': error,
+    }
+    if result is not None:
+        updates['set__result'] = result
+    if status == 'completed':
+        updates['set__progress'] = 100
+    VideoJob.objects(id=job.pk).update(**updates)
+
+
+def _report(job, stage, progress):
+    """Enregistre la progression (et le battement de cœur) ; lève RenderCancelled si demandé."""
+    current = VideoJob.objects(id=job.pk).modify(
+        new=True, set__stage=stage, set__progress=progress, set__heartbeat_at=datetime.utcnow()
+    )
+    if current is None or current.cancel_requested:
+        raise RenderCancelled()
+
+
+# ========== PIPELINE ==========
+
+def generate_tiktok(feed_item, report):
+    """Script -> audio -> rendu -> mise à jour du FeedItem ; lève une exception en cas d'échec."""
+    temp_dir = Path(settings.MEDIA_ROOT) / 'temp_video'
+    temp_dir.mkdir(parents=True, exist_ok=True)
+
+    # 1. Script
+    report('script', 5)
+    video_gen = AIVideoGenerator()
+    script_result = video_gen.generate_tiktok_script(feed_item)
+    if not script_result['success']:
+        raise Exception(f"Erreur script: {script_result['error']}")
+    script = script_result['script']
+
+    # 2. Audio
+    report('audio', 20)
+    audio_path = temp_dir / f"audio_{feed_item.pk}.mp3"
+    audio_result = video_gen.generate_audio(script, str(audio_path))
+    if not audio_result['success']:
+        raise Exception(f"Erreur audio: {audio_result['error']}")
+
+    # 3. Vidéo (sans sous-titres)
+    try:
+        video_result = TikTokVideoGenerator().generate_video(
+            feed_item, script, str(audio_path), None, on_progress=report
+        )
+    finally:
+        try:
+            os.remove(audio_path)
+        except OSError:
+            pass
+    if not video_result['success']:
+        raise Exception(f"Erreur vidéo: {video_result['error']}")
+
+    # 4. Mise à jour modèle
+    video_filename = Path(video_result['video_path']).name
+    feed_item.tiktok_video_url = f"/media/feed_videos/{video_filename}"
+    feed_item.tiktok_video_status = 'completed'
+    feed_item.tiktok_generation_date = datetime.utcnow()
+    feed_item.tiktok_metadata = {
+        'script': script,
+        'duration': video_result['duration'],
+        'word_count': script_result['word_count'],
+        'model': script_result['model']
+    }
+    feed_item.save()
+    return {'video_url': feed_item.tiktok_video_url, 'duration': video_result['duration']}
+
+
+def run_job(job):
+    try:
+        feed_item = FeedItem.objects.get(id=job.feed_item_id)
+    except FeedItem.DoesNotExist:
+        _finish(job, 'failed', error='Élément introuvable')
+        return
+
+    print(f"🎬 [job {job.pk}] Génération vidéo TikTok - {feed_item.title}")
+    FeedItem.objects(id=feed_item.pk).update(set__tiktok_video_status='processing')
+    try:
+        result = generate_tiktok(feed_item, lambda stage, progress: _report(job, stage, progress))
+    except RenderCancelled:
+        print(f"⏹️ [job {job.pk}] Annulée")
+        _finish(job, 'cancelled')
+        FeedItem.objects(id=feed_item.pk).update(set__tiktok_video_status='cancelled')
+    except Exception as e:
+        print(f"❌ [job {job.pk}] ERREUR: {e}")
+        _finish(job, 'failed', error=str(e))
+        FeedItem.objects(id=feed_item.pk).update(set__tiktok_video_status='failed')
+    else:
+        print(f"✅ [job {job.pk}] Vidéo générée: {result['video_url']}")
+        _finish(job, 'completed', result=result)
+
+
+# ========== POOL DE WORKERS ==========
+
+class VideoJobRunner:
+    def __init__(self, workers=None, poll_interval=None):
+        self.workers = _setting('FEED_VIDEO_INLINE_WORKERS', 1) if workers is None else workers
+        self.poll_interval = poll_interval or _setting('FEED_VIDEO_POLL_SECONDS', 2.0)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        self._pid = None
+
+    def _worker_name(self):
+        return f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+
+    def _alive(self):
+        return self._pid == os.getpid() and any(t.is_alive() for t in self._threads)
+
+    def ensure_started(self):
+        # Les threads ne survivent pas au fork : démarrage paresseux par processus
+        if self.workers <= 0 or self._alive():
+            return
+        with self._lock:
+            if self._alive():
+                return
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._threads = [
+                threading.Thread(target=self._loop, name=f"feed-video-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                job = claim(self._worker_name())
+            except Exception as e:
+                print(f"[feed] Erreur file vidéo: {e}")
+                job = None
+            if job is None:
+                self._stop.wait(self.poll_interval)
+                continue
+            run_job(job)
+
+    def run_once(self):
+        """Traite toutes les tâches disponibles dans le thread appelant."""
+        processed = 0
+        while True:
+            job = claim(self._worker_name())
+            if job is None:
+                return processed
+            run_job(job)
+            processed += 1
+
+    def run_forever(self):
+        """Boucle bloquante utilisée par ``run_video_worker``."""
+        self.ensure_started()
+        try:
+            while self._alive():
+                self._stop.wait(1.0)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+
+    def shutdown(self, timeout=5.0):
+        self._stop.set()
+        for thread in self._threads:
+            if thread.is_alive() and thread is not threading.current_thread():
+                thread.join(timeout)
+
+
+runner = VideoJobRunner()
@@ -0,0 +1,86 @@
+"""Vérification du contenu en temps réel pour l'éditeur (``ai_check_content``).
+
+Deux mécanismes gardent une latence stable quand le texte s'allonge :
+
+- l'analyse est incrémentale : ``text_analysis`` met en cache les
+  statistiques de chaque phrase, seule la phrase modifiée est ré-analysée ;
+- les rafales d'une même session sont regroupées (``SessionCoalescer``) :
+  une seule vérification tourne à la fois par session, une requête dépassée
+  par une plus récente est abandonnée sans calcul, et un texte identique à
+  la dernière vérification reçoit directement le résultat précédent.
+"""
+import threading
+from collections import OrderedDict
+
+from . import text_analysis
+from .ai_services import AIContentEnricher, AIWritingAssistant
+
+_assistant = AIWritingAssistant()
+_enricher = AIContentEnricher()
+
+
+def check_content(text, content_type):
+    """Résultat de la vérification (sans le champ ``success``)."""
+    features = text_analysis.features(text)
+    return {
+        'grammar_issues': _assistant.check_grammar(text)[:5],
+        'improvements': _assistant.suggest_improvements(text, content_type),
+        'extracted_dates': [d['text'] for d in _enricher.extract_dates(text)],
+        'tone_suggestion': _assistant._check_tone(text, content_type),
+        'sentiment': features.sentiment,
+        'engagement': features.engagement(content_type),
+        'quality_score': _assistant.calculate_quality_score(text, content_type),
+        'auto_correct': _assistant.auto_correct_common_errors(text),
+        'stats': {
+            'length': len(text),
+            'words': features.word_count,
+            'sentences': text.count('.') + text.count('!') + text.count('?')
+        }
+    }
+
+
+class _SessionState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latest = 0
+        self.last_key = None
+        self.last_result = None
+
+
+class SessionCoalescer:
+    """Regroupe les requêtes successives d'une même session.
+
+    ``run`` renvoie ``None`` quand la requête a été dépassée par une requête
+    plus récente de la même session pendant qu'elle attendait son tour.
+    """
+
+    def __init__(self, max_sessions=1000):
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()
+
+    def _ticket(self, session_key):
+        with self._lock:
+            state = self._sessions.get(session_key)
+            if state is None:
+                state = self._sessions[session_key] = _SessionState()
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session_key)
+            state.latest += 1
+            return state, state.latest
+
+    def run(self, session_key, payload_key, compute):
+        state, ticket = self._ticket(session_key)
+        with state.lock:
+            if ticket != state.latest:
+                return None
+            if state.last_key == payload_key:
+                return state.last_result
+            result = compute()
+            state.last_key, state.last_result = payload_key, result
+            return result
+
+
+coalescer = SessionCoalescer()
@@ -0,0 +1,64 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from feed import live_check, text_analysis
+
+SENTENCES = [
+    "Il faut rendre le rapport de stage avant le 12/03/2026.",
+    "Le cours de Python est vraiment excellent et très utile pour le projet.",
+    "Pensez à réviser le chapitre 4 sur les graphes, c'est important !",
+    "Merci de consulter le document PDF partagé sur la plateforme.",
+    "La séance de demain est déplacée en salle B204 à cause d'un problème technique.",
+    "Vous pouvez poser vos questions sur le forum si quelque chose n'est pas clair ?",
+]
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+class Command(BaseCommand):
+    help = ("Simule la saisie d'un long post dans l'éditeur et mesure la latence de "
+            "ai_check_content (p50/p95) avec et sans cache des phrases.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sentences", type=int, default=60)
+        parser.add_argument("--content-type", default="echeance")
+
+    def _measure(self, label, texts, content_type, cold):
+        latencies = []
+        for text in texts:
+            if cold:
+                text_analysis.segment.cache_clear()
+                text_analysis.features.cache_clear()
+            start = time.perf_counter()
+            live_check.check_content(text, content_type)
+            latencies.append((time.perf_counter() - start) * 1000)
+        self.stdout.write(
+            f"{label:<28}{len(texts):>8}{_percentile(latencies, 50):>10.2f}"
+            f"{_percentile(latencies, 95):>10.2f}{max(latencies):>10.2f}"
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        content_type = options["content_type"]
+        text = ""
+        texts = []
+        # Une requête tous les quelques mots, comme un éditeur qui vérifie pendant la frappe
+        for i in range(options["sentences"]):
+            # Phrases toutes différentes, comme dans un vrai post
+            words = rng.choice(SENTENCES).split()
+            words.insert(rng.randrange(len(words)), f"(point {i + 1})")
+            for word in words:
+                text += word + " "
+                if rng.random() < 0.3:
+                    texts.append(text.strip())
+
+        self.stdout.write(f"{'mode':<28}{'requêtes':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+        self._measure("texte complet (à froid)", texts, content_type, cold=True)
+        text_analysis.segment.cache_clear()
+        text_analysis.features.cache_clear()
+        self._measure("incrémental (phrases)", texts, content_type, cold=False)
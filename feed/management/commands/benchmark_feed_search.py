@@ -0,0 +1,79 @@
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from mongoengine.context_managers import switch_collection
+
+from feed.models import FeedItem
+from feed.pagination import order_queryset
+from feed.search import search_feed_items
+
+WORDS = (
+    "examen inscription cours programme ressource échéance annonce projet rapport soutenance "
+    "mathématiques physique informatique algorithmique réseau données stage semestre module "
+    "bibliothèque séance révision planning rendu laboratoire tutorat atelier conférence"
+).split()
+
+
+class Command(BaseCommand):
+    help = "Compare la latence de la recherche du feed : regex échappée vs index texte MongoDB."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+        parser.add_argument("--queries", nargs="+", default=["examen", "soutenance projet", "laboratoire réseau"])
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--page-size", type=int, default=10)
+        parser.add_argument("--collection", default="feed_feeditem_benchmark")
+
+    def _seed(self, collection, size):
+        rng = random.Random(size)
+        now = datetime.utcnow()
+        batch = []
+        for i in range(size):
+            batch.append({
+                "title": " ".join(rng.choices(WORDS, k=4)).capitalize(),
+                "description": " ".join(rng.choices(WORDS, k=40)),
+                "content_type": rng.choice([c for c, _ in FeedItem.CONTENT_TYPE_CHOICES]),
+                "author_id": f"{rng.randrange(500):024x}",
+                "created_at": now - timedelta(minutes=i),
+                "updated_at": now,
+                "is_active": True,
+            })
+            if len(batch) == 5000:
+                collection.insert_many(batch, ordered=False)
+                batch = []
+        if batch:
+            collection.insert_many(batch, ordered=False)
+
+    def _time(self, fn, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
+
+    def handle(self, *args, **options):
+        page_size = options["page_size"]
+        with switch_collection(FeedItem, options["collection"]) as Bench:
+            collection = Bench._get_collection()
+            try:
+                for size in options["sizes"]:
+                    collection.delete_many({})
+                    self.stdout.write(f"Insertion de {size} éléments...")
+                    self._seed(collection, size)
+                    Bench.ensure_indexes()
+
+                    self.stdout.write(f"\n{size} éléments (médiane sur {options['repeat']} essais, page de {page_size})")
+                    self.stdout.write(f"{'requête':<24}{'mode':<8}{'page 1 (ms)':>14}{'count (ms)':>14}{'résultats':>12}")
+                    for query in options["queries"]:
+                        for mode in ("regex", "text"):
+                            qs, used = search_feed_items(Bench.objects(is_active=True), query, mode=mode)
+                            qs = order_queryset(qs, "relevance" if used == "text" else "-created_at")
+                            page = self._time(lambda: list(qs.limit(page_size)), options["repeat"])
+                            count = self._time(qs.count, options["repeat"])
+                            self.stdout.write(f"{query:<24}{used:<8}{page:>14.1f}{count:>14.1f}{qs.count():>12}")
+            finally:
+                collection.drop()
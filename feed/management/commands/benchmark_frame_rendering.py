@@ -0,0 +1,69 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from PIL import Image, ImageDraw
+
+from feed import frame_renderer
+
+TITLES = [
+    "Examen final de réseaux informatiques",
+    "Date limite du rapport de stage",
+    "Nouvelle ressource : cours d'algorithmique avancée",
+    "Séance de révision mathématiques",
+    "Annonce importante pour tous les étudiants du semestre 5",
+]
+
+
+def legacy_frame(title, content_type, width=1080, height=1920):
+    """Ancien rendu (dégradé ligne à ligne, contour en 25 passes, polices rechargées)."""
+    color_top, color_bottom = frame_renderer.COLORS.get(content_type, frame_renderer.COLORS['programme'])
+    img = Image.new('RGB', (width, height))
+    draw = ImageDraw.Draw(img)
+    for y in range(height):
+        ratio = y / height
+        fill = tuple(int(color_top[i] * (1 - ratio) + color_bottom[i] * ratio) for i in range(3))
+        draw.line([(0, y), (width, y)], fill=fill)
+    frame_renderer.load_font.cache_clear()
+    font = frame_renderer.load_font(frame_renderer.TITLE_FONTS)
+    y_text = 700
+    for line in frame_renderer.wrap_text(title[:40], font, width - 100):
+        for adj in range(-2, 3):
+            for adj2 in range(-2, 3):
+                draw.text((540 + adj, y_text + adj2), line, font=font, fill=(0, 0, 0))
+        draw.text((540, y_text), line, font=font, fill=(255, 255, 255))
+        y_text += 60
+    return img
+
+
+class Command(BaseCommand):
+    help = "Mesure le débit (images/s) du rendu des images TikTok : ancien rendu, images et vignettes en lot."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--frames", type=int, default=50)
+        parser.add_argument("--thumb-width", type=int, default=270)
+
+    def _rate(self, label, fn, n):
+        start = time.perf_counter()
+        for i in range(n):
+            fn(i)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"{label:<36}{n:>8}{n / elapsed:>14.1f}{elapsed * 1000 / n:>14.2f}")
+
+    def handle(self, *args, **options):
+        n = options["frames"]
+        rng = random.Random(0)
+        posts = [(rng.choice(TITLES), rng.choice(list(frame_renderer.COLORS))) for _ in range(n)]
+
+        self.stdout.write(f"{'rendu':<36}{'images':>8}{'images/s':>14}{'ms/image':>14}")
+        self._rate("ancien (1080x1920)", lambda i: legacy_frame(*posts[i]), max(1, n // 5))
+
+        frame_renderer.background.cache_clear()
+        frame_renderer.load_font.cache_clear()
+        self._rate("nouveau, fonds à froid (1080x1920)", lambda i: (
+            frame_renderer.background.cache_clear(), frame_renderer.render_frame(*posts[i])
+        ), max(1, n // 5))
+        self._rate("nouveau, fonds en cache (1080x1920)", lambda i: frame_renderer.render_frame(*posts[i]), n)
+
+        width = options["thumb_width"]
+        self._rate(f"vignettes en lot ({width}px)", lambda i: frame_renderer.render_thumbnail(*posts[i], width=width), n)
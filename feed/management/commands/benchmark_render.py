@@ -0,0 +1,46 @@
+import os
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand, CommandError
+
+from feed.render_backends import BACKENDS, RenderError
+from feed.video_generator import TikTokVideoGenerator
+
+
+class Command(BaseCommand):
+    help = ("Compare les moteurs de rendu vidéo (temps total image + montage) "
+            "sur un même MP3, par ex. --backends local shotstack")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--audio", required=True, help="Fichier MP3 de narration")
+        parser.add_argument("--backends", nargs="+", default=["local"], choices=sorted(BACKENDS))
+        parser.add_argument("--runs", type=int, default=3)
+
+    def handle(self, *args, **options):
+        if not os.path.exists(options["audio"]):
+            raise CommandError(f"Fichier audio introuvable: {options['audio']}")
+        item = SimpleNamespace(
+            pk="benchmark", title="Examen final de réseaux : révisez les chapitres 3 à 5",
+            content_type="echeance", created_at=datetime.utcnow(),
+        )
+
+        self.stdout.write(f"{'moteur':<12}{'essais':>8}{'moyenne s':>12}{'min s':>10}{'max s':>10}")
+        for name in options["backends"]:
+            try:
+                generator = TikTokVideoGenerator(backend=name)
+            except RenderError as e:
+                raise CommandError(f"{name}: {e}")
+            timings = []
+            for _ in range(max(1, options["runs"])):
+                start = time.perf_counter()
+                result = generator.generate_video(item, "", options["audio"], None)
+                if not result["success"]:
+                    raise CommandError(f"{name}: {result['error']}")
+                timings.append(time.perf_counter() - start)
+                os.remove(result["video_path"])
+            self.stdout.write(
+                f"{name:<12}{len(timings):>8}{sum(timings) / len(timings):>12.2f}"
+                f"{min(timings):>10.2f}{max(timings):>10.2f}"
+            )
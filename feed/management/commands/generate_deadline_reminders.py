@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from feed import reminders
+
+
+class Command(BaseCommand):
+    help = ("Crée en lot les rappels des échéances proches (un par échéance et par jour). "
+            "À planifier (cron), par ex. toutes les heures.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=reminders.DEFAULT_HORIZON_DAYS,
+                            help="Horizon des échéances en jours")
+        parser.add_argument("--author-id", default=None,
+                            help="Auteur des rappels (par défaut : l'auteur du post source)")
+
+    def handle(self, *args, **options):
+        result = reminders.generate_reminders(author_id=options["author_id"], horizon_days=options["days"])
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['created']} rappel(s) créé(s) sur {result['candidates']} échéance(s) proche(s)"
+        ))
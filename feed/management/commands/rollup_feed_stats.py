@@ -0,0 +1,18 @@
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+
+from feed import dashboard
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'agrégat quotidien du tableau de bord IA (collection feed_daily_stats)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=0,
+                            help="Ne reconstruire que les N derniers jours (0 = tout l'historique)")
+
+    def handle(self, *args, **options):
+        since = datetime.utcnow() - timedelta(days=options["days"]) if options["days"] else None
+        count = dashboard.rebuild(since=since)
+        self.stdout.write(self.style.SUCCESS(f"{count} jour(s) agrégé(s)"))
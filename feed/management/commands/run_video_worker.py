@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from feed.jobs import VideoJobRunner
+
+
+class Command(BaseCommand):
+    help = "Exécute les tâches de génération vidéo TikTok en file (processus dédié)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument("--once", action="store_true", help="Traite les tâches en file puis s'arrête")
+
+    def handle(self, *args, **options):
+        runner = VideoJobRunner(workers=max(1, options["workers"]))
+        if options["once"]:
+            processed = runner.run_once()
+            self.stdout.write(self.style.SUCCESS(f"{processed} tâche(s) traitée(s)"))
+            return
+        self.stdout.write(f"Worker vidéo démarré ({runner.workers} thread(s)), Ctrl+C pour arrêter")
+        runner.run_forever()
@@ -1,4 +1,6 @@
-from mongoengine import Document, StringField, DateTimeField, BooleanField, ListField, FloatField, DictField
+from mongoengine import (
+    Document, StringField, DateTimeField, BooleanField, ListField, FloatField, DictField, IntField,
+)
 from datetime import datetime, timedelta
 from django.utils import timezone
 
@@ -35,15 +37,24 @@ class FeedItem(Document):
     ai_tone = StringField(max_length=50, verbose_name="Ton détecté")
     suggested_resources = ListField(StringField(), verbose_name="Ressources suggérées")
     is_ai_generated = BooleanField(default=False, verbose_name="Généré par IA")
+    ai_analysis = DictField(verbose_name="Analyse IA (sentiment, émotion, engagement...)")
+    ai_analysis_hash = StringField(max_length=40, null=True, verbose_name="Empreinte du texte analysé")
+    # Rappels d'échéance générés (voir feed/reminders.py) : post source et jour du rappel.
+    # Sans null=True, un post ordinaire n'écrit pas ces champs et reste hors de
+    # l'index partiel one_reminder_per_item_per_day ($exists correspond aussi à null)
+    reminder_for = StringField(max_length=24, verbose_name="Rappel de")
+    reminder_day = StringField(max_length=10, verbose_name="Jour du rappel")
 
     tiktok_video_url = StringField(null=True, verbose_name="URL Vidéo TikTok")
     tiktok_video_status = StringField(
         max_length=20,
         choices=[
             ('pending', 'En attente'),
+            ('queued', 'En file d\'attente'),
             ('processing', 'En cours'),
             ('completed', 'Terminé'),
-            ('failed', 'Échec')
+            ('failed', 'Échec'),
+            ('cancelled', 'Annulé')
         ],
         default='pending',
         verbose_name="Statut Vidéo"
@@ -54,7 +65,28 @@ class FeedItem(Document):
     meta = {
         'collection': 'feed_feeditem',
         'ordering': ['-created_at'],
-        'indexes': ['author_id', 'content_type', 'is_active', '-created_at']
+        'indexes': [
+            'author_id', 'content_type', 'is_active', '-created_at',
+            # Pagination (tri + _id) et statistiques du feed
+            ('is_active', '-created_at', '-id'),
+            ('is_active', 'content_type', '-created_at'),
+            ('is_active', 'deadline'),
+            # Tableau de bord IA : top qualité (voir feed/dashboard.py)
+            ('is_active', '-ai_quality_score', '-created_at'),
+            # Un seul rappel par échéance et par jour (voir feed/reminders.py)
+            {
+                'fields': ['reminder_for', 'reminder_day'],
+                'unique': True,
+                'partialFilterExpression': {'reminder_for': {'$exists': True}},
+                'name': 'one_reminder_per_item_per_day',
+            },
+            # Recherche plein texte (voir feed/search.py)
+            {
+                'fields': ['$title', '$description'],
+                'default_language': 'french',
+                'weights': {'title': 10, 'description': 2},
+            },
+        ]
     }
     
     def __str__(self):
@@ -62,12 +94,11 @@ def __str__(self):
     
     @property
     def author(self):
-        """Récupère l'objet User depuis MongoDB"""
-        try:
-            from accounts.models import User
-            return User.objects.get(id=self.author_id)
-        except Exception:
-            return None
+        """Récupère l'objet User (hydraté par lot, sinon via le cache d'auteurs)"""
+        if '_author' not in self.__dict__:
+            from .authors import get_user
+            self._author = get_user(self.author_id)
+        return self._author
     
     def get_author_username(self):
         """Retourne le nom d'utilisateur ou 'Utilisateur inconnu'"""
@@ -90,4 +121,108 @@ def is_urgent(self):
     def save(self, *args, **kwargs):
         """Met à jour la date de modification"""
         self.updated_at = datetime.utcnow()
-        return super().save(*args, **kwargs)
\ No newline at end of file
+        result = super().save(*args, **kwargs)
+        from .pagination import invalidate_stats
+        from .dashboard import mark_day_dirty
+        invalidate_stats()
+        mark_day_dirty(self.created_at)
+        return result
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        from .pagination import invalidate_stats
+        from .dashboard import mark_day_dirty
+        invalidate_stats()
+        mark_day_dirty(self.created_at)
+        return result
+
+
+class VideoJob(Document):
+    """
+    Tâche de génération vidéo TikTok exécutée hors requête (voir feed/jobs.py)
+    """
+    STATUS_CHOICES = [
+        ('queued', 'En file d\'attente'),
+        ('running', 'En cours'),
+        ('completed', 'Terminé'),
+        ('failed', 'Échec'),
+        ('cancelled', 'Annulé'),
+    ]
+    ACTIVE_STATUSES = ('queued', 'running')
+    
+    feed_item_id = StringField(max_length=24, required=True)
+    requested_by = StringField(max_length=24)
+    status = StringField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    # Vrai tant que la tâche est en file ou en cours : une seule par FeedItem
+    active = BooleanField(default=True)
+    stage = StringField(max_length=20, default='')
+    progress = IntField(default=0)
+    error = StringField()
+    attempts = IntField(default=0)
+    cancel_requested = BooleanField(default=False)
+    worker = StringField(max_length=100)
+    result = DictField()
+    created_at = DateTimeField(default=datetime.utcnow)
+    started_at = DateTimeField(null=True)
+    finished_at = DateTimeField(null=True)
+    heartbeat_at = DateTimeField(null=True)
+    
+    meta = {
+        'collection': 'feed_videojob',
+        'ordering': ['-created_at'],
+        'indexes': [
+            ('status', 'created_at'),
+            ('feed_item_id', '-created_at'),
+            {
+                'fields': ['feed_item_id'],
+                'unique': True,
+                'partialFilterExpression': {'active': True},
+                'name': 'one_active_job_per_item',
+            },
+        ]
+    }
+    
+    def __str__(self):
+        return f"VideoJob {self.pk} ({self.status})"
+    
+    @property
+    def is_active(self):
+        return self.status in self.ACTIVE_STATUSES
+    
+    def as_dict(self):
+        return {
+            'id': str(self.pk),
+            'status': self.status,
+            'stage': self.stage,
+            'progress': self.progress,
+            'error': self.error,
+            'attempts': self.attempts,
+            'cancel_requested': self.cancel_requested,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class FeedDailyStats(Document):
+    """
+    Agrégat quotidien des posts actifs (par jour de création) pour le tableau
+    de bord IA ; recalculé quand un post du jour change (voir feed/dashboard.py)
+    """
+    day = DateTimeField(required=True, unique=True)
+    total = IntField(default=0)
+    quality_sum = FloatField(default=0.0)
+    # [{'key': 'programme', 'count': 3}, ...] (pas de DictField : clés libres)
+    by_type = ListField(DictField())
+    by_tone = ListField(DictField())
+    dirty = BooleanField(default=True)
+    version = IntField(default=0)
+    computed_at = DateTimeField(null=True)
+
+    meta = {
+        'collection': 'feed_daily_stats',
+        'indexes': ['dirty'],
+    }
+
+    def __str__(self):
+        return f"FeedDailyStats({self.day:%Y-%m-%d}, {self.total})"
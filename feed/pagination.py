@@ -0,0 +1,195 @@
+"""Pagination et statistiques du feed calculées côté MongoDB.
+
+- ``FeedPaginator`` : ``Paginator`` Django qui compte avec ``count()`` et
+  découpe la QuerySet MongoEngine (skip/limit) au lieu de charger toute la
+  collection en mémoire.
+- ``cursor_page`` : pagination par curseur (clé de tri + ``_id``) pour le
+  défilement infini ; le coût d'une page ne dépend pas de sa profondeur.
+  Le tri par pertinence (recherche texte) utilise un curseur à décalage.
+- ``feed_stats`` : statistiques du bandeau, mises en cache avec un TTL court
+  (``FEED_STATS_TTL``) et invalidées à chaque sauvegarde d'un FeedItem.
+"""
+import base64
+import json
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+from .search import search_feed_items
+
+STATS_CACHE_KEY = 'feed:stats'
+
+# Tri accepté par FeedItemSearchForm -> (champ, sens)
+ORDERINGS = {
+    '-created_at': ('created_at', -1),
+    'created_at': ('created_at', 1),
+    'title': ('title', 1),
+    '-title': ('title', -1),
+}
+DEFAULT_ORDERING = '-created_at'
+# Tri par score $text : pas de clé comparable, le curseur porte un décalage
+RELEVANCE = 'relevance'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def filter_feed_items(queryset, search_form):
+    """Applique recherche, type et tri du formulaire à ``queryset``.
+
+    Avec une recherche plein texte et sans tri explicite, les résultats sont
+    triés par pertinence.
+    """
+    ordering = DEFAULT_ORDERING
+    if search_form.is_valid():
+        searched = False
+        search_query = search_form.cleaned_data.get('search_query')
+        if search_query:
+            queryset, mode = search_feed_items(queryset, search_query)
+            searched = mode == 'text'
+
+        content_type = search_form.cleaned_data.get('content_type')
+        if content_type:
+            queryset = queryset.filter(content_type=content_type)
+
+        ordering = search_form.cleaned_data.get('ordering') or (RELEVANCE if searched else DEFAULT_ORDERING)
+        if ordering == RELEVANCE and not searched:
+            ordering = DEFAULT_ORDERING
+    return queryset, ordering
+
+
+def order_queryset(queryset, ordering):
+    """Tri stable : la clé demandée puis ``_id`` dans le même sens."""
+    if ordering == RELEVANCE:
+        return queryset.order_by('$text_score', '-id')
+    field, direction = ORDERINGS.get(ordering, ORDERINGS[DEFAULT_ORDERING])
+    prefix = '-' if direction < 0 else ''
+    return queryset.order_by(f'{prefix}{field}', f'{prefix}id')
+
+
+class FeedPaginator(Paginator):
+    """Paginator qui laisse MongoDB compter et découper (skip/limit)."""
+
+    @cached_property
+    def count(self):
+        # Paginator.count retomberait sur len(), qui charge toute la QuerySet
+        return self.object_list.count()
+
+
+# ========== PAGINATION PAR CURSEUR ==========
+
+def _encode(data):
+    payload = json.dumps(data, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def _decode(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+
+
+def encode_cursor(item, ordering):
+    field, _ = ORDERINGS.get(ordering, ORDERINGS[DEFAULT_ORDERING])
+    value = getattr(item, field)
+    if isinstance(value, datetime):
+        value = {'$date': value.isoformat()}
+    return _encode({'o': ordering, 'v': value, 'id': str(item.id)})
+
+
+def decode_cursor(cursor, ordering):
+    """Retourne ``(valeur, ObjectId)`` ; lève InvalidCursor si illisible."""
+    try:
+        data = _decode(cursor)
+        value = data['v']
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value['$date'])
+        last_id = ObjectId(data['id'])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise InvalidCursor(f'Curseur invalide: {e}')
+    if data.get('o') != ordering:
+        raise InvalidCursor('Curseur émis pour un autre tri')
+    return value, last_id
+
+
+def _decode_offset(cursor):
+    try:
+        data = _decode(cursor)
+        offset = int(data['skip'])
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor(f'Curseur invalide: {e}')
+    if data.get('o') != RELEVANCE or offset < 0:
+        raise InvalidCursor('Curseur émis pour un autre tri')
+    return offset
+
+
+def cursor_filter(ordering, value, last_id):
+    """Condition ``$or`` des éléments situés strictement après le curseur."""
+    field, direction = ORDERINGS.get(ordering, ORDERINGS[DEFAULT_ORDERING])
+    op = '$lt' if direction < 0 else '$gt'
+    return {
+        '$or': [
+            {field: {op: value}},
+            {field: value, '_id': {op: last_id}},
+        ]
+    }
+
+
+def cursor_page(queryset, ordering, cursor=None, limit=20):
+    """Page de ``limit`` éléments après ``cursor``.
+
+    Retourne ``(items, next_cursor)`` ; ``next_cursor`` vaut None en fin de liste.
+    """
+    if ordering == RELEVANCE:
+        offset = _decode_offset(cursor) if cursor else 0
+        items = list(order_queryset(queryset, ordering).skip(offset).limit(limit + 1))
+        if len(items) > limit:
+            return items[:limit], _encode({'o': RELEVANCE, 'skip': offset + limit})
+        return items, None
+
+    if ordering not in ORDERINGS:
+        ordering = DEFAULT_ORDERING
+    if cursor:
+        value, last_id = decode_cursor(cursor, ordering)
+        queryset = queryset.filter(__raw__=cursor_filter(ordering, value, last_id))
+    # Un élément de plus pour savoir s'il existe une page suivante
+    items = list(order_queryset(queryset, ordering).limit(limit + 1))
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1], ordering)
+    return items, next_cursor
+
+
+# ========== STATISTIQUES ==========
+
+def _compute_stats():
+    from .models import FeedItem
+    now = datetime.utcnow()
+    active = FeedItem.objects(is_active=True)
+    return {
+        'total_items': active.count(),
+        'content_types': len(active.distinct('content_type')),
+        'urgent_items': active.filter(
+            deadline__lte=now + timedelta(days=3),
+            deadline__gte=now
+        ).count()
+    }
+
+
+def feed_stats():
+    """Statistiques du feed, recalculées au plus toutes les ``FEED_STATS_TTL`` secondes."""
+    stats = cache.get(STATS_CACHE_KEY)
+    if stats is None:
+        stats = _compute_stats()
+        cache.set(STATS_CACHE_KEY, stats, getattr(settings, 'FEED_STATS_TTL', 60))
+    return stats
+
+
+def invalidate_stats():
+    cache.delete(STATS_CACHE_KEY)
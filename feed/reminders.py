@@ -0,0 +1,110 @@
+"""Génération par lot des rappels d'échéance.
+
+Pour toutes les échéances proches :
+1. une requête sur l'index ``(is_active, deadline)`` récupère les posts candidats
+   (hors rappels eux-mêmes) ;
+2. une seule requête ``reminder_for $in [...]`` trouve les rappels déjà créés
+   aujourd'hui ;
+3. les nouveaux rappels sont insérés en un seul ``insert_many`` non ordonné.
+   L'index unique ``(reminder_for, reminder_day)`` garantit un rappel par
+   échéance et par jour même si la commande planifiée et le bouton tournent
+   en même temps : les doublons sont simplement ignorés.
+
+Lancement planifié : ``manage.py generate_deadline_reminders`` (cron).
+"""
+from datetime import datetime, timedelta
+
+from pymongo.errors import BulkWriteError
+
+from .ai_services import AIRecurringContentGenerator
+from .models import FeedItem
+
+DEFAULT_HORIZON_DAYS = 3
+
+# Champs produits par le générateur qui ne sont pas des champs du document
+_EXTRA_KEYS = ('priority',)
+
+
+def reminder_day(now):
+    return now.strftime('%Y-%m-%d')
+
+
+def candidates(now, horizon_days=DEFAULT_HORIZON_DAYS):
+    """Posts actifs dont l'échéance tombe dans les ``horizon_days`` prochains jours."""
+    return list(FeedItem.objects(
+        is_active=True,
+        deadline__gte=now,
+        deadline__lte=now + timedelta(days=horizon_days),
+        reminder_for=None,
+    ).only('id', 'title', 'description', 'deadline', 'author_id'))
+
+
+def existing_reminders(item_ids, day):
+    """Identifiants des posts ayant déjà un rappel ce jour-là (une seule requête)."""
+    if not item_ids:
+        return set()
+    return set(FeedItem.objects(reminder_for__in=list(item_ids), reminder_day=day).distinct('reminder_for'))
+
+
+def build_reminders(items, already_reminded, now, author_id=None):
+    """Documents de rappel (non enregistrés) pour les posts sans rappel du jour."""
+    generator = AIRecurringContentGenerator()
+    day = reminder_day(now)
+    reminders = []
+    for item in items:
+        item_id = str(item.pk)
+        if item_id in already_reminded:
+            continue
+        data = generator.generate_deadline_reminder(item, now)
+        if not data:
+            continue
+        for key in _EXTRA_KEYS:
+            data.pop(key, None)
+        reminder = FeedItem(
+            **data,
+            author_id=str(author_id or item.author_id),
+            reminder_for=item_id,
+            reminder_day=day,
+            created_at=now,
+            updated_at=now,
+        )
+        reminder.validate()
+        reminders.append(reminder)
+    return reminders
+
+
+def insert_reminders(reminders):
+    """Insère les rappels en une seule opération ; renvoie le nombre réellement créé."""
+    if not reminders:
+        return 0
+    collection = FeedItem._get_collection()
+    try:
+        result = collection.insert_many([r.to_mongo() for r in reminders], ordered=False)
+        inserted = len(result.inserted_ids)
+    except BulkWriteError as e:
+        # Doublons (rappel créé en parallèle) ignorés ; autres erreurs remontées
+        errors = e.details.get('writeErrors', [])
+        if any(err.get('code') != 11000 for err in errors):
+            raise
+        inserted = e.details.get('nInserted', 0)
+    if inserted:
+        # insert_many contourne FeedItem.save : invalider les statistiques à la main
+        from .dashboard import mark_day_dirty
+        from .pagination import invalidate_stats
+        invalidate_stats()
+        mark_day_dirty(reminders[0].created_at)
+    return inserted
+
+
+def generate_reminders(author_id=None, now=None, horizon_days=DEFAULT_HORIZON_DAYS):
+    """Crée les rappels manquants ; renvoie ``{'candidates', 'created', 'skipped'}``."""
+    now = now or datetime.utcnow()
+    items = candidates(now, horizon_days)
+    already_reminded = existing_reminders([str(item.pk) for item in items], reminder_day(now))
+    reminders = build_reminders(items, already_reminded, now, author_id)
+    created = insert_reminders(reminders)
+    return {
+        'candidates': len(items),
+        'created': created,
+        'skipped': len(items) - created,
+    }
@@ -0,0 +1,278 @@
+"""Moteurs de rendu des vidéos TikTok (image fixe + piste audio -> MP4).
+
+``TikTokVideoGenerator`` prépare l'image puis délègue le montage au moteur
+choisi par ``VIDEO_RENDER_BACKEND`` :
+
+- ``shotstack`` : API cloud. Les deux fichiers sont envoyés en parallèle à
+  l'hébergeur temporaire, toutes les requêtes passent par une session HTTP
+  partagée (connexions réutilisées, délais d'attente) et la vidéo finale est
+  téléchargée par blocs dans un fichier, sans passer par la mémoire ;
+- ``local`` : ffmpeg sur la machine (aucun aller-retour réseau). La
+  progression est lue sur ``-progress`` et l'encodage est interrompu dès
+  qu'une annulation est demandée.
+
+Un moteur expose ``render(image_path, audio_path, output_path, report)`` et
+renvoie la durée de la vidéo en secondes ; ``report(stage, percent)`` peut
+lever ``RenderCancelled``.
+"""
+import os
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .audio_info import mp3_duration
+
+
+class RenderCancelled(Exception):
+    """Levée par le callback de progression pour interrompre un rendu"""
+
+
+class RenderError(Exception):
+    pass
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# ========== SHOTSTACK (CLOUD) ==========
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def http_session():
+    """Session partagée par les threads du processus (pool de connexions keep-alive)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            # Seules les lectures (GET) sont rejouées : un POST de rendu ne doit pas être dupliqué
+            retries = Retry(total=2, backoff_factor=0.5, status_forcelist=(502, 503, 504), allowed_methods=['GET'])
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+        return _session
+
+
+class ShotstackBackend:
+    name = 'shotstack'
+    upload_headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    }
+
+    def __init__(self):
+        self.api_key = _setting('SHOTSTACK_API_KEY', '')
+        if not self.api_key:
+            raise RenderError("SHOTSTACK_API_KEY non défini (ou VIDEO_RENDER_BACKEND=local pour ffmpeg)")
+        self.base_url = _setting('SHOTSTACK_BASE_URL', 'https://api.shotstack.io/edit/v1')
+        self.upload_url = _setting('VIDEO_UPLOAD_URL', 'https://litterbox.catbox.moe/resources/internals/api.php')
+        self.poll_interval = _setting('SHOTSTACK_POLL_SECONDS', 10)
+        self.max_polls = _setting('SHOTSTACK_MAX_POLLS', 30)
+        # (connexion, lecture) en secondes
+        self.timeout = (10, _setting('VIDEO_HTTP_TIMEOUT', 60))
+        self.session = http_session()
+
+    @property
+    def headers(self):
+        return {'Content-Type': 'application/json', 'x-api-key': self.api_key}
+
+    def upload_file(self, local_path):
+        """Upload fichier vers litterbox.catbox.moe pour URL directe (temporaire 12h)"""
+        with open(local_path, 'rb') as f:
+            response = self.session.post(
+                self.upload_url,
+                files={'fileToUpload': f},
+                data={'reqtype': 'fileupload', 'time': '12h'},  # Durée : 1h, 12h, 24h, 72h
+                headers=self.upload_headers,
+                timeout=self.timeout,
+            )
+        if response.ok:
+            return response.text.strip()
+        raise RenderError(f"Échec upload: {response.text}")
+
+    def upload_files(self, *paths):
+        """Uploads en parallèle ; URLs dans l'ordre des chemins."""
+        with ThreadPoolExecutor(max_workers=len(paths), thread_name_prefix='video-upload') as pool:
+            return list(pool.map(self.upload_file, paths))
+
+    @staticmethod
+    def payload(image_url, audio_url):
+        return {
+            "timeline": {
+                "soundtrack": {
+                    "src": audio_url,
+                    "effect": "fadeIn"
+                },
+                "tracks": [
+                    {
+                        "clips": [
+                            {
+                                "asset": {
+                                    "type": "image",
+                                    "src": image_url
+                                },
+                                "start": 0,
+                                "length": 60
+                            }
+                        ]
+                    }
+                ]
+            },
+            "output": {
+                "format": "mp4",
+                "resolution": "hd"
+            }
+        }
+
+    def wait_for_render(self, render_id, report):
+        print("⏳ Attente du rendu (1-2 minutes)...")
+        for attempt in range(self.max_polls):
+            report('render', 50 + int(40 * attempt / self.max_polls))
+            response = self.session.get(f"{self.base_url}/render/{render_id}", headers=self.headers, timeout=self.timeout)
+            if not response.ok:
+                raise RenderError(f"Erreur status: {response.text}")
+            status = response.json()['response']
+            if status['status'] == 'done':
+                return status
+            if status['status'] in ['failed', 'cancelled']:
+                raise RenderError(f"Rendu échoué: {status.get('error', 'Inconnu')}")
+            time.sleep(self.poll_interval)
+        raise RenderError("Timeout rendu")
+
+    def download(self, url, output_path):
+        """Téléchargement par blocs dans un fichier temporaire renommé à la fin."""
+        partial = f"{output_path}.part"
+        try:
+            with self.session.get(url, stream=True, timeout=self.timeout) as response:
+                response.raise_for_status()
+                with open(partial, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=1024 * 1024):
+                        f.write(chunk)
+            os.replace(partial, output_path)
+        except BaseException:
+            _remove(partial)
+            raise
+
+    def render(self, image_path, audio_path, output_path, report):
+        print("📤 Upload des fichiers...")
+        report('upload', 45)
+        image_url, audio_url = self.upload_files(image_path, audio_path)
+
+        print("🔗 Préparation du payload...")
+        report('render', 50)
+        response = self.session.post(
+            f"{self.base_url}/render", json=self.payload(image_url, audio_url),
+            headers=self.headers, timeout=self.timeout,
+        )
+        if not response.ok:
+            raise RenderError(f"Erreur API: {response.text}")
+        status = self.wait_for_render(response.json()['response']['id'], report)
+
+        report('download', 92)
+        self.download(status['url'], output_path)
+        return status.get('duration', 30)
+
+
+# ========== FFMPEG (LOCAL) ==========
+
+def ffmpeg_binary():
+    """ffmpeg configuré, sinon celui du PATH, sinon celui d'imageio-ffmpeg s'il est installé."""
+    configured = _setting('VIDEO_FFMPEG_BINARY', '')
+    if configured:
+        return configured
+    found = shutil.which('ffmpeg')
+    if found:
+        return found
+    try:
+        import imageio_ffmpeg
+    except ImportError:
+        return None
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+class LocalFFmpegBackend:
+    name = 'local'
+
+    def __init__(self):
+        self.binary = ffmpeg_binary()
+        self.fps = _setting('VIDEO_LOCAL_FPS', 25)
+        self.preset = _setting('VIDEO_LOCAL_PRESET', 'veryfast')
+
+    def command(self, image_path, audio_path, output_path):
+        return [
+            self.binary, '-y', '-hide_banner', '-loglevel', 'error', '-nostats',
+            '-progress', 'pipe:1',
+            # Image fixe répétée pendant toute la durée de l'audio
+            '-loop', '1', '-framerate', str(self.fps), '-i', str(image_path),
+            '-i', str(audio_path),
+            '-c:v', 'libx264', '-preset', self.preset, '-tune', 'stillimage', '-pix_fmt', 'yuv420p',
+            '-c:a', 'aac', '-b:a', '128k',
+            '-shortest', '-movflags', '+faststart',
+            str(output_path),
+        ]
+
+    def render(self, image_path, audio_path, output_path, report):
+        if not self.binary:
+            raise RenderError("ffmpeg introuvable (installez ffmpeg ou définissez VIDEO_FFMPEG_BINARY)")
+        duration = mp3_duration(audio_path)
+        partial = f"{output_path}.part.mp4"
+        print("🎞️ Encodage local (ffmpeg)...")
+        report('render', 50)
+        process = subprocess.Popen(
+            self.command(image_path, audio_path, partial),
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+        )
+        encoded = 0.0
+        try:
+            for line in process.stdout:
+                key, _, value = line.strip().partition('=')
+                if key == 'out_time_us' and value.isdigit():
+                    encoded = int(value) / 1_000_000
+                    if duration:
+                        report('render', 50 + int(40 * min(encoded / duration, 1)))
+            errors = process.stderr.read()
+            if process.wait() != 0:
+                raise RenderError(f"Erreur ffmpeg: {errors.strip() or process.returncode}")
+            os.replace(partial, output_path)
+        except BaseException:
+            # Annulation (levée par report) ou échec : arrêter ffmpeg et nettoyer
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            _remove(partial)
+            raise
+        finally:
+            process.stdout.close()
+            process.stderr.close()
+        report('render', 90)
+        return duration or encoded
+
+
+BACKENDS = {
+    ShotstackBackend.name: ShotstackBackend,
+    LocalFFmpegBackend.name: LocalFFmpegBackend,
+}
+
+
+def get_backend(name=None):
+    name = name or _setting('VIDEO_RENDER_BACKEND', 'shotstack')
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise RenderError(f"Moteur de rendu inconnu: {name}")
@@ -0,0 +1,87 @@
+"""Recherche plein texte dans le feed.
+
+Par défaut la recherche passe par l'index texte MongoDB de ``FeedItem``
+(analyseur français, titre pondéré) et les résultats peuvent être triés par
+pertinence (``$text_score``). Si l'index texte n'existe pas encore ou si
+``FEED_SEARCH_MODE = 'regex'``, on retombe sur une recherche par expression
+régulière dont le motif est échappé (la saisie utilisateur n'est jamais
+interprétée comme une regex).
+"""
+import re
+import threading
+import time
+
+from django.conf import settings
+
+TEXT_LANGUAGE = 'french'
+
+# Un index présent le reste : seul un résultat négatif est revérifié
+TEXT_INDEX_RECHECK_SECONDS = 60
+
+_text_index = None
+_text_index_checked_at = None
+_text_index_lock = threading.Lock()
+
+
+def text_index_available(document=None):
+    """Vérifie que la collection possède l'index texte.
+
+    Une réponse positive est gardée pour tout le processus ; une réponse
+    négative (index pas encore créé, erreur passagère) n'est gardée que
+    ``TEXT_INDEX_RECHECK_SECONDS`` secondes.
+    """
+    global _text_index, _text_index_checked_at
+    if document is not None:
+        return _has_text_index(document)
+    with _text_index_lock:
+        now = time.monotonic()
+        if not _text_index and (
+                _text_index_checked_at is None or now - _text_index_checked_at >= TEXT_INDEX_RECHECK_SECONDS):
+            from .models import FeedItem
+            _text_index = _has_text_index(FeedItem)
+            _text_index_checked_at = now
+        return _text_index
+
+
+def _has_text_index(document):
+    try:
+        indexes = document._get_collection().index_information()
+    except Exception as e:
+        print(f"[feed] Index texte introuvable: {e}")
+        return False
+    return any(
+        any(kind == 'text' for _, kind in spec.get('key', []))
+        for spec in indexes.values()
+    )
+
+
+def search_mode(document=None):
+    mode = getattr(settings, 'FEED_SEARCH_MODE', 'text')
+    if mode == 'text' and text_index_available(document):
+        return 'text'
+    return 'regex'
+
+
+def regex_search(queryset, search_query):
+    pattern = re.escape(search_query)
+    return queryset.filter(
+        __raw__={
+            '$or': [
+                {'title': {'$regex': pattern, '$options': 'i'}},
+                {'description': {'$regex': pattern, '$options': 'i'}}
+            ]
+        }
+    )
+
+
+def search_feed_items(queryset, search_query, mode=None):
+    """Filtre ``queryset`` sur ``search_query``.
+
+    Retourne ``(queryset, mode)`` ; en mode ``'text'`` la QuerySet peut être
+    triée par ``$text_score``.
+    """
+    mode = mode or search_mode()
+    # Sans aucun mot, $text ne renvoie rien : on garde la recherche littérale
+    if mode == 'text' and re.search(r'\w', search_query):
+        return queryset.search_text(search_query, language=TEXT_LANGUAGE), 'text'
+    return regex_search(queryset, search_query), 'regex'
@@ -0,0 +1,127 @@
+"""Faux services pour exercer la génération vidéo hors ligne (tests seulement).
+
+Il imite l'hébergeur de fichiers (``POST /upload``) et l'API Shotstack
+(``POST /render``, ``GET /render/<id>``) puis sert la vidéo produite
+(``GET /files/<id>.mp4``). Utilisation :
+
+    with FakeRenderServer(polls_before_done=2) as server:
+        with override_settings(**server.settings()):
+            TikTokVideoGenerator().generate_video(...)
+
+``fake_ffmpeg(directory)`` écrit un exécutable qui imite ffmpeg pour le
+moteur local (progression sur stdout, MP4 factice en sortie).
+"""
+import json
+import stat
+import sys
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+FAKE_VIDEO = b'\x00\x00\x00\x18ftypmp42' + b'\x00' * 1024
+
+
+class FakeRenderServer:
+    def __init__(self, polls_before_done=1, fail_render=False, duration=12.5):
+        self.polls_before_done = polls_before_done
+        self.fail_render = fail_render
+        self.duration = duration
+        self.uploads = []
+        self.renders = {}
+        self.requests = []
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def settings(self):
+        return {
+            'SHOTSTACK_API_KEY': 'test',
+            'SHOTSTACK_BASE_URL': self.url,
+            'VIDEO_UPLOAD_URL': f"{self.url}/upload",
+            'SHOTSTACK_POLL_SECONDS': 0,
+            'SHOTSTACK_MAX_POLLS': self.polls_before_done + 3,
+        }
+
+    def __enter__(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body, content_type='application/json'):
+                if not isinstance(body, bytes):
+                    body = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length)
+                fake.requests.append(('POST', self.path))
+                if self.path == '/upload':
+                    name = f"{uuid.uuid4().hex}.bin"
+                    fake.uploads.append(len(body))
+                    return self._send(200, f"{fake.url}/files/{name}".encode(), 'text/plain')
+                if self.path == '/render':
+                    render_id = uuid.uuid4().hex
+                    fake.renders[render_id] = {'payload': json.loads(body or b'{}'), 'polls': 0}
+                    return self._send(201, {'success': True, 'response': {'id': render_id}})
+                return self._send(404, {'error': 'not found'})
+
+            def do_GET(self):
+                fake.requests.append(('GET', self.path))
+                if self.path.startswith('/render/'):
+                    render = fake.renders.get(self.path.rsplit('/', 1)[-1])
+                    if render is None:
+                        return self._send(404, {'error': 'not found'})
+                    render['polls'] += 1
+                    if fake.fail_render:
+                        status = {'status': 'failed', 'error': 'fake failure'}
+                    elif render['polls'] > fake.polls_before_done:
+                        status = {'status': 'done', 'url': f"{fake.url}/files/video.mp4", 'duration': fake.duration}
+                    else:
+                        status = {'status': 'rendering'}
+                    return self._send(200, {'success': True, 'response': status})
+                if self.path.startswith('/files/'):
+                    return self._send(200, FAKE_VIDEO, 'video/mp4')
+                return self._send(404, {'error': 'not found'})
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+
+FAKE_FFMPEG = """#!{python}
+import sys, time
+output = sys.argv[-1]
+for step in range(1, 5):
+    print(f"out_time_us={{step * 1500000}}", flush=True)
+    print("progress=continue", flush=True)
+    time.sleep({delay})
+with open(output, 'wb') as f:
+    f.write({video!r})
+print("progress=end", flush=True)
+"""
+
+
+def fake_ffmpeg(directory, delay=0.0):
+    """Chemin d'un faux ffmpeg (4 rapports de progression de 1,5 s espacés de ``delay``)."""
+    path = Path(directory) / 'ffmpeg'
+    path.write_text(FAKE_FFMPEG.format(python=sys.executable, delay=delay, video=FAKE_VIDEO))
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return str(path)
@@ -0,0 +1,695 @@
+import io
+import os
+import re
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from bson import ObjectId
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from mongoengine.context_managers import switch_collection
+from mongoengine.errors import NotUniqueError
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from exports.jobs import chunked
+
+from .. import (
+    authors, dashboard, exports, frame_renderer, jobs, live_check, reminders, render_backends, search,
+    text_analysis, views,
+)
+from ..ai_services import AIContentEnricher, AIRecurringContentGenerator, AIWritingAssistant
+from ..ai_video_services import AIVideoGenerator
+from ..artifact_cache import ArtifactCache, make_key
+from ..audio_info import mp3_duration
+from ..models import FeedItem
+from ..pagination import (
+    FeedPaginator, InvalidCursor, cursor_filter, decode_cursor, encode_cursor,
+)
+from ..search import search_feed_items
+from ..video_generator import RenderCancelled
+from .fakes import FAKE_VIDEO, FakeRenderServer, fake_ffmpeg
+
+
+class CursorTests(SimpleTestCase):
+    def test_roundtrip_datetime(self):
+        item = SimpleNamespace(id=ObjectId(), created_at=datetime(2025, 3, 1, 12, 30), title='A')
+        cursor = encode_cursor(item, '-created_at')
+        self.assertEqual(decode_cursor(cursor, '-created_at'), (item.created_at, item.id))
+
+    def test_roundtrip_title(self):
+        item = SimpleNamespace(id=ObjectId(), created_at=None, title='Examen final')
+        cursor = encode_cursor(item, 'title')
+        self.assertEqual(decode_cursor(cursor, 'title'), ('Examen final', item.id))
+
+    def test_rejects_garbage_and_other_ordering(self):
+        item = SimpleNamespace(id=ObjectId(), created_at=datetime(2025, 3, 1), title='A')
+        with self.assertRaises(InvalidCursor):
+            decode_cursor('pas-un-curseur', '-created_at')
+        with self.assertRaises(InvalidCursor):
+            decode_cursor(encode_cursor(item, '-created_at'), 'title')
+
+    def test_filter_direction(self):
+        last_id = ObjectId()
+        desc = cursor_filter('-created_at', datetime(2025, 1, 1), last_id)
+        self.assertEqual(desc['$or'][1], {'created_at': datetime(2025, 1, 1), '_id': {'$lt': last_id}})
+        asc = cursor_filter('title', 'B', last_id)
+        self.assertEqual(asc['$or'][0], {'title': {'$gt': 'B'}})
+
+
+class FakeQuerySet:
+    """Enregistre count() et les tranches demandées, comme skip/limit."""
+
+    def __init__(self, n):
+        self.n = n
+        self.slices = []
+
+    def count(self):
+        return self.n
+
+    def __len__(self):
+        raise AssertionError('len() chargerait toute la collection')
+
+    def __getitem__(self, key):
+        self.slices.append((key.start, key.stop))
+        return list(range(key.start, min(key.stop, self.n)))
+
+
+class FeedPaginatorTests(SimpleTestCase):
+    def test_uses_count_and_slice(self):
+        qs = FakeQuerySet(95)
+        page = FeedPaginator(qs, 10).get_page(3)
+        self.assertEqual(page.paginator.num_pages, 10)
+        self.assertEqual(list(page), list(range(20, 30)))
+        self.assertEqual(qs.slices, [(20, 30)])
+
+
+class RecordingQuerySet:
+    def __init__(self):
+        self.calls = []
+
+    def filter(self, **kwargs):
+        self.calls.append(('filter', kwargs))
+        return self
+
+    def search_text(self, text, language=None):
+        self.calls.append(('search_text', text, language))
+        return self
+
+
+class FeedSearchTests(SimpleTestCase):
+    def test_regex_mode_escapes_pattern(self):
+        qs, mode = search_feed_items(RecordingQuerySet(), 'C++ (TP)', mode='regex')
+        self.assertEqual(mode, 'regex')
+        raw = qs.calls[0][1]['__raw__']
+        self.assertEqual(raw['$or'][0]['title']['$regex'], r'C\+\+\ \(TP\)')
+
+    def test_text_mode_uses_french_index(self):
+        qs, mode = search_feed_items(RecordingQuerySet(), 'examens finaux', mode='text')
+        self.assertEqual(mode, 'text')
+        self.assertEqual(qs.calls, [('search_text', 'examens finaux', 'french')])
+
+    def test_text_mode_without_words_falls_back(self):
+        _, mode = search_feed_items(RecordingQuerySet(), '++', mode='text')
+        self.assertEqual(mode, 'regex')
+
+
+class TextIndexCheckTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.multiple(search, _text_index=None, _text_index_checked_at=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_negative_result_is_rechecked(self):
+        with mock.patch.object(search, '_has_text_index', side_effect=[False, True]) as check, \
+                mock.patch.object(search, 'time', SimpleNamespace(monotonic=mock.Mock(
+                    side_effect=[100, 110, 100 + search.TEXT_INDEX_RECHECK_SECONDS, 1000]))):
+            self.assertFalse(search.text_index_available())
+            self.assertFalse(search.text_index_available())
+            self.assertTrue(search.text_index_available())
+            self.assertTrue(search.text_index_available())
+        self.assertEqual(check.call_count, 2)
+
+class AuthorHydrationTests(SimpleTestCase):
+    def setUp(self):
+        authors.clear_cache()
+        self.addCleanup(authors.clear_cache)
+
+    def test_one_lookup_per_page_then_cached(self):
+        ids = [str(ObjectId()) for _ in range(3)]
+        calls = []
+
+        def fake_load(missing):
+            calls.append(set(missing))
+            return {i: SimpleNamespace(username=f'user{n}') for n, i in enumerate(ids[:2])}
+
+        items = [SimpleNamespace(author_id=ids[n % 3]) for n in range(9)]
+        with mock.patch.object(authors, '_load_users', side_effect=fake_load):
+            authors.hydrate_authors(items)
+            authors.hydrate_authors(items)
+        self.assertEqual(calls, [set(ids)])
+        self.assertEqual(items[0]._author.username, 'user0')
+        # Auteur inconnu : mis en cache comme absent
+        self.assertIsNone(items[2]._author)
+
+
+class StubFeedItem(SimpleNamespace):
+    def get_content_type_display(self):
+        return self.content_type.capitalize()
+
+    def save(self):
+        self.saved = True
+
+
+def _fake_audio(self, text, output_path):
+    with open(output_path, 'wb') as f:
+        f.write(b'ID3')
+    return {'success': True, 'audio_path': output_path}
+
+
+class TikTokPipelineTests(SimpleTestCase):
+    """Pipeline vidéo complet contre le faux serveur de rendu local."""
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.media_root = media.name
+        self.item = StubFeedItem(
+            pk='65f0c0ffee0000000000abcd', title='Examen final de réseaux', description='Révisez les chapitres 3 à 5.',
+            content_type='echeance', deadline=None, created_at=datetime(2025, 3, 1, 9, 0),
+        )
+
+    def _run(self, server, report):
+        with override_settings(MEDIA_ROOT=self.media_root, **server.settings()), \
+                mock.patch.object(AIVideoGenerator, 'generate_audio', _fake_audio):
+            return jobs.generate_tiktok(self.item, report)
+
+    def test_generates_and_downloads_video(self):
+        stages = []
+        with FakeRenderServer(polls_before_done=2) as server:
+            result = self._run(server, lambda stage, progress: stages.append((stage, progress)))
+        self.assertEqual(result['duration'], 12.5)
+        self.assertEqual(self.item.tiktok_video_status, 'completed')
+        self.assertTrue(self.item.saved)
+        self.assertEqual(len(server.uploads), 2)
+        video = Path(self.media_root) / 'feed_videos' / Path(result['video_url']).name
+        self.assertEqual(video.read_bytes(), FAKE_VIDEO)
+        names = [stage for stage, _ in stages]
+        self.assertEqual(names[:2], ['script', 'audio'])
+        self.assertIn('render', names)
+        self.assertEqual(names[-1], 'download')
+        progress = [p for _, p in stages]
+        self.assertEqual(progress, sorted(progress))
+        # L'audio temporaire est supprimé
+        self.assertFalse((Path(self.media_root) / 'temp_video' / f'audio_{self.item.pk}.mp3').exists())
+
+    def test_cancel_during_render(self):
+        def report(stage, progress):
+            if stage == 'render' and progress > 50:
+                raise RenderCancelled()
+
+        with FakeRenderServer(polls_before_done=5) as server:
+            with self.assertRaises(RenderCancelled):
+                self._run(server, report)
+        self.assertFalse(getattr(self.item, 'saved', False))
+        self.assertNotIn(('GET', '/files/video.mp4'), server.requests)
+
+    def test_render_failure_raises(self):
+        with FakeRenderServer(fail_render=True) as server:
+            with self.assertRaisesMessage(Exception, 'fake failure'):
+                self._run(server, lambda stage, progress: None)
+
+
+class RenderBackendTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        self.image = self.tmp / 'frame.png'
+        self.image.write_bytes(b'png')
+        self.audio = self.tmp / 'audio.mp3'
+        _write_cbr_mp3(self.audio, 250)  # 6 s
+        self.output = self.tmp / 'video.mp4'
+
+    def test_local_backend_reports_progress_and_writes_video(self):
+        stages = []
+        with override_settings(VIDEO_FFMPEG_BINARY=fake_ffmpeg(self.tmp)):
+            backend = render_backends.get_backend('local')
+            duration = backend.render(self.image, self.audio, self.output, lambda s, p: stages.append(p))
+        self.assertAlmostEqual(duration, 6.0, places=3)
+        self.assertEqual(self.output.read_bytes(), FAKE_VIDEO)
+        self.assertEqual(stages, [50, 60, 70, 80, 90, 90])
+
+    def test_local_backend_cancel_kills_ffmpeg(self):
+        def report(stage, progress):
+            if progress > 50:
+                raise RenderCancelled()
+
+        with override_settings(VIDEO_FFMPEG_BINARY=fake_ffmpeg(self.tmp, delay=5)):
+            start = time.monotonic()
+            with self.assertRaises(RenderCancelled):
+                render_backends.get_backend('local').render(self.image, self.audio, self.output, report)
+        self.assertLess(time.monotonic() - start, 4)
+        self.assertFalse(self.output.exists())
+        self.assertEqual(list(self.tmp.glob('*.part*')), [])
+
+    def test_local_backend_without_ffmpeg(self):
+        with override_settings(VIDEO_FFMPEG_BINARY=''), mock.patch('shutil.which', return_value=None), \
+                mock.patch.dict('sys.modules', {'imageio_ffmpeg': None}):
+            with self.assertRaisesMessage(render_backends.RenderError, 'ffmpeg introuvable'):
+                render_backends.get_backend('local').render(self.image, self.audio, self.output, lambda s, p: None)
+
+    def test_cloud_backend_shares_session_and_uploads_in_parallel(self):
+        with FakeRenderServer() as server, override_settings(**server.settings()):
+            backend = render_backends.get_backend('shotstack')
+            self.assertIs(backend.session, render_backends.http_session())
+            urls = backend.upload_files(self.image, self.audio)
+        self.assertEqual(len(set(urls)), 2)
+        self.assertEqual(len(server.uploads), 2)
+
+    @override_settings(SHOTSTACK_API_KEY='')
+    def test_cloud_backend_requires_api_key(self):
+        with self.assertRaisesMessage(render_backends.RenderError, 'SHOTSTACK_API_KEY'):
+            render_backends.get_backend('shotstack')
+
+    def test_unknown_backend(self):
+        with self.assertRaises(render_backends.RenderError):
+            render_backends.get_backend('vhs')
+
+
+class FrameRendererTests(SimpleTestCase):
+    def test_gradient_matches_row_by_row_values(self):
+        top, bottom = frame_renderer.COLORS['echeance']
+        img = frame_renderer.gradient(8, 50, top, bottom)
+        for y in (0, 17, 49):
+            ratio = y / 50
+            expected = tuple(int(top[i] * (1 - ratio) + bottom[i] * ratio) for i in range(3))
+            self.assertEqual(img.getpixel((0, y)), expected)
+            self.assertEqual(img.getpixel((7, y)), expected)
+
+    def test_background_is_cached_and_not_mutated(self):
+        frame_renderer.background.cache_clear()
+        before = frame_renderer.background('annonce', 270, 480).tobytes()
+        frame = frame_renderer.render_thumbnail('Réunion des délégués', 'annonce', width=270)
+        self.assertEqual(frame.size, (270, 480))
+        self.assertEqual(frame_renderer.background.cache_info().misses, 1)
+        self.assertEqual(frame_renderer.background('annonce', 270, 480).tobytes(), before)
+        self.assertNotEqual(frame.tobytes(), before)
+
+
+def _write_cbr_mp3(path, frames, id3=True):
+    """MP3 CBR synthétique : MPEG-2 couche III, 24 kHz, 32 kbit/s, mono (format gTTS)."""
+    header = bytes([0xFF, 0xF3, 0x44, 0xC4])
+    frame = header + b'\x00' * (96 - 4)
+    with open(path, 'wb') as f:
+        if id3:
+            f.write(b'ID3\x04\x00\x00\x00\x00\x00\x0a' + b'\x00' * 10)
+        f.write(frame * frames)
+
+
+class Mp3DurationTests(SimpleTestCase):
+    def test_cbr_duration_from_headers(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'a.mp3'
+            _write_cbr_mp3(path, 250)
+            self.assertAlmostEqual(mp3_duration(path), 250 * 576 / 24000, places=3)
+
+    def test_unreadable_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'b.mp3'
+            path.write_bytes(b'pas un mp3')
+            self.assertIsNone(mp3_duration(path))
+
+
+class ArtifactCacheTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+
+    def test_key_depends_on_text_and_params(self):
+        self.assertEqual(make_key('audio', 'bonjour', lang='fr'), make_key('audio', 'bonjour', lang='fr'))
+        self.assertNotEqual(make_key('audio', 'bonjour', lang='fr'), make_key('audio', 'bonjour', lang='en'))
+        self.assertNotEqual(make_key('audio', 'bonjour', lang='fr'), make_key('audio', 'bonsoir', lang='fr'))
+
+    def test_evicts_least_recently_used(self):
+        cache = ArtifactCache(self.dir, max_bytes=250)
+        keys = [make_key('t', i) for i in range(3)]
+        cache.put_bytes(keys[0], 'bin', b'a' * 100)
+        cache.put_bytes(keys[1], 'bin', b'b' * 100)
+        old = time.time() - 60
+        os.utime(cache.path_for(keys[1], 'bin'), (old, old))
+        cache.put_bytes(keys[2], 'bin', b'c' * 100)
+        self.assertIsNone(cache.get_bytes(keys[1], 'bin'))
+        self.assertEqual(cache.get_bytes(keys[0], 'bin'), b'a' * 100)
+        self.assertLessEqual(cache.size(), 250)
+
+    def test_scans_only_when_over_budget(self):
+        cache = ArtifactCache(self.dir, max_bytes=1000)
+        cache.put_bytes(make_key('t', 0), 'bin', b'a' * 100)
+        with mock.patch.object(cache, 'size', side_effect=AssertionError('scan')), \
+                mock.patch.object(cache, 'evict', wraps=cache.evict) as evict:
+            for i in range(1, 8):
+                cache.put_bytes(make_key('t', i), 'bin', b'a' * 100)
+            cache.put_bytes(make_key('t', 1), 'bin', b'b' * 100)  # remplacement : volume inchangé
+            evict.assert_not_called()
+            cache.put_bytes(make_key('t', 8), 'bin', b'a' * 300)
+            evict.assert_called_once()
+        self.assertEqual(cache._size, sum(f.stat().st_size for f in self.dir.glob('*/*')))
+        self.assertLessEqual(cache._size, 900)
+
+    def test_audio_is_synthesized_once(self):
+        generator = AIVideoGenerator(cache=ArtifactCache(self.dir, max_bytes=0))
+        calls = []
+
+        class FakeTTS:
+            def __init__(self, text, lang, slow):
+                calls.append((text, lang, slow))
+
+            def save(self, path):
+                _write_cbr_mp3(path, 100)
+
+        with mock.patch.dict('sys.modules', {'gtts': SimpleNamespace(gTTS=FakeTTS)}):
+            first = generator.generate_audio('Bonjour à tous', str(self.dir / 'one.mp3'))
+            second = generator.generate_audio('Bonjour à tous', str(self.dir / 'two.mp3'))
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(second.get('cached'))
+        self.assertNotIn('cached', first)
+        self.assertEqual((self.dir / 'one.mp3').read_bytes(), (self.dir / 'two.mp3').read_bytes())
+        self.assertAlmostEqual(generator.get_audio_duration(str(self.dir / 'two.mp3')), 2.4, places=3)
+
+
+class TextAnalysisTests(SimpleTestCase):
+    TEXT = ("Il faut rendre le projet avant vendredi ! C'est vraiment très important "
+            "et le cours de Python est excellent. Pensez à réviser le chapitre 3.")
+
+    def test_keyword_matcher_counts_like_str_count(self):
+        keywords = ['bon', 'bonjour', 'jour', 'ne pas', 'pas du tout', '!']
+        matcher = text_analysis.KeywordMatcher(keywords)
+        text = "bonjour bon jour ! ne pas du tout, pas du tout bonbon !!"
+        counts = matcher.counts(text)
+        for keyword in keywords:
+            self.assertEqual(counts[keyword], text.count(keyword), keyword)
+
+    def test_assistant_methods_use_shared_analysis(self):
+        assistant, enricher = AIWritingAssistant(), AIContentEnricher()
+        sentiment = assistant.analyze_sentiment(self.TEXT)
+        self.assertEqual(sentiment['sentiment'], 'positif')
+        self.assertAlmostEqual(sentiment['score'], 3 * 1.2 * 1.15)
+        self.assertEqual(assistant.detect_emotion(self.TEXT)['emotion'], 'surprise')
+        actions = enricher.extract_action_items(self.TEXT)
+        self.assertEqual(actions[0]['action'], 'rendre le projet avant vendredi')
+        self.assertEqual(actions[0]['priority'], 'high')
+        self.assertEqual(enricher.detect_urgency_level(self.TEXT, None)['score'], 2)
+
+    def test_analysis_is_stored_and_reused(self):
+        updates = []
+
+        class Item(SimpleNamespace):
+            @staticmethod
+            def objects(**kwargs):
+                return SimpleNamespace(update=lambda **fields: updates.append(fields))
+
+        item = Item(pk='abc', description=self.TEXT, content_type='echeance',
+                    deadline=datetime.utcnow() + timedelta(hours=30),
+                    ai_analysis={}, ai_analysis_hash=None)
+        first = text_analysis.analysis_for(item)
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(updates[0]['set__ai_analysis_hash'], item.ai_analysis_hash)
+        self.assertEqual(first['urgency']['reasons'][-1], 'Demain')
+
+        with mock.patch.object(text_analysis, 'TextFeatures') as features:
+            again = text_analysis.analysis_for(item)
+        features.assert_not_called()
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(again, first)
+
+        # Texte modifié : nouvelle analyse
+        item.description = self.TEXT + " Erreur horrible."
+        text_analysis.analysis_for(item)
+        self.assertEqual(len(updates), 2)
+
+
+class IncrementalCheckTests(SimpleTestCase):
+    def test_only_changed_sentence_is_analyzed(self):
+        base = "Premier point du cours. Deuxième point important ! Troisième"
+        text_analysis.features(base).grammar
+        before = text_analysis.segment.cache_info()
+        text_analysis.features(base + " phrase en cours").grammar
+        after = text_analysis.segment.cache_info()
+        self.assertEqual(after.misses - before.misses, 1)
+        self.assertEqual(after.hits - before.hits, 2)
+
+    def test_positions_are_absolute(self):
+        text = "Bonjour à tous.  Voici sa note.Rendu le 12/03/2026 ou demain."
+        issues = AIWritingAssistant().check_grammar(text)
+        spelling = [i for i in issues if i['type'] == 'spelling']
+        self.assertEqual(spelling[0]['position'], text.index('sa note'))
+        missing = [i for i in issues if i['message'] == 'Espace manquant après ponctuation']
+        self.assertEqual(missing[0]['position'], text.index('.Rendu'))
+        dates = AIContentEnricher().extract_dates(text)
+        self.assertEqual([(d['text'], d['position']) for d in dates],
+                         [('12/03/2026', text.index('12/03')), ('demain', text.index('demain'))])
+
+    def test_check_content_payload(self):
+        result = live_check.check_content("Il faut rendre le devoir demain. Merci !", 'echeance')
+        self.assertEqual(result['extracted_dates'], ['demain'])
+        self.assertEqual(result['stats']['words'], 8)
+        self.assertIn('quality_score', result)
+
+
+class SessionCoalescerTests(SimpleTestCase):
+    def test_identical_text_reuses_last_result(self):
+        coalescer = live_check.SessionCoalescer()
+        calls = []
+        compute = lambda: calls.append(1) or len(calls)
+        self.assertEqual(coalescer.run('s1', ('texte', 'programme'), compute), 1)
+        self.assertEqual(coalescer.run('s1', ('texte', 'programme'), compute), 1)
+        self.assertEqual(coalescer.run('s2', ('texte', 'programme'), compute), 2)
+
+    def test_burst_keeps_only_latest_request(self):
+        coalescer = live_check.SessionCoalescer()
+        release = threading.Event()
+        results = {}
+
+        def request(name, wait=False):
+            def compute():
+                if wait:
+                    release.wait(5)
+                return name
+            results[name] = coalescer.run('session', (name, 'programme'), compute)
+
+        threads = [threading.Thread(target=request, args=('a', True))]
+        threads[0].start()
+        for name, expected in (('b', 2), ('c', 3)):
+            thread = threading.Thread(target=request, args=(name,))
+            thread.start()
+            threads.append(thread)
+            while coalescer._sessions['session'].latest < expected:
+                time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(results, {'a': 'a', 'b': None, 'c': 'c'})
+
+    def test_evicts_oldest_sessions(self):
+        coalescer = live_check.SessionCoalescer(max_sessions=2)
+        for key in ('s1', 's2', 's3'):
+            coalescer.run(key, key, lambda: key)
+        self.assertEqual(list(coalescer._sessions), ['s2', 's3'])
+
+    def test_view_does_not_coalesce_requests_without_session(self):
+        def request(session_key):
+            return SimpleNamespace(
+                POST={'text': 'Rendu du TP vendredi', 'content_type': 'echeance'},
+                session=SimpleNamespace(session_key=session_key), META={'REMOTE_ADDR': '127.0.0.1'},
+            )
+
+        with mock.patch.object(live_check, 'check_content', return_value={'tone': 'neutre'}) as check, \
+                mock.patch.object(live_check, 'coalescer') as coalescer:
+            coalescer.run.return_value = {'tone': 'formel'}
+            anonymous = views.ai_check_content(request(None))
+            known = views.ai_check_content(request('abc'))
+        check.assert_called_once_with('Rendu du TP vendredi', 'echeance')
+        coalescer.run.assert_called_once()
+        self.assertEqual(coalescer.run.call_args.args[0], 'abc')
+        self.assertIn(b'neutre', anonymous.content)
+        self.assertIn(b'formel', known.content)
+
+
+class DashboardAggregationTests(SimpleTestCase):
+    def test_read_summary_orders_distributions(self):
+        summary = dashboard._read_summary({
+            'totals': [{'_id': None, 'total': 6, 'quality_sum': 42.0}],
+            'by_type': [{'_id': 'annonce', 'count': 1}, {'_id': 'programme', 'count': 5}],
+            'by_tone': [{'_id': dashboard.UNDEFINED_TONE, 'count': 6}],
+        })
+        self.assertEqual(summary['total'], 6)
+        self.assertEqual(list(summary['by_type'].items()), [('programme', 5), ('annonce', 1)])
+        # Aucun post : facettes vides
+        self.assertEqual(dashboard._read_summary({'totals': [], 'by_type': [], 'by_tone': []})['total'], 0)
+
+    def test_rollups_fold_and_merge(self):
+        days = dashboard.fold_day_rows([
+            {'_id': {'day': '2026-03-01', 'type': 'programme', 'tone': 'informatif'}, 'count': 2, 'quality_sum': 14.0},
+            {'_id': {'day': '2026-03-01', 'type': 'annonce', 'tone': 'informatif'}, 'count': 1, 'quality_sum': 8.0},
+            {'_id': {'day': '2026-03-02', 'type': 'annonce', 'tone': 'urgent'}, 'count': 3, 'quality_sum': 21.0},
+        ])
+        self.assertEqual(days[datetime(2026, 3, 1)]['total'], 3)
+        docs = [
+            SimpleNamespace(total=stats['total'], quality_sum=stats['quality_sum'],
+                            by_type=dashboard._pairs(stats['by_type']), by_tone=dashboard._pairs(stats['by_tone']))
+            for stats in days.values()
+        ]
+        merged = dashboard.merge_rollups(docs)
+        self.assertEqual(merged['total'], 6)
+        self.assertEqual(merged['quality_sum'], 43.0)
+        self.assertEqual(merged['by_type'], {'annonce': 4, 'programme': 2})
+        self.assertEqual(merged['by_tone'], {'informatif': 3, 'urgent': 3})
+
+    def test_author_counts_merge_by_username(self):
+        users = {'a1': SimpleNamespace(username='alice'), 'a2': SimpleNamespace(username='alice')}
+        with mock.patch.object(dashboard, 'get_users', return_value=users) as get_users:
+            counts = dashboard.author_counts([
+                {'_id': 'a1', 'count': 1}, {'_id': 'a2', 'count': 2}, {'_id': 'x', 'count': 4},
+            ])
+        get_users.assert_called_once_with(['a1', 'a2', 'x'])
+        self.assertEqual(counts, {'Utilisateur inconnu': 4, 'alice': 3})
+
+    def test_weekly_summary_from_items_and_stats_match(self):
+        now = datetime.utcnow()
+        items = [
+            StubFeedItem(content_type='programme', deadline=now + timedelta(days=2, hours=1), title='TP',
+                         get_author_username=lambda: 'alice'),
+            StubFeedItem(content_type='annonce', deadline=None, title='Info',
+                         get_author_username=lambda: 'bob'),
+        ]
+        from_items = AIRecurringContentGenerator.generate_weekly_summary(items)
+        from_stats = AIRecurringContentGenerator.weekly_summary_from_stats({
+            'total': 2, 'by_type': {'programme': 1, 'annonce': 1}, 'by_author': {'alice': 1, 'bob': 1},
+            'upcoming_count': 1, 'upcoming': [('TP', items[0].deadline)],
+        })
+        self.assertEqual(from_items, from_stats)
+        self.assertIn('**TP** - 2j', from_stats['description'])
+        self.assertIsNone(AIRecurringContentGenerator.weekly_summary_from_stats({'total': 0}))
+
+    def test_missing_content_from_counts(self):
+        messages = AIRecurringContentGenerator.missing_content_from_counts(
+            {'programme': 3, 'echeance': 1, 'difficulte': 1, 'ressource': 1}, days=7
+        )
+        self.assertEqual(len(messages), 2)
+        self.assertTrue(messages[0].startswith('📢'))
+        self.assertIn('Activité faible', messages[1])
+
+
+class DeadlineReminderTests(SimpleTestCase):
+    def setUp(self):
+        self.now = datetime(2026, 3, 10, 8, 0)
+        self.items = [
+            StubFeedItem(pk=ObjectId(), title=f'Rendu {i}', description='Projet final', author_id='a' * 24,
+                         deadline=self.now + timedelta(days=i, hours=2))
+            for i in range(3)
+        ]
+
+    def test_builds_one_reminder_per_item_not_yet_reminded(self):
+        built = reminders.build_reminders(self.items, {str(self.items[1].pk)}, self.now, author_id='b' * 24)
+        self.assertEqual([r.reminder_for for r in built], [str(self.items[0].pk), str(self.items[2].pk)])
+        self.assertTrue(all(r.reminder_day == '2026-03-10' for r in built))
+        self.assertTrue(all(r.author_id == 'b' * 24 for r in built))
+        self.assertTrue(built[0].title.startswith("⏰ AUJOURD'HUI"))
+        self.assertEqual(built[0].ai_tone, 'urgent')
+
+    def test_generate_runs_one_lookup_and_one_insert(self):
+        with mock.patch.object(reminders, 'candidates', return_value=self.items), \
+                mock.patch.object(reminders, 'existing_reminders', return_value={str(self.items[0].pk)}) as existing, \
+                mock.patch.object(reminders, 'insert_reminders', side_effect=len) as insert:
+            result = reminders.generate_reminders(now=self.now)
+        existing.assert_called_once_with([str(item.pk) for item in self.items], '2026-03-10')
+        insert.assert_called_once()
+        self.assertEqual(len(insert.call_args.args[0]), 2)
+        # Sans auteur imposé : auteur du post source
+        self.assertEqual(insert.call_args.args[0][0].author_id, 'a' * 24)
+        self.assertEqual(result, {'candidates': 3, 'created': 2, 'skipped': 1})
+
+
+
+class ReminderIndexTests(SimpleTestCase):
+    def post(self, document, **fields):
+        return document(title='Annonce', description='Salle B12', author_id='a' * 24, **fields)
+
+    def test_regular_posts_do_not_store_reminder_fields(self):
+        doc = self.post(FeedItem).to_mongo()
+        self.assertNotIn('reminder_for', doc)
+        self.assertNotIn('reminder_day', doc)
+
+    def test_unique_index_only_covers_reminders(self):
+        client = MongoClient(settings.MONGO_URI or 'mongodb://localhost:27017/edusocial', serverSelectionTimeoutMS=500)
+        try:
+            client.admin.command('ping')
+        except PyMongoError:
+            self.skipTest('MongoDB indisponible')
+        finally:
+            client.close()
+        source = str(ObjectId())
+        with switch_collection(FeedItem, 'test_feed_reminder_index') as Item, \
+                mock.patch('feed.dashboard.mark_day_dirty'):
+            try:
+                self.post(Item).save()
+                self.post(Item).save()
+                self.post(Item, reminder_for=source, reminder_day='2026-03-10').save()
+                with self.assertRaises(NotUniqueError):
+                    self.post(Item, reminder_for=source, reminder_day='2026-03-10').save()
+                self.assertEqual(Item.objects.count(), 3)
+            finally:
+                Item._get_collection().drop()
+
+def _feed_item(i, **fields):
+    values = dict(
+        pk=i, author_id=None, title=f"Post {i} <td>", description="Rendu du TP " * 60,
+        content_type='annonce', created_at=datetime(2026, 3, 1, 9, 30), deadline=None,
+        is_ai_generated=i % 2 == 0, ai_quality_score=7.5,
+        is_urgent=lambda: False, get_content_type_display=lambda: 'Annonce',
+        get_author_username=lambda: 'prof',
+    )
+    values.update(fields)
+    return SimpleNamespace(**values)
+
+
+class FeedExportTests(SimpleTestCase):
+    def write(self, items):
+        exporter = exports.FeedExport()
+        hydrated = []
+
+        def hydrate(chunk):
+            hydrated.append([item.pk for item in chunk])
+            return list(chunk)
+
+        with mock.patch.object(exporter, 'count', return_value=len(items)), \
+                mock.patch.object(exporter, 'chunks', side_effect=lambda params, size: chunked(items, size)), \
+                mock.patch.object(exports, 'hydrate_authors', side_effect=hydrate):
+            dest = io.BytesIO()
+            self.assertEqual(exporter.write({}, dest), len(items))
+        return dest.getvalue(), hydrated
+
+    @override_settings(EXPORT_CHUNK_SIZE=40)
+    def test_feed_export_builds_one_document_by_chunks(self):
+        items = [_feed_item(i) for i in range(100)]
+        items[3] = _feed_item(3, is_urgent=lambda: True, deadline=datetime(2026, 3, 2))
+        pdf, hydrated = self.write(items)
+        self.assertEqual(hydrated, [list(range(40)), list(range(40, 80)), list(range(80, 100))])
+        self.assertTrue(pdf.startswith(b'%PDF'))
+        self.assertGreater(len(re.findall(rb'/Type /Page\b', pdf)), 1)
+
+    def test_empty_feed_export_still_has_one_page(self):
+        pdf, hydrated = self.write([])
+        self.assertEqual(hydrated, [])
+        self.assertEqual(len(re.findall(rb'/Type /Page\b', pdf)), 1)
+
+    def test_feed_export_params_keep_only_filters(self):
+        params = exports.FeedExport.params_from({'search_query': 'td', 'page': '3', 'content_type': ''})
+        self.assertEqual(params, {'search_query': 'td'})
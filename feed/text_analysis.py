@@ -0,0 +1,926 @@
+"""Moteur d'analyse de texte partagé par les services IA du feed.
+
+Le texte est découpé une seule fois (``TextFeatures``) : mots, phrases et
+occurrences de tous les mots-clés des lexiques, trouvées en un seul passage
+par un automate regex précompilé (``KeywordMatcher``). Les analyses
+(sentiment, émotion, engagement, urgence, spam, actions, tags, lisibilité,
+clarté, cohérence) lisent ces caractéristiques au lieu de re-parcourir le
+texte ; les méthodes d'``AIWritingAssistant`` / ``AIContentEnricher`` y
+délèguent.
+
+``analysis_for(feed_item)`` renvoie l'analyse complète d'un post : elle est
+mémorisée par empreinte de la description (et du type) et enregistrée sur le
+FeedItem (``ai_analysis``), de sorte que la page de détail ne recalcule rien
+tant que le texte ne change pas. Seule la partie « échéance » de l'urgence,
+qui dépend de l'heure courante, est recalculée à chaque lecture.
+"""
+import copy
+import hashlib
+import re
+from collections import Counter
+from datetime import datetime
+from functools import cached_property, lru_cache
+
+# Incrémenter quand une analyse change : les résultats enregistrés sont recalculés
+ANALYSIS_VERSION = 1
+
+# ================== Lexiques ==================
+
+SENTIMENT_POSITIVE = {
+    'excellent': 3, 'parfait': 3, 'génial': 3, 'super': 2,
+    'bien': 2, 'bon': 2, 'agréable': 2, 'intéressant': 1,
+    'utile': 1, 'correct': 1
+}
+SENTIMENT_NEGATIVE = {
+    'horrible': -3, 'nul': -3, 'catastrophe': -3, 'mauvais': -2,
+    'problème': -2, 'erreur': -2, 'difficile': -1, 'compliqué': -1,
+    'inquiet': -1
+}
+SENTIMENT_NEGATIONS = ['ne pas', 'n\'est pas', 'pas du tout']
+
+EMOTIONS = {
+    'joie': (['heureux', 'content', 'ravi', 'super', 'génial'], '😄', 0.8),
+    'tristesse': (['triste', 'déçu', 'désolé', 'peine'], '😢', 0.85),
+    'colère': (['énervé', 'furieux', 'inacceptable', 'scandaleux'], '😠', 0.9),
+    'peur': (['inquiet', 'anxieux', 'stress', 'peur'], '😰', 0.8),
+    'surprise': (['wow', 'incroyable', 'étonnant', '!'], '😲', 0.7),
+    'curiosité': (['?', 'comment', 'pourquoi', 'intéressant'], '🤔', 0.75),
+    'neutre': ([], '😐', 0.6)
+}
+
+TRANSITION_WORDS = ['donc', 'ainsi', 'par conséquent', 'cependant',
+                    'néanmoins', 'en effet', 'd\'ailleurs', 'puis', 'ensuite']
+COHERENCE_POSITIVE = ['bien', 'bon', 'excellent', 'parfait']
+COHERENCE_NEGATIVE = ['mal', 'mauvais', 'problème', 'erreur']
+
+PASSIVE_INDICATORS = ['été', 'était', 'seront', 'seraient']
+CLARITY_NEGATIONS = ['ne pas', 'n\'a pas', 'ne jamais', 'ne rien']
+
+SPAM_KEYWORDS = ['gratuit', 'argent facile', 'cliquez ici', 'promotion',
+                 'gagnez', 'offre limitée', 'urgent', 'maintenant']
+
+URGENCY_KEYWORDS = {
+    'critique': 5, 'urgent': 4, 'immédiat': 4, 'asap': 4,
+    'rapidement': 3, 'vite': 3, 'bientôt': 2,
+    'important': 2, 'prioritaire': 3, 'essentiel': 2
+}
+ACTION_URGENCY_WORDS = ['urgent', 'immédiat', 'vite']
+
+TONE_URGENT = ['urgent', 'immédiat', 'vite', 'rapidement', 'asap']
+TONE_FORMAL = ['veuillez', 'merci', 'cordialement', 's\'il vous plaît']
+TONE_CASUAL = ['salut', 'coucou', 'hey', 'genre']
+
+TYPE_HINTS = {
+    'programme': ['chapitre', 'cours', 'module', 'semaine'],
+    'echeance': ['date', 'rendu', 'deadline', 'soumission'],
+    'difficulte': ['aide', 'problème', 'question', 'comprendre'],
+    'ressource': ['lien', 'document', 'pdf', 'référence'],
+    'annonce': ['important', 'note', 'attention', 'nouveau']
+}
+
+DEFAULT_TAGS = {
+    'programme': ['cours', 'programme', 'formation'],
+    'echeance': ['deadline', 'échéance', 'rendu'],
+    'difficulte': ['aide', 'question', 'support'],
+    'ressource': ['ressource', 'document', 'référence'],
+    'annonce': ['annonce', 'info', 'important']
+}
+CONTEXT_TAGS = {
+    'mathématiques': ['maths', 'calcul', 'équation'],
+    'informatique': ['code', 'programmation', 'développement'],
+    'langue': ['français', 'anglais', 'grammaire'],
+    'sciences': ['physique', 'chimie', 'biologie'],
+    'histoire': ['historique', 'date', 'événement'],
+}
+
+ACTION_PATTERNS = [
+    (re.compile(r'(?:il faut|faut|devez|devons|doit)\s+([^.!?]+)', re.IGNORECASE), 'high'),
+    (re.compile(r'(?:rendre|soumettre|livrer|envoyer)\s+([^.!?]+)', re.IGNORECASE), 'high'),
+    (re.compile(r'(?:préparer|réviser|étudier|lire)\s+([^.!?]+)', re.IGNORECASE), 'medium'),
+    (re.compile(r'(?:vérifier|consulter|regarder)\s+([^.!?]+)', re.IGNORECASE), 'low'),
+    (re.compile(r'(?:ne pas oublier|pensez à|n\'oubliez pas)\s+([^.!?]+)', re.IGNORECASE), 'high'),
+]
+LIST_ITEM = re.compile(r'(?:^|\n)\s*[\d\-•]\s*([^.\n]+)')
+PRIORITY_ORDER = {'high': 0, 'medium': 1, 'normal': 2, 'low': 3}
+
+COMMON_ERRORS = {
+    r'\bsa\b': 'ça',
+    r'\bmalgres\b': 'malgré',
+    r'\bparmis\b': 'parmi',
+    r'\bbiensur\b': 'bien sûr',
+    r'\bausitot\b': 'aussitôt',
+    r'\bpeutetre\b': 'peut-être',
+    r'\bquelquefois\b': 'quelquefois',
+    r'\bparceque\b': 'parce que',
+    r'\bquoique\b': 'quoi que',
+}
+REDUNDANT_PHRASES = [
+    (r'\btrès très\b', 'très'),
+    (r'\bbeaucoup beaucoup\b', 'beaucoup'),
+    (r'\ben fait en fait\b', 'en fait'),
+]
+SPELLING_PATTERNS = [(re.compile(p, re.IGNORECASE), c) for p, c in COMMON_ERRORS.items()]
+REDUNDANT_PATTERNS = [(re.compile(p, re.IGNORECASE), r) for p, r in REDUNDANT_PHRASES]
+SPACE_BEFORE_PUNCT = re.compile(r'\s+[,;:!?]')
+MISSING_SPACE = re.compile(r'[.!?,;:][a-zA-Z]')
+
+NUMERIC_DATE = re.compile(r'\b(\d{1,2})[/-](\d{1,2})[/-](\d{2,4})\b')
+TEXTUAL_DATE = re.compile(
+    r'\b(\d{1,2})\s+(janvier|février|fevrier|mars|avril|mai|juin|juillet|août|aout|septembre|octobre|novembre|décembre|decembre)\s+(\d{4})\b',
+    re.IGNORECASE
+)
+RELATIVE_DATES = [
+    (re.compile(r'\baujourd\'?hui\b', re.IGNORECASE), 0),
+    (re.compile(r'\bdemain\b', re.IGNORECASE), 1),
+    (re.compile(r'\baprès-demain\b', re.IGNORECASE), 2),
+    (re.compile(r'\bhier\b', re.IGNORECASE), -1),
+    (re.compile(r'\bavant-hier\b', re.IGNORECASE), -2),
+]
+FUTURE_DATE = re.compile(r'dans\s+(\d+)\s+(jour|jours|semaine|semaines|mois)', re.IGNORECASE)
+
+# Fin de segment : ponctuation finale suivie d'espaces. Aucun mot, mot-clé ou
+# motif analysé ci-dessous ne peut chevaucher cette frontière.
+SEGMENT_END = re.compile(r'[.!?]+\s+')
+SENTENCE_SPLIT = re.compile(r'[.!?]+')
+COMPLEX_WORD = re.compile(r'\b\w{12,}\b')
+ACRONYM = re.compile(r'\b[A-Z]{2,}\b')
+URL = re.compile(r'https?://')
+CAPITALIZED_WORD = re.compile(r'\b[A-ZÀ-Ÿ][a-zà-ÿ]{3,}\b')
+LONG_WORD = re.compile(r'\b\w{5,}\b')
+
+VOWELS = frozenset('aeiouyéèêëàâäôöùûü')
+
+
+class KeywordMatcher:
+    """Compte en un seul passage les occurrences de plusieurs mots-clés.
+
+    Une alternative en lookahead (plus longs mots-clés d'abord) donne, à
+    chaque position, le plus long mot-clé présent ; les mots-clés qui en sont
+    des préfixes sont présents à la même position et comptés aussi.
+    Le résultat est identique à ``text.count(k)`` pour chaque mot-clé.
+    """
+
+    def __init__(self, keywords):
+        keywords = sorted(set(keywords), key=lambda k: (-len(k), k))
+        self.keywords = keywords
+        self._pattern = re.compile('(?=(' + '|'.join(re.escape(k) for k in keywords) + '))')
+        self._prefixes = {
+            k: [p for p in keywords if p != k and k.startswith(p)]
+            for k in keywords
+        }
+
+    def counts(self, text):
+        counts = Counter()
+        # Fin de la dernière occurrence comptée par mot-clé (comptage non chevauchant)
+        last_end = {}
+        for match in self._pattern.finditer(text):
+            start = match.start()
+            longest = match.group(1)
+            for keyword in [longest] + self._prefixes[longest]:
+                if start >= last_end.get(keyword, 0):
+                    counts[keyword] += 1
+                    last_end[keyword] = start + len(keyword)
+        return counts
+
+
+def _all_keywords():
+    keywords = set(SENTIMENT_POSITIVE) | set(SENTIMENT_NEGATIVE) | set(SENTIMENT_NEGATIONS)
+    keywords |= {'très', 'vraiment'}
+    for emotion_keywords, _, _ in EMOTIONS.values():
+        keywords |= set(emotion_keywords)
+    keywords |= set(TRANSITION_WORDS) | set(COHERENCE_POSITIVE) | set(COHERENCE_NEGATIVE)
+    keywords |= set(PASSIVE_INDICATORS) | set(CLARITY_NEGATIONS) | set(SPAM_KEYWORDS)
+    keywords |= set(URGENCY_KEYWORDS) | set(TONE_URGENT) | set(TONE_FORMAL) | set(TONE_CASUAL)
+    for words in list(TYPE_HINTS.values()) + list(CONTEXT_TAGS.values()):
+        keywords |= set(words)
+    return keywords
+
+
+MATCHER = KeywordMatcher(_all_keywords())
+
+
+@lru_cache(maxsize=4096)
+def count_syllables(word: str) -> int:
+    """Compte approximatif des syllabes (français)"""
+    syllable_count = 0
+    previous_was_vowel = False
+    for char in word.lower():
+        is_vowel = char in VOWELS
+        if is_vowel and not previous_was_vowel:
+            syllable_count += 1
+        previous_was_vowel = is_vowel
+    return max(1, syllable_count)
+
+
+def split_segments(text):
+    """Découpe ``text`` après chaque ponctuation finale suivie d'espaces."""
+    segments = []
+    start = 0
+    for match in SEGMENT_END.finditer(text):
+        segments.append(text[start:match.end()])
+        start = match.end()
+    if start < len(text):
+        segments.append(text[start:])
+    return segments
+
+
+class Segment:
+    """Statistiques d'une phrase (avec sa ponctuation et ses espaces finaux).
+
+    Les statistiques d'un texte sont la somme de celles de ses segments : une
+    phrase inchangée n'est jamais ré-analysée (cache ``segment``). Objet
+    partagé entre requêtes : ne pas modifier.
+    """
+
+    def __init__(self, text):
+        lower = text.lower()
+        self.length = len(text)
+        self.keyword_counts = MATCHER.counts(lower)
+        self.words = tuple(text.split())
+        self.lower_words = tuple(lower.split())
+        self.syllables = sum(count_syllables(word) for word in self.words)
+        pieces = [len(piece.split()) for piece in SENTENCE_SPLIT.split(text) if piece.strip()]
+        self.sentence_lengths = tuple(pieces)
+        self.long_sentences = tuple(n for n in pieces if n > 30)
+        self.long_word_freq = Counter(w.lower() for w in self.words if len(w) > 4)
+        self.complex_words = len(COMPLEX_WORD.findall(text))
+        self.acronyms = len(ACRONYM.findall(text))
+        self.upper_chars = sum(map(str.isupper, text))
+        # Vrai si aucune minuscule ni casse de titre (cf. str.isupper)
+        self.no_lower = (text + 'A').isupper()
+        self.exclamations = text.count('!')
+        self.urls = len(URL.findall(text))
+
+        # Grammaire
+        self.spelling = tuple(
+            tuple((m.start(), m.group()) for m in pattern.finditer(text))
+            for pattern, _ in SPELLING_PATTERNS
+        )
+        self.missing_spaces = tuple(m.start() for m in MISSING_SPACE.finditer(text))
+        self.repeated_words = tuple(
+            w for w, following in zip(self.lower_words, self.lower_words[1:])
+            if w == following and len(w) > 2
+        )
+        self.redundant = tuple(bool(pattern.search(text)) for pattern, _ in REDUNDANT_PATTERNS)
+
+        # Dates (interprétées à la demande : les dates relatives dépendent de l'heure)
+        self.numeric_dates = tuple((m.start(), m.group()) for m in NUMERIC_DATE.finditer(text))
+        self.textual_dates = tuple((m.start(), m.group()) for m in TEXTUAL_DATE.finditer(text))
+        self.relative_dates = tuple(
+            (m.start(), m.group()) if m else None
+            for m in (pattern.search(text) for pattern, _ in RELATIVE_DATES)
+        )
+        self.future_dates = tuple(
+            (m.start(), m.group(), int(m.group(1)), m.group(2).lower())
+            for m in FUTURE_DATE.finditer(text)
+        )
+        self.has_dates = bool(self.numeric_dates or self.textual_dates or self.future_dates
+                              or any(self.relative_dates))
+
+
+@lru_cache(maxsize=8192)
+def segment(text: str) -> Segment:
+    return Segment(text)
+
+
+class TextFeatures:
+    """Analyses d'un texte calculées à la demande à partir de ses segments."""
+
+    def __init__(self, text: str):
+        self.text = text or ''
+
+    # ------------------------------------------------------------------
+    # Caractéristiques partagées
+    # ------------------------------------------------------------------
+    @cached_property
+    def segments(self):
+        return [segment(part) for part in split_segments(self.text)]
+
+    @cached_property
+    def offsets(self):
+        offsets, position = [], 0
+        for seg in self.segments:
+            offsets.append(position)
+            position += seg.length
+        return offsets
+
+    @cached_property
+    def keyword_counts(self):
+        counts = Counter()
+        for seg in self.segments:
+            counts.update(seg.keyword_counts)
+        return counts
+
+    def count(self, keyword):
+        return self.keyword_counts[keyword]
+
+    def has(self, keyword):
+        return self.keyword_counts[keyword] > 0
+
+    def has_any(self, keywords):
+        return any(self.keyword_counts[k] > 0 for k in keywords)
+
+    @cached_property
+    def word_count(self):
+        return sum(len(seg.words) for seg in self.segments)
+
+    @cached_property
+    def sentence_lengths(self):
+        return [n for seg in self.segments for n in seg.sentence_lengths]
+
+    @cached_property
+    def exclamations(self):
+        return sum(seg.exclamations for seg in self.segments)
+
+    # ------------------------------------------------------------------
+    # Analyses
+    # ------------------------------------------------------------------
+    @cached_property
+    def sentiment(self):
+        score = 0
+        for word, weight in SENTIMENT_POSITIVE.items():
+            score += self.count(word) * weight
+        for word, weight in SENTIMENT_NEGATIVE.items():
+            score += self.count(word) * weight
+
+        # Modificateurs d'intensité
+        if self.has('très'):
+            score *= 1.2
+        if self.has('vraiment'):
+            score *= 1.15
+
+        # Négations inversent le sentiment
+        if self.has_any(SENTIMENT_NEGATIONS):
+            score *= -0.7
+
+        if score >= 5:
+            sentiment, emoji, confidence = 'très positif', '🤩', 0.9
+        elif score >= 2:
+            sentiment, emoji, confidence = 'positif', '😊', 0.85
+        elif score >= -1:
+            sentiment, emoji, confidence = 'neutre', '😐', 0.7
+        elif score >= -4:
+            sentiment, emoji, confidence = 'négatif', '😞', 0.85
+        else:
+            sentiment, emoji, confidence = 'très négatif', '😡', 0.9
+
+        return {
+            'sentiment': sentiment,
+            'emoji': emoji,
+            'confidence': confidence,
+            'score': score,
+            'method': 'advanced_lexical'
+        }
+
+    @cached_property
+    def emotion(self):
+        detected_emotions = []
+        for emotion_name, (keywords, emoji, conf) in EMOTIONS.items():
+            match_count = sum(1 for keyword in keywords if self.has(keyword))
+            if match_count > 0:
+                detected_emotions.append((emotion_name, emoji, conf, match_count))
+
+        if detected_emotions:
+            detected_emotions.sort(key=lambda x: x[3], reverse=True)
+            emotion, emoji, confidence, _ = detected_emotions[0]
+        else:
+            emotion, emoji, confidence = 'neutre', '😐', 0.6
+
+        return {
+            'emotion': emotion,
+            'emoji': emoji,
+            'confidence': confidence,
+            'secondary_emotions': [e[0] for e in detected_emotions[1:3]],
+            'method': 'pattern_matching'
+        }
+
+    @cached_property
+    def readability(self):
+        total_sentences = len(self.sentence_lengths)
+        total_words = self.word_count
+        if not total_sentences or not total_words:
+            return {'score': 0, 'level': 'N/A', 'issues': ['Texte trop court']}
+
+        total_syllables = sum(seg.syllables for seg in self.segments)
+
+        avg_words_per_sentence = total_words / total_sentences
+        avg_syllables_per_word = total_syllables / total_words
+
+        readability = 206.835 - (1.015 * avg_words_per_sentence) - (84.6 * avg_syllables_per_word)
+        readability = max(0, min(100, readability))
+
+        if readability >= 80:
+            level, color = 'Très facile', 'success'
+        elif readability >= 60:
+            level, color = 'Facile', 'info'
+        elif readability >= 40:
+            level, color = 'Moyen', 'warning'
+        else:
+            level, color = 'Difficile', 'danger'
+
+        return {
+            'score': round(readability, 1),
+            'level': level,
+            'color': color,
+            'avg_words_per_sentence': round(avg_words_per_sentence, 1),
+            'avg_syllables_per_word': round(avg_syllables_per_word, 2),
+            'total_sentences': total_sentences,
+            'total_words': total_words
+        }
+
+    @cached_property
+    def clarity(self):
+        clarity_score = 10.0
+        issues = []
+
+        complex_words = sum(seg.complex_words for seg in self.segments)
+        if complex_words > 5:
+            issues.append(f"{complex_words} mots très longs détectés")
+            clarity_score -= 2.0
+
+        passive_count = sum(1 for ind in PASSIVE_INDICATORS if self.has(ind))
+        if passive_count > 3:
+            issues.append("Trop de constructions passives")
+            clarity_score -= 1.5
+
+        neg_count = sum(self.count(neg) for neg in CLARITY_NEGATIONS)
+        if neg_count > 2:
+            issues.append("Négations multiples (préférez l'affirmatif)")
+            clarity_score -= 1.0
+
+        acronyms = sum(seg.acronyms for seg in self.segments)
+        if acronyms > 3:
+            issues.append(f"{acronyms} acronymes détectés - définissez-les")
+            clarity_score -= 1.0
+
+        unique_words = len(set().union(*(seg.lower_words for seg in self.segments)))
+        total_words = self.word_count
+        lexical_diversity = unique_words / total_words if total_words > 0 else 0
+        if lexical_diversity < 0.4:
+            issues.append("Vocabulaire peu varié")
+            clarity_score -= 1.5
+
+        return {
+            'score': max(0, clarity_score),
+            'issues': issues,
+            'lexical_diversity': round(lexical_diversity, 2),
+            'complex_words_count': complex_words
+        }
+
+    @cached_property
+    def coherence(self):
+        issues = []
+        score = 10.0
+        sentence_lengths = self.sentence_lengths
+
+        if len(sentence_lengths) > 3 and not self.has_any(TRANSITION_WORDS):
+            issues.append("Manque de mots de transition entre les idées")
+            score -= 2.0
+
+        if sentence_lengths:
+            avg_length = sum(sentence_lengths) / len(sentence_lengths)
+            if avg_length < 5:
+                issues.append("Phrases trop courtes (style haché)")
+                score -= 1.5
+            elif avg_length > 25:
+                issues.append("Phrases trop longues (difficulté de lecture)")
+                score -= 1.5
+
+        word_freq = Counter()
+        for seg in self.segments:
+            word_freq.update(seg.long_word_freq)
+        repeated = [w for w, c in word_freq.items() if c > 3]
+        if repeated:
+            issues.append(f"Mots répétés: {', '.join(repeated[:3])}")
+            score -= 1.0
+
+        pos_count = sum(1 for w in COHERENCE_POSITIVE if self.has(w))
+        neg_count = sum(1 for w in COHERENCE_NEGATIVE if self.has(w))
+        if pos_count > 0 and neg_count > 0 and abs(pos_count - neg_count) > 3:
+            issues.append("Déséquilibre entre aspects positifs/négatifs")
+            score -= 0.5
+
+        return {
+            'score': max(0, score),
+            'issues': issues,
+            'sentence_count': len(sentence_lengths),
+            'avg_sentence_length': round(sum(sentence_lengths) / len(sentence_lengths), 1) if sentence_lengths else 0
+        }
+
+    def engagement(self, content_type):
+        engagement_score = 0.0
+
+        length = len(self.text)
+        if length > 200:
+            engagement_score += 2.0
+        elif length > 100:
+            engagement_score += 1.0
+
+        if self.sentiment['score'] > 0:
+            engagement_score += 2.0
+        elif self.sentiment['score'] < 0:
+            engagement_score -= 1.0
+
+        readability = self.readability['score']
+        if readability > 60:
+            engagement_score += 2.0
+        elif readability > 40:
+            engagement_score += 1.0
+
+        engagement_score += (self.clarity['score'] / 10) * 2.0
+        engagement_score += (self.coherence['score'] / 10) * 2.0
+
+        if content_type in ['annonce', 'difficulte']:
+            engagement_score += 1.0
+
+        total_score = max(0.0, min(10.0, engagement_score))
+        if total_score >= 7:
+            level, emoji = 'Élevé', '🔥'
+        elif total_score >= 4:
+            level, emoji = 'Moyen', '👍'
+        else:
+            level, emoji = 'Faible', '😴'
+
+        return {
+            'level': level,
+            'emoji': emoji,
+            'score': round(total_score, 1),
+            'factors': ['length', 'sentiment', 'readability', 'clarity', 'coherence', 'content_type'],
+            'method': 'heuristic'
+        }
+
+    @cached_property
+    def spam(self):
+        text = self.text
+        spam_score = 0
+        reasons = []
+
+        upper_chars = sum(seg.upper_chars for seg in self.segments)
+        is_upper = upper_chars > 0 and all(seg.no_lower for seg in self.segments)
+        if is_upper and len(text) > 20:
+            spam_score += 3
+            reasons.append("Texte entièrement en MAJUSCULES")
+
+        upper_ratio = upper_chars / len(text) if text else 0
+        if upper_ratio > 0.5:
+            spam_score += 2
+            reasons.append("Trop de majuscules")
+
+        if self.exclamations > 5:
+            spam_score += 2
+            reasons.append(f"{self.exclamations} points d'exclamation")
+
+        detected_spam = [w for w in SPAM_KEYWORDS if self.has(w)]
+        if detected_spam:
+            spam_score += len(detected_spam) * 2
+            reasons.append(f"Mots suspects: {', '.join(detected_spam[:3])}")
+
+        url_count = sum(seg.urls for seg in self.segments)
+        if url_count > 3:
+            spam_score += 2
+            reasons.append(f"{url_count} URLs détectées")
+
+        if spam_score >= 6:
+            likelihood, color, is_spam = 'Très élevé', 'danger', True
+        elif spam_score >= 4:
+            likelihood, color, is_spam = 'Élevé', 'warning', True
+        elif spam_score >= 2:
+            likelihood, color, is_spam = 'Moyen', 'info', False
+        else:
+            likelihood, color, is_spam = 'Faible', 'success', False
+
+        return {
+            'is_spam': is_spam,
+            'score': spam_score,
+            'likelihood': likelihood,
+            'color': color,
+            'reasons': reasons
+        }
+
+    @cached_property
+    def text_urgency(self):
+        """Partie de l'urgence qui ne dépend que du texte : (score, raisons)."""
+        urgency_score = 0
+        reasons = []
+        for keyword, score in URGENCY_KEYWORDS.items():
+            if self.has(keyword):
+                urgency_score += score
+                reasons.append(f"Mot-clé: '{keyword}' (+{score})")
+        if self.exclamations >= 3:
+            urgency_score += 2
+            reasons.append(f"{self.exclamations} points d'exclamation")
+        return urgency_score, reasons
+
+    def urgency(self, deadline):
+        score, reasons = self.text_urgency
+        return urgency_result(score, list(reasons), deadline)
+
+    @cached_property
+    def action_items(self):
+        action_items = []
+        for pattern, priority in ACTION_PATTERNS:
+            for match in pattern.finditer(self.text):
+                action = match.group(1).strip()
+                action_lower = action.lower()
+                if any(word in action_lower for word in ACTION_URGENCY_WORDS):
+                    priority = 'high'
+                action_items.append({
+                    'action': action,
+                    'priority': priority,
+                    'type': 'extracted',
+                    'position': match.start()
+                })
+
+        for match in LIST_ITEM.finditer(self.text):
+            action_items.append({
+                'action': match.group(1).strip(),
+                'priority': 'normal',
+                'type': 'list_item',
+                'position': match.start()
+            })
+
+        unique_actions = []
+        seen = set()
+        for item in action_items:
+            action_lower = item['action'].lower()
+            if action_lower not in seen and len(action_lower) > 5:
+                seen.add(action_lower)
+                unique_actions.append(item)
+
+        return sorted(unique_actions, key=lambda x: PRIORITY_ORDER[x['priority']])[:8]
+
+    def tags(self, content_type, max_tags=5):
+        tags = set()
+        tags.update(DEFAULT_TAGS.get(content_type, []))
+
+        capitalized = CAPITALIZED_WORD.findall(self.text)
+        tags.update(word.lower() for word in capitalized[:3])
+
+        word_freq = Counter(w.lower() for w in LONG_WORD.findall(self.text))
+        frequent = [w for w, c in word_freq.items() if c >= 2]
+        tags.update(frequent[:2])
+
+        for tag, keywords in CONTEXT_TAGS.items():
+            if self.has_any(keywords):
+                tags.add(tag)
+
+        filtered_tags = [t for t in tags if 3 <= len(t) <= 20]
+        return filtered_tags[:max_tags]
+
+    @cached_property
+    def grammar(self):
+        text = self.text
+        suggestions = []
+
+        # 1. Espaces multiples
+        if '  ' in text:
+            suggestions.append({
+                'type': 'grammar',
+                'severity': 'low',
+                'message': 'Espaces multiples détectés',
+                'replacements': [text.replace('  ', ' ')],
+                'context': 'Utilisez un seul espace entre les mots',
+                'position': text.find('  ')
+            })
+
+        # 2. Ponctuation finale
+        if len(text) > 20 and not text.rstrip().endswith(('.', '!', '?', '…')):
+            suggestions.append({
+                'type': 'grammar',
+                'severity': 'medium',
+                'message': 'Ponctuation finale manquante',
+                'replacements': [text + '.'],
+                'context': 'Ajoutez un point, point d\'exclamation ou d\'interrogation',
+                'position': len(text)
+            })
+
+        # 3. Majuscule initiale
+        if text and not text[0].isupper() and not text[0].isdigit() and text[0] not in ['(', '[', '"', '\'']:
+            suggestions.append({
+                'type': 'grammar',
+                'severity': 'medium',
+                'message': 'Majuscule initiale manquante',
+                'replacements': [text[0].upper() + text[1:]],
+                'context': 'Commencez par une majuscule',
+                'position': 0
+            })
+
+        segments = list(zip(self.segments, self.offsets))
+
+        # 4. Erreurs orthographiques courantes
+        for index, (_, correction) in enumerate(SPELLING_PATTERNS):
+            for seg, offset in segments:
+                for start, found in seg.spelling[index]:
+                    suggestions.append({
+                        'type': 'spelling',
+                        'severity': 'high',
+                        'message': f'Orthographe incorrecte: "{found}"',
+                        'replacements': [correction],
+                        'context': f'Utilisez "{correction}" au lieu de "{found}"',
+                        'position': offset + start
+                    })
+
+        # 5. Espace avant ponctuation (peut chevaucher deux segments)
+        if SPACE_BEFORE_PUNCT.search(text):
+            suggestions.append({
+                'type': 'grammar',
+                'severity': 'low',
+                'message': 'Espace avant ponctuation',
+                'replacements': [],
+                'context': 'Évitez les espaces avant , ; : ! ?',
+                'position': -1
+            })
+
+        # 6. Espaces après ponctuation
+        for seg, offset in segments:
+            for start in seg.missing_spaces:
+                suggestions.append({
+                    'type': 'grammar',
+                    'severity': 'medium',
+                    'message': 'Espace manquant après ponctuation',
+                    'replacements': [],
+                    'context': 'Ajoutez un espace après la ponctuation',
+                    'position': offset + start
+                })
+
+        # 7. Répétitions de mots (y compris de part et d'autre d'une frontière)
+        repeated = []
+        previous = None
+        for seg in self.segments:
+            if seg.lower_words:
+                first = seg.lower_words[0]
+                if previous == first and len(first) > 2:
+                    repeated.append(first)
+                previous = seg.lower_words[-1]
+            repeated.extend(seg.repeated_words)
+        for word in repeated:
+            suggestions.append({
+                'type': 'style',
+                'severity': 'low',
+                'message': f'Répétition détectée: "{word}"',
+                'replacements': [],
+                'context': 'Évitez les répétitions consécutives',
+                'position': -1
+            })
+
+        # 8. Phrases trop longues (> 30 mots)
+        for seg in self.segments:
+            for word_count in seg.long_sentences:
+                suggestions.append({
+                    'type': 'readability',
+                    'severity': 'low',
+                    'message': f'Phrase très longue ({word_count} mots)',
+                    'replacements': [],
+                    'context': 'Divisez en phrases plus courtes pour la lisibilité',
+                    'position': -1
+                })
+
+        # 9. Redondances
+        for index, (_, replacement) in enumerate(REDUNDANT_PATTERNS):
+            if any(seg.redundant[index] for seg in self.segments):
+                suggestions.append({
+                    'type': 'style',
+                    'severity': 'low',
+                    'message': 'Expression redondante détectée',
+                    'replacements': [replacement],
+                    'context': 'Simplifiez l\'expression',
+                    'position': -1
+                })
+
+        return suggestions[:10]
+
+    def has_spelling_error(self, index):
+        """Vrai si le motif ``SPELLING_PATTERNS[index]`` apparaît dans le texte."""
+        return any(seg.spelling[index] for seg in self.segments)
+
+    @cached_property
+    def date_matches(self):
+        """Dates repérées dans le texte (positions absolues), par type."""
+        numeric, textual, future = [], [], []
+        relative = [None] * len(RELATIVE_DATES)
+        for seg, offset in zip(self.segments, self.offsets):
+            if not seg.has_dates:
+                continue
+            numeric.extend((offset + start, found) for start, found in seg.numeric_dates)
+            textual.extend((offset + start, found) for start, found in seg.textual_dates)
+            future.extend((offset + start, found, amount, unit) for start, found, amount, unit in seg.future_dates)
+            for index, match in enumerate(seg.relative_dates):
+                if match and relative[index] is None:
+                    relative[index] = (offset + match[0], match[1])
+        return {
+            'numeric': numeric,
+            'textual': textual,
+            # Première occurrence de chaque expression relative, avec son décalage en jours
+            'relative': [(days, match) for (_, days), match in zip(RELATIVE_DATES, relative) if match],
+            'future': future,
+        }
+
+
+def deadline_urgency(deadline, now=None):
+    """Points et raisons d'urgence liés à l'échéance (dépend de l'heure courante)."""
+    if not deadline:
+        return 0, []
+    try:
+        now = now or datetime.utcnow()
+        delta = deadline - now
+        days_left = delta.days
+        hours_left = delta.seconds // 3600
+    except Exception:
+        return 0, []
+    if days_left < 0:
+        return 10, ["⚠️ Échéance dépassée!"]
+    if days_left == 0:
+        return 8, [f"Aujourd'hui ({hours_left}h restantes)"]
+    if days_left == 1:
+        return 6, ["Demain"]
+    if days_left <= 3:
+        return 4, [f"Dans {days_left} jours"]
+    if days_left <= 7:
+        return 2, [f"Cette semaine ({days_left}j)"]
+    return 0, []
+
+
+def urgency_result(text_score, reasons, deadline, now=None):
+    deadline_score, deadline_reasons = deadline_urgency(deadline, now)
+    urgency_score = text_score + deadline_score
+    reasons = reasons + deadline_reasons
+
+    if urgency_score >= 10:
+        level, emoji, color = 'Critique', '🔴', 'danger'
+    elif urgency_score >= 6:
+        level, emoji, color = 'Très élevé', '🟠', 'warning'
+    elif urgency_score >= 4:
+        level, emoji, color = 'Élevé', '🟡', 'warning'
+    elif urgency_score >= 2:
+        level, emoji, color = 'Moyen', '🔵', 'info'
+    else:
+        level, emoji, color = 'Normal', '🟢', 'success'
+
+    return {
+        'level': level,
+        'emoji': emoji,
+        'color': color,
+        'score': urgency_score,
+        'reasons': reasons,
+        'percentage': min(100, urgency_score * 10)
+    }
+
+
+@lru_cache(maxsize=64)
+def features(text: str) -> TextFeatures:
+    """Caractéristiques d'un texte, partagées entre appels successifs sur le même texte."""
+    return TextFeatures(text)
+
+
+# ================== Analyse complète d'un post ==================
+
+def analysis_hash(description, content_type):
+    payload = f"{ANALYSIS_VERSION}\x00{content_type or ''}\x00{description or ''}"
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+@lru_cache(maxsize=512)
+def _analyze(digest, description, content_type):
+    f = TextFeatures(description)
+    urgency_score, urgency_reasons = f.text_urgency
+    return {
+        'sentiment': f.sentiment,
+        'emotion': f.emotion,
+        'engagement': f.engagement(content_type),
+        'spam_check': f.spam,
+        'action_items': f.action_items,
+        'suggested_tags': f.tags(content_type),
+        'text_urgency': {'score': urgency_score, 'reasons': urgency_reasons},
+    }
+
+
+def analyze_text(description, content_type):
+    """Analyse (hors échéance) mémorisée par empreinte ; copie modifiable."""
+    return copy.deepcopy(_analyze(analysis_hash(description, content_type), description or '', content_type))
+
+
+def with_urgency(analysis, deadline, now=None):
+    """Ajoute l'urgence complète (texte + échéance) à une analyse enregistrée."""
+    text_urgency = analysis.get('text_urgency') or {'score': 0, 'reasons': []}
+    result = dict(analysis)
+    result['urgency'] = urgency_result(text_urgency['score'], list(text_urgency['reasons']), deadline, now)
+    return result
+
+
+def analysis_for(feed_item):
+    """Analyse complète d'un FeedItem, relue depuis le document si le texte n'a pas changé."""
+    digest = analysis_hash(feed_item.description, feed_item.content_type)
+    stored = feed_item.ai_analysis if feed_item.ai_analysis_hash == digest else None
+    if not stored:
+        stored = analyze_text(feed_item.description, feed_item.content_type)
+        feed_item.ai_analysis = stored
+        feed_item.ai_analysis_hash = digest
+        if feed_item.pk:
+            try:
+                # update() : ne touche ni updated_at ni les statistiques du feed
+                type(feed_item).objects(id=feed_item.pk).update(
+                    set__ai_analysis=stored, set__ai_analysis_hash=digest
+                )
+            except Exception as e:
+                print(f"[feed] Analyse non enregistrée pour {feed_item.pk}: {e}")
+    return with_urgency(stored, feed_item.deadline)
@@ -9,6 +9,7 @@
     path('create/', views.feed_create, name='create'),
     
     path('export/pdf/', views.feed_export_pdf, name='export_pdf'),
+    path('api/items/', views.feed_items_api, name='api_items'),
     
     path('ai/check-content/', views.ai_check_content, name='ai_check_content'),
     path('ai/weekly-summary/', views.generate_weekly_summary, name='generate_weekly_summary'),
@@ -22,5 +23,7 @@
     path('<str:pk>/update/', views.feed_update, name='update'),
     path('<str:pk>/delete/', views.feed_delete, name='delete'),
     path('<str:pk>/generate-tiktok/', views.generate_tiktok_video, name='generate_tiktok'),
+    path('<str:pk>/tiktok-status/', views.tiktok_video_status, name='tiktok_status'),
+    path('<str:pk>/tiktok-cancel/', views.cancel_tiktok_video, name='tiktok_cancel'),
 ]
 
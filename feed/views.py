@@ -2,82 +2,99 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
-from django.http import HttpResponse, JsonResponse
-from django.template.loader import get_template
+from django.http import JsonResponse
+from django.urls import reverse
 from django.views.decorators.http import require_POST, require_http_methods
 from bson.errors import InvalidId
-from datetime import datetime, timedelta
-from xhtml2pdf import pisa
 import json
-from pathlib import Path
+
+from exports.jobs import ExportError, export_response
 
 from .models import FeedItem
 from .forms import FeedItemForm, FeedItemSearchForm
+from .pagination import (
+    FeedPaginator, InvalidCursor, cursor_page, feed_stats, filter_feed_items, order_queryset,
+)
+from .authors import hydrate_authors
 from .ai_services import AIWritingAssistant, AIContentEnricher, AIRecurringContentGenerator
+from .text_analysis import analysis_for
 
-from .ai_video_services import AIVideoGenerator
-from .video_generator import TikTokVideoGenerator
+from . import jobs as video_jobs
+from . import dashboard, exports, live_check, reminders
 
 
 # ========== VUES PRINCIPALES ==========
 
 def feed_list(request):
     """Liste des éléments du feed avec recherche et filtres"""
-    feed_items = FeedItem.objects(is_active=True)
-    
     search_form = FeedItemSearchForm(request.GET)
+    feed_items, ordering = filter_feed_items(FeedItem.objects(is_active=True), search_form)
+    feed_items = order_queryset(feed_items, ordering)
     
-    if search_form.is_valid():
-        search_query = search_form.cleaned_data.get('search_query')
-        if search_query:
-            # Utilisation de __raw__ pour MongoDB regex
-            feed_items = feed_items.filter(
-                __raw__={
-                    '$or': [
-                        {'title': {'$regex': search_query, '$options': 'i'}},
-                        {'description': {'$regex': search_query, '$options': 'i'}}
-                    ]
-                }
-            )
-        
-        content_type = search_form.cleaned_data.get('content_type')
-        if content_type:
-            feed_items = feed_items.filter(content_type=content_type)
-        
-        ordering = search_form.cleaned_data.get('ordering', '-created_at')
-        if ordering:
-            feed_items = feed_items.order_by(ordering)
-    else:
-        feed_items = feed_items.order_by('-created_at')
-    
-    # Pagination
-    feed_items_list = list(feed_items)
-    paginator = Paginator(feed_items_list, 10)
+    # Pagination côté MongoDB (count + skip/limit)
+    paginator = FeedPaginator(feed_items, 10)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
-    
-    # Statistiques
-    stats = {
-        'total_items': FeedItem.objects(is_active=True).count(),
-        'content_types': len(FeedItem.objects(is_active=True).distinct('content_type')),
-        'urgent_items': FeedItem.objects(
-            is_active=True,
-            deadline__lte=datetime.utcnow() + timedelta(days=3),
-            deadline__gte=datetime.utcnow()
-        ).count()
-    }
+    # Auteurs de la page en une seule requête
+    page_obj.object_list = hydrate_authors(page_obj.object_list)
     
     context = {
         'page_obj': page_obj,
         'search_form': search_form,
-        'stats': stats,
+        'stats': feed_stats(),
         'page_title': 'Feed - Fil d\'actualité'
     }
     
     return render(request, 'feed/feed_list.html', context)
 
 
+@require_http_methods(["GET"])
+def feed_items_api(request):
+    """
+    API JSON pour le défilement infini
+    Paramètres: mêmes filtres que la liste, cursor, limit (max 50)
+    """
+    search_form = FeedItemSearchForm(request.GET)
+    feed_items, ordering = filter_feed_items(FeedItem.objects(is_active=True), search_form)
+    
+    try:
+        limit = max(1, min(int(request.GET.get('limit', 20)), 50))
+    except ValueError:
+        limit = 20
+    
+    try:
+        items, next_cursor = cursor_page(
+            feed_items.exclude('ai_suggestions', 'suggested_resources', 'tiktok_metadata'),
+            ordering,
+            cursor=request.GET.get('cursor'),
+            limit=limit
+        )
+    except InvalidCursor as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    
+    return JsonResponse({
+        'success': True,
+        'items': [
+            {
+                'id': str(item.id),
+                'title': item.title,
+                'description': item.description,
+                'content_type': item.content_type,
+                'author_id': item.author_id,
+                'created_at': item.created_at.isoformat() if item.created_at else None,
+                'deadline': item.deadline.isoformat() if item.deadline else None,
+                'is_urgent': item.is_urgent(),
+                'is_ai_generated': item.is_ai_generated,
+                'ai_quality_score': item.ai_quality_score,
+                'ai_tone': item.ai_tone,
+                'url': reverse('feed:detail', args=[str(item.id)]),
+            }
+            for item in items
+        ],
+        'next_cursor': next_cursor,
+    })
+
+
 def feed_detail(request, pk):
     """Détail d'un élément du feed avec analyse IA"""
     try:
@@ -86,30 +103,8 @@ def feed_detail(request, pk):
         messages.error(request, '❌ Élément introuvable.')
         return redirect('feed:list')
     
-    # Enrichissement IA pour l'affichage
-    assistant = AIWritingAssistant()
-    enricher = AIContentEnricher()
-    
-    # Analyse du sentiment
-    sentiment = assistant.analyze_sentiment(feed_item.description)
-    
-    # Détection de l'émotion
-    emotion = assistant.detect_emotion(feed_item.description)
-    
-    # Prédiction d'engagement
-    engagement = assistant.predict_engagement(feed_item.description, feed_item.content_type)
-    
-    # Niveau d'urgence
-    urgency = enricher.detect_urgency_level(feed_item.description, feed_item.deadline)
-    
-    # Détection de spam
-    spam_check = assistant.detect_spam_likelihood(feed_item.description)
-    
-    # Actions à faire
-    action_items = enricher.extract_action_items(feed_item.description)
-    
-    # Tags suggérés
-    suggested_tags = enricher.suggest_tags(feed_item.description, feed_item.content_type)
+    # Analyse IA : relue depuis le document tant que la description n'a pas changé
+    analysis = analysis_for(feed_item)
     
     # CORRECTION: Passer l'user_id au template
     current_user_id = request.session.get('_auth_user_id')
@@ -118,13 +113,13 @@ def feed_detail(request, pk):
         'feed_item': feed_item,
         'page_title': feed_item.title,
         'current_user_id': str(current_user_id) if current_user_id else None,
-        'sentiment': sentiment,
-        'emotion': emotion,
-        'engagement': engagement,
-        'urgency': urgency,
-        'spam_check': spam_check,
-        'action_items': action_items,
-        'suggested_tags': suggested_tags,
+        'sentiment': analysis['sentiment'],
+        'emotion': analysis['emotion'],
+        'engagement': analysis['engagement'],
+        'urgency': analysis['urgency'],
+        'spam_check': analysis['spam_check'],
+        'action_items': analysis['action_items'],
+        'suggested_tags': analysis['suggested_tags'],
     }
     
     return render(request, 'feed/feed_detail.html', context)
@@ -303,53 +298,12 @@ def feed_delete(request, pk):
 
 
 def feed_export_pdf(request):
-    """Exporte la liste des feed items en PDF"""
-    feed_items = FeedItem.objects(is_active=True)
-    
-    search_form = FeedItemSearchForm(request.GET)
-    
-    if search_form.is_valid():
-        search_query = search_form.cleaned_data.get('search_query')
-        if search_query:
-            feed_items = feed_items.filter(
-                __raw__={
-                    '$or': [
-                        {'title': {'$regex': search_query, '$options': 'i'}},
-                        {'description': {'$regex': search_query, '$options': 'i'}}
-                    ]
-                }
-            )
-        
-        content_type = search_form.cleaned_data.get('content_type')
-        if content_type:
-            feed_items = feed_items.filter(content_type=content_type)
-        
-        ordering = search_form.cleaned_data.get('ordering', '-created_at')
-        if ordering:
-            feed_items = feed_items.order_by(ordering)
-    
-    context = {
-        'feed_items': list(feed_items),
-        'stats': {
-            'total_items': feed_items.count(),
-            'export_date': datetime.now().strftime('%d/%m/%Y %H:%M')
-        },
-        'page_title': 'Export PDF - Feed'
-    }
-    
-    template = get_template('feed/feed_pdf.html')
-    html = template.render(context)
-    
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="feed_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf"'
-    
-    pisa_status = pisa.CreatePDF(html, dest=response)
-    
-    if pisa_status.err:
+    """Exporte la liste des feed items en PDF (en arrière-plan si elle est longue)"""
+    try:
+        return export_response(request, 'feed', exports.FeedExport.params_from(request.GET))
+    except ExportError:
         messages.error(request, 'Erreur lors de la génération du PDF')
         return redirect('feed:list')
-    
-    return response
 
 
 # ========== FONCTIONNALITÉS IA AVANCÉES ==========
@@ -369,50 +323,21 @@ def ai_check_content(request):
                 'error': 'Texte trop court ou vide'
             })
         
-        # Initialiser les services IA
-        assistant = AIWritingAssistant()
-        enricher = AIContentEnricher()
-        
-        # Vérifications grammaticales
-        grammar_issues = assistant.check_grammar(text)
-        
-        # Suggestions d'amélioration
-        improvements = assistant.suggest_improvements(text, content_type)
-        
-        # Extraction de dates
-        extracted_dates = enricher.extract_dates(text)
-        
-        # Vérification du ton
-        tone_suggestion = assistant._check_tone(text, content_type)
-        
-        # Analyse de sentiment
-        sentiment = assistant.analyze_sentiment(text)
-        
-        # Prédiction d'engagement
-        engagement = assistant.predict_engagement(text, content_type)
-        
-        # Score qualité
-        quality_score = assistant.calculate_quality_score(text, content_type)
-        
-        # Correction automatique
-        auto_correct = assistant.auto_correct_common_errors(text)
+        # Une vérification à la fois par session ; les requêtes dépassées sont abandonnées.
+        # Sans session, pas de regroupement : derrière nginx, tous les anonymes
+        # partagent la même REMOTE_ADDR et se remplaceraient mutuellement.
+        session_key = request.session.session_key
+        if not session_key:
+            result = live_check.check_content(text, content_type)
+        else:
+            result = live_check.coalescer.run(
+                session_key, (text, content_type),
+                lambda: live_check.check_content(text, content_type)
+            )
+        if result is None:
+            return JsonResponse({'success': False, 'superseded': True})
         
-        return JsonResponse({
-            'success': True,
-            'grammar_issues': grammar_issues[:5],
-            'improvements': improvements,
-            'extracted_dates': [d['text'] for d in extracted_dates],
-            'tone_suggestion': tone_suggestion,
-            'sentiment': sentiment,
-            'engagement': engagement,
-            'quality_score': quality_score,
-            'auto_correct': auto_correct,
-            'stats': {
-                'length': len(text),
-                'words': len(text.split()),
-                'sentences': text.count('.') + text.count('!') + text.count('?')
-            }
-        })
+        return JsonResponse({'success': True, **result})
         
     except Exception as e:
         print(f"ERROR ai_check_content: {e}")
@@ -430,15 +355,11 @@ def generate_weekly_summary(request):
     des activités du feed
     """
     try:
-        # Récupérer les posts de la semaine dernière
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        feed_items = list(FeedItem.objects(
-            created_at__gte=week_ago, 
-            is_active=True
-        ))
+        # Statistiques de la semaine agrégées par MongoDB
+        stats = dashboard.weekly_stats(days=7)
         
         generator = AIRecurringContentGenerator()
-        summary_data = generator.generate_weekly_summary(feed_items)
+        summary_data = generator.weekly_summary_from_stats(stats)
         
         if summary_data:
             # Créer le post de résumé
@@ -464,7 +385,7 @@ def generate_weekly_summary(request):
             messages.success(
                 request, 
                 f'📊 Résumé hebdomadaire généré et publié avec succès ! '
-                f'({len(feed_items)} élément(s) analysé(s))'
+                f'({stats["total"]} élément(s) analysé(s))'
             )
         else:
             messages.warning(
@@ -488,24 +409,16 @@ def check_missing_content(request):
     sur les 7 derniers jours
     """
     try:
-        # Récupérer les posts de la semaine
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        feed_items = list(FeedItem.objects(
-            created_at__gte=week_ago, 
-            is_active=True
-        ))
+        # Répartition par type des 7 derniers jours (agrégation MongoDB)
+        recent = dashboard.summarize(dashboard.recent_match(days=7))
+        content_distribution = recent['by_type']
         
         generator = AIRecurringContentGenerator()
-        missing_suggestions = generator.detect_missing_content(feed_items, days=7)
-        
-        # Statistiques supplémentaires
-        content_distribution = {}
-        for item in feed_items:
-            content_distribution[item.content_type] = content_distribution.get(item.content_type, 0) + 1
+        missing_suggestions = generator.missing_content_from_counts(content_distribution, days=7)
         
         context = {
             'suggestions': missing_suggestions,
-            'feed_items_count': len(feed_items),
+            'feed_items_count': recent['total'],
             'content_distribution': content_distribution,
             'analysis_period': '7 derniers jours',
             'page_title': 'Analyse des contenus manquants'
@@ -525,45 +438,15 @@ def generate_deadline_reminders(request):
     proches (dans les 3 prochains jours)
     """
     try:
-        # Items avec deadline dans les 3 prochains jours
-        now = datetime.utcnow()
-        upcoming_deadline = now + timedelta(days=3)
-        
-        feed_items = FeedItem.objects(
-            deadline__lte=upcoming_deadline,
-            deadline__gte=now,
-            is_active=True
-        )
-        
-        generator = AIRecurringContentGenerator()
-        reminders_created = 0
         user_id = request.session.get('_auth_user_id')
         
         if not user_id:
             messages.error(request, '❌ Erreur d\'authentification.')
             return redirect('accounts:login')
         
-        # Générer un rappel pour chaque échéance
-        for item in feed_items:
-            reminder_data = generator.generate_deadline_reminder(item)
-            
-            if reminder_data:
-                # Vérifier qu'un rappel n'existe pas déjà
-                existing_reminder = FeedItem.objects(
-                    title__icontains=item.title,
-                    is_ai_generated=True,
-                    created_at__gte=now - timedelta(days=1)
-                ).first()
-                
-                if not existing_reminder:
-                    reminder = FeedItem(
-                        **reminder_data,
-                        author_id=str(user_id),
-                        ai_quality_score=7.5,
-                        ai_tone='urgent'
-                    )
-                    reminder.save()
-                    reminders_created += 1
+        # Rappels manquants créés par lot (voir feed/reminders.py)
+        result = reminders.generate_reminders(author_id=str(user_id))
+        reminders_created = result['created']
         
         if reminders_created > 0:
             messages.success(
@@ -601,27 +484,17 @@ def ai_analyze_content(request):
         
         feed_item = FeedItem.objects.get(id=content_id)
         
-        assistant = AIWritingAssistant()
-        enricher = AIContentEnricher()
-        
-        # Analyses complètes
-        sentiment = assistant.analyze_sentiment(feed_item.description)
-        emotion = assistant.detect_emotion(feed_item.description)
-        engagement = assistant.predict_engagement(feed_item.description, feed_item.content_type)
-        urgency = enricher.detect_urgency_level(feed_item.description, feed_item.deadline)
-        spam_check = assistant.detect_spam_likelihood(feed_item.description)
-        action_items = enricher.extract_action_items(feed_item.description)
-        tags = enricher.suggest_tags(feed_item.description, feed_item.content_type)
+        analysis = analysis_for(feed_item)
         
         return JsonResponse({
             'success': True,
-            'sentiment': sentiment,
-            'emotion': emotion,
-            'engagement': engagement,
-            'urgency': urgency,
-            'spam_check': spam_check,
-            'action_items': action_items,
-            'tags': tags
+            'sentiment': analysis['sentiment'],
+            'emotion': analysis['emotion'],
+            'engagement': analysis['engagement'],
+            'urgency': analysis['urgency'],
+            'spam_check': analysis['spam_check'],
+            'action_items': analysis['action_items'],
+            'tags': analysis['suggested_tags']
         })
         
     except Exception as e:
@@ -659,31 +532,23 @@ def ai_dashboard(request):
     Tableau de bord IA avec statistiques et analyses globales
     """
     try:
-        # Récupérer tous les items
-        all_items = list(FeedItem.objects(is_active=True))
-        
-        assistant = AIWritingAssistant()
+        # Statistiques globales (agrégation MongoDB ou agrégat quotidien)
+        summary = dashboard.dashboard_summary()
+        total_items = summary['total']
+        avg_quality = summary['quality_sum'] / total_items if total_items > 0 else 0
         
-        # Statistiques globales
-        total_items = len(all_items)
-        avg_quality = sum(item.ai_quality_score for item in all_items) / total_items if total_items > 0 else 0
+        # Distributions par type et par ton
+        type_distribution = summary['by_type']
+        tone_distribution = summary['by_tone']
         
-        # Distribution par type
-        type_distribution = {}
-        for item in all_items:
-            type_distribution[item.content_type] = type_distribution.get(item.content_type, 0) + 1
-        
-        # Distribution par ton
-        tone_distribution = {}
-        for item in all_items:
-            tone = item.ai_tone or 'non défini'
-            tone_distribution[tone] = tone_distribution.get(tone, 0) + 1
-        
-        # Items avec meilleur score
-        top_quality_items = sorted(all_items, key=lambda x: x.ai_quality_score, reverse=True)[:5]
+        # Items avec meilleur score (tri + limite côté MongoDB)
+        top_quality_items = dashboard.top_quality_items(5)
         
         # Items urgents
-        urgent_items = [item for item in all_items if item.is_urgent()]
+        urgent_items = dashboard.urgent_items()
+        
+        # Auteurs des éléments affichés en une seule requête
+        hydrate_authors(top_quality_items + urgent_items)
         
         context = {
             'total_items': total_items,
@@ -703,7 +568,7 @@ def ai_dashboard(request):
 
 
 def generate_tiktok_video(request, pk):
-    """Génère une vidéo TikTok à partir d'un post"""
+    """Met en file la génération d'une vidéo TikTok à partir d'un post"""
     try:
         feed_item = FeedItem.objects.get(id=pk)
     except (FeedItem.DoesNotExist, InvalidId):
@@ -712,97 +577,55 @@ def generate_tiktok_video(request, pk):
     
     if request.method == 'POST':
         try:
-            print(f"\n{'='*50}")
-            print(f"🎬 GÉNÉRATION VIDÉO TIKTOK - {feed_item.title}")
-            print(f"{'='*50}\n")
-            
-            # Statut processing
-            feed_item.tiktok_video_status = 'processing'
-            feed_item.save()
-            
-            # Créer dossier temp
-            from django.conf import settings
-            temp_dir = Path(settings.MEDIA_ROOT) / 'temp_video'
-            temp_dir.mkdir(parents=True, exist_ok=True)
-            
-            # 1. Script
-            print("1️⃣ Génération du script...")
-            video_gen = AIVideoGenerator()
-            script_result = video_gen.generate_tiktok_script(feed_item)
-            
-            if not script_result['success']:
-                raise Exception(f"Erreur script: {script_result['error']}")
-            
-            script = script_result['script']
-            print(f"✅ Script ({script_result['word_count']} mots):\n{script[:100]}...\n")
-            
-            # 2. Audio
-            print("2️⃣ Génération audio...")
-            audio_path = temp_dir / f"audio_{pk}.mp3"
-            audio_result = video_gen.generate_audio(script, str(audio_path))
-            
-            if not audio_result['success']:
-                raise Exception(f"Erreur audio: {audio_result['error']}")
-            print(f"✅ Audio généré: {audio_path}\n")
-            
-            # Skip subtitles as per request
-            
-            # 4. Vidéo
-            print("3️⃣ Assemblage vidéo (sans sous-titres)...")
-            video_generator = TikTokVideoGenerator()
-            video_result = video_generator.generate_video(
-                feed_item,
-                script,
-                str(audio_path),
-                None  # No subtitles
-            )
-            
-            if not video_result['success']:
-                raise Exception(f"Erreur vidéo: {video_result['error']}")
-            
-            # 5. Mise à jour modèle
-            video_path = video_result['video_path']
-            video_filename = Path(video_path).name
-            video_url = f"/media/feed_videos/{video_filename}"
-            
-            feed_item.tiktok_video_url = video_url
-            feed_item.tiktok_video_status = 'completed'
-            feed_item.tiktok_generation_date = datetime.utcnow()
-            feed_item.tiktok_metadata = {
-                'script': script,
-                'duration': video_result['duration'],
-                'word_count': script_result['word_count'],
-                'model': script_result['model']
-            }
-            feed_item.save()
-            
-            # Nettoyage
-            try:
-                os.remove(audio_path)
-            except:
-                pass
-            
-            print(f"\n✅ VIDÉO GÉNÉRÉE AVEC SUCCÈS!")
-            print(f"📹 URL: {video_url}")
-            print(f"⏱️ Durée: {video_result['duration']:.1f}s\n")
-            
-            messages.success(request, f'🎉 Vidéo TikTok générée avec succès ! (Durée: {video_result["duration"]:.0f}s)')
-            return redirect('feed:detail', pk=str(feed_item.id))
-            
+            job, created = video_jobs.submit(feed_item, requested_by=request.session.get('_auth_user_id'))
+            if created:
+                messages.success(request, '🎬 Génération de la vidéo TikTok lancée ! La page se mettra à jour automatiquement.')
+            else:
+                messages.info(request, 'ℹ️ Une génération est déjà en cours pour cet élément.')
         except Exception as e:
-            feed_item.tiktok_video_status = 'failed'
-            feed_item.save()
-            
-            print(f"\n❌ ERREUR: {str(e)}\n")
-            import traceback
-            traceback.print_exc()
-            
+            print(f"ERROR generate_tiktok_video: {e}")
             messages.error(request, f'❌ Erreur: {str(e)}')
-            return redirect('feed:detail', pk=str(feed_item.id))
+        return redirect('feed:detail', pk=str(feed_item.id))
     
     # GET: Afficher confirmation
     context = {
         'feed_item': feed_item,
         'page_title': 'Générer Vidéo TikTok'
     }
-    return render(request, 'feed/generate_tiktok_confirm.html', context)
\ No newline at end of file
+    return render(request, 'feed/generate_tiktok_confirm.html', context)
+
+
+@require_http_methods(["GET"])
+def tiktok_video_status(request, pk):
+    """Statut / progression JSON de la génération vidéo d'un post"""
+    try:
+        feed_item = FeedItem.objects.only(
+            'id', 'tiktok_video_status', 'tiktok_video_url', 'tiktok_metadata'
+        ).get(id=pk)
+    except (FeedItem.DoesNotExist, InvalidId):
+        return JsonResponse({'success': False, 'error': 'Élément introuvable'}, status=404)
+    
+    job = video_jobs.latest_job(feed_item.pk)
+    return JsonResponse({
+        'success': True,
+        'status': feed_item.tiktok_video_status,
+        'video_url': feed_item.tiktok_video_url if feed_item.tiktok_video_status == 'completed' else None,
+        'duration': (feed_item.tiktok_metadata or {}).get('duration'),
+        'job': job.as_dict() if job else None,
+    })
+
+
+@require_POST
+def cancel_tiktok_video(request, pk):
+    """Annule la génération vidéo en file ou en cours"""
+    job = video_jobs.active_job(pk)
+    cancelled = bool(job) and video_jobs.cancel(job)
+    
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        return JsonResponse({'success': cancelled, 'job': job.as_dict() if job else None})
+    
+    if cancelled:
+        messages.info(request, '⏹️ Génération de la vidéo annulée.')
+    else:
+        messages.warning(request, 'ℹ️ Aucune génération en cours pour cet élément.')
+    return redirect('feed:detail', pk=pk)
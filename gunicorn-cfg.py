@@ -6,3 +6,19 @@
 loglevel = 'debug'
 capture_output = True
 enable_stdio_inheritance = True
+
+
+def post_worker_init(worker):
+    # Load the configured AI models once per worker instead of on the first request
+    from searchx.model_registry import registry
+    registry.warm_up()
+
+
+def worker_exit(server, worker):
+    # Write buffered interaction events before the worker goes away
+    from searchx.ingestion import buffer
+    buffer.shutdown()
+
+    # Stop claiming new video jobs; an interrupted job is picked up again after FEED_VIDEO_JOB_TIMEOUT
+    from feed.jobs import runner
+    runner.shutdown(timeout=1.0)
@@ -0,0 +1,93 @@
+"""Export PDF du tableau de bord des signalements (voir exports/jobs.py).
+
+Les signalements sont lus par tranches depuis un curseur ; chaque tranche
+devient une table reportlab qui n'est créée qu'au moment où la mise en page
+l'atteint (``LazyFlowables``), si bien que la mémoire ne dépend pas du
+nombre de signalements.
+"""
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from exports.jobs import LazyFlowables, chunk_size, chunked
+
+from .models import Report
+
+HEADER = ["Titre", "Signalé par", "Plagiat", "NSFW", "Score IA"]
+COL_WIDTHS = [300, 150, 60, 60, 80]
+TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#4e73df")),  # header background
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),  # header text
+    ('ALIGN', (1, 1), (-1, -1), 'CENTER'),  # center all except first column
+    ('ALIGN', (0, 1), (0, -1), 'LEFT'),  # left-align "Titre"
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+    ('TOPPADDING', (0, 0), (-1, 0), 10),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.whitesmoke, colors.lightgrey]),
+])
+
+
+def report_row(report):
+    return [
+        report.title,
+        report.flagged_by,
+        "Oui" if report.is_plagiarism else "Non",
+        "Oui" if report.is_nsfw else "Non",
+        f"{report.ai_confidence:.2f}",
+    ]
+
+
+def report_table(rows):
+    table = Table([HEADER] + rows, repeatRows=1, colWidths=COL_WIDTHS)
+    table.setStyle(TABLE_STYLE)
+    return table
+
+
+def add_page_number(canvas, doc):
+    canvas.setFont('Helvetica', 9)
+    canvas.drawRightString(landscape(A4)[0] - 20, 15, f"Page {canvas.getPageNumber()}")
+
+
+class ReportsExport:
+    filename_prefix = 'reports_dashboard'
+
+    def __init__(self):
+        self.rows = 0
+
+    def queryset(self, params):
+        return Report.objects.only('title', 'flagged_by', 'is_plagiarism', 'is_nsfw', 'ai_confidence')
+
+    def count(self, params):
+        return Report.objects.count()
+
+    def flowables(self, params, size):
+        """Titre puis une table (en-tête répété) par tranche de signalements."""
+        styles = getSampleStyleSheet()
+        yield [
+            Paragraph("Tableau de bord des signalements", styles['Title']),
+            Spacer(1, 8),
+            Paragraph("Suivi des signalements avec détection AI, plagiat et contenu NSFW", styles['Normal']),
+            Spacer(1, 16),
+        ]
+        for chunk in chunked(self.queryset(params).batch_size(size), size):
+            self.rows += len(chunk)
+            yield [report_table([report_row(r) for r in chunk])]
+        if not self.rows:
+            yield [report_table([])]
+
+    def write(self, params, dest):
+        doc = SimpleDocTemplate(
+            dest,
+            pagesize=landscape(A4),
+            rightMargin=20, leftMargin=20, topMargin=30, bottomMargin=30
+        )
+        self.rows = 0
+        doc.build(
+            LazyFlowables(self.flowables(params, chunk_size())),
+            onFirstPage=add_page_number, onLaterPages=add_page_number,
+        )
+        return self.rows
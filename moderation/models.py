@@ -13,4 +13,4 @@ class Report(Document):
     risk_label = StringField(default="Safe")  # Safe / Risky
     created_at = DateTimeField(default=datetime.utcnow)
 
-    meta = {'collection': 'reports', 'ordering': ['-created_at']}
+    meta = {'collection': 'reports', 'ordering': ['-created_at'], 'indexes': ['-created_at']}
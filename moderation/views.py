@@ -1,15 +1,12 @@
 from django.shortcuts import render, redirect
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse
 from django.core.paginator import Paginator
 from .models import Report
 from .forms import ReportForm
 from .ai_tools import ai_analyze_report
 from django.views.decorators.csrf import csrf_exempt
 
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
+from exports.jobs import export_response
 from django.shortcuts import render, redirect
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
@@ -21,73 +18,8 @@
 # EXPORT PDF WITHOUT AI TAGS
 # ------------------------------
 def export_reports_pdf(request):
-    reports = Report.objects.all()
-
-    # Create HttpResponse
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = 'attachment; filename="reports_dashboard.pdf"'
-
-    # Create document
-    doc = SimpleDocTemplate(
-        response,
-        pagesize=landscape(A4),
-        rightMargin=20, leftMargin=20, topMargin=30, bottomMargin=30
-    )
-
-    elements = []
-    styles = getSampleStyleSheet()
-
-    # Title and subtitle
-    elements.append(Paragraph("Tableau de bord des signalements", styles['Title']))
-    elements.append(Spacer(1, 8))
-    elements.append(Paragraph(
-        "Suivi des signalements avec détection AI, plagiat et contenu NSFW",
-        styles['Normal']
-    ))
-    elements.append(Spacer(1, 16))
-
-    # Table headers (Risque column removed)
-    data = [["Titre", "Signalé par", "Plagiat", "NSFW", "Score IA"]]
-
-    for r in reports:
-        data.append([
-            r.title,
-            r.flagged_by,
-            "Oui" if r.is_plagiarism else "Non",
-            "Oui" if r.is_nsfw else "Non",
-            f"{r.ai_confidence:.2f}"
-        ])
-
-    # Adjust column widths proportionally
-    col_widths = [300, 150, 60, 60, 80]
-
-    table = Table(data, repeatRows=1, colWidths=col_widths)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#4e73df")),  # header background
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),  # header text
-        ('ALIGN', (1, 1), (-1, -1), 'CENTER'),  # center all except first column
-        ('ALIGN', (0, 1), (0, -1), 'LEFT'),  # left-align "Titre"
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-        ('TOPPADDING', (0, 0), (-1, 0), 10),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.whitesmoke, colors.lightgrey]),
-    ]))
-
-    elements.append(table)
-
-
-
-    # Footer with page numbers
-    def add_page_number(canvas, doc):
-        page_num = canvas.getPageNumber()
-        canvas.setFont('Helvetica', 9)
-        canvas.drawRightString(landscape(A4)[0] - 20, 15, f"Page {page_num}")
-
-    doc.build(elements, onFirstPage=add_page_number, onLaterPages=add_page_number)
-    return response
+    # PDF construit par tranches ; en arrière-plan au-delà de EXPORT_SYNC_MAX_ROWS signalements
+    return export_response(request, 'moderation_reports', {})
 # views.py (excerpt)
 @csrf_exempt
 def verify_ai(request):
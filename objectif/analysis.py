@@ -0,0 +1,457 @@
+"""Analyses IA des objectifs (Gemini) hors du cycle requête/réponse.
+
+- ``submit`` enregistre une ``AnalysisJob`` et la confie à un pool de
+  ``GEMINI_MAX_CONCURRENCY`` threads (plafond d'appels simultanés) ; la page
+  de détails suit l'avancement via ``api/<obj_id>/ia-analysis/status/``.
+- Dédoublonnage : un index unique partiel garantit une seule analyse active
+  par objectif et par type ; un nouveau clic rejoint la tâche en cours.
+- Quota : les appels sont espacés d'au moins ``60 / GEMINI_RATE_PER_MINUTE``
+  secondes. Les erreurs 429/5xx et réseau sont rejouées
+  ``GEMINI_MAX_RETRIES`` fois avec un délai exponentiel (ou celui de
+  ``Retry-After``).
+- Le plafond de concurrence et le quota sont propres à chaque processus :
+  avec N workers gunicorn, l'API peut recevoir jusqu'à N fois
+  ``GEMINI_MAX_CONCURRENCY`` appels simultanés et N fois
+  ``GEMINI_RATE_PER_MINUTE`` appels par minute. Diviser le quota du compte
+  Gemini par le nombre de workers pour fixer ces réglages.
+- Cache : la réponse est stockée sous l'empreinte des données de l'objectif
+  (``AnalysisResult``, voir ``prompt_key``) ; un objectif dont les données
+  n'ont pas changé reçoit l'analyse en cache sans rappeler l'API, même les
+  jours suivants.
+
+``analyze(objectif, kind)`` reste disponible pour un appel direct
+(``Objective.generate_complete_ia_analysis`` par exemple).
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime
+
+import requests
+from django.conf import settings
+from django.utils import timezone
+from mongoengine.errors import NotUniqueError
+
+from web_project.background import JobExecutor, finish_job, live_job, start_job
+
+from .models import AnalysisJob, AnalysisResult, Objective
+
+ENDPOINT = "https://generativelanguage.googleapis.com/v1/models/{model}:generateContent"
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class AnalysisError(Exception):
+    pass
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def model_name():
+    return _setting('GEMINI_ANALYSIS_MODEL', 'gemini-2.5-flash')
+
+
+# ========== PROMPTS ==========
+
+def _jours_restants(obj):
+    if not obj.date_echeance:
+        return ""
+    date_echeance = obj.date_echeance.date() if hasattr(obj.date_echeance, 'date') else obj.date_echeance
+    return (date_echeance - timezone.now().date()).days
+
+
+def complete_prompt(obj):
+    jours_restants = _jours_restants(obj)
+    return f"""
+        Tu es un expert en analyse d'objectifs académiques et professionnels.
+
+        OBJECTIF À ANALYSER :
+        - Titre : {getattr(obj, 'titre', 'Non spécifié')}
+        - Description : {getattr(obj, 'description', 'Non spécifiée')}
+        - Filière : {getattr(obj, 'filiere', 'Non spécifiée')}
+        - Niveau : {getattr(obj, 'niveau', 'Non spécifié')}
+        - Priorité : {getattr(obj, 'priorite', 'Non spécifiée')}
+        - État : {getattr(obj, 'etat', 'Non spécifié')}
+        - Progression : {getattr(obj, 'progression', 0)}%
+        - Tags : {', '.join(getattr(obj, 'tags', []))}
+        - Tâches prévues : {', '.join(getattr(obj, 'taches', []))}
+        - Ressources : {', '.join(getattr(obj, 'ressources', []))}
+        - Jours restants : {jours_restants if jours_restants else 'Non défini'}
+
+        EFFECTUE UNE ANALYSE COMPLÈTE ET RÉPONDS STRICTEMENT EN JSON :
+
+        {{
+            "analyse_ia": "Analyse textuelle complète de 3-4 phrases",
+            "points_forts": ["point fort 1", "point fort 2", "point fort 3"],
+            "points_amelioration": ["point amélioration 1", "point amélioration 2"],
+            "risques": ["risque 1", "risque 2"],
+            "recommendations": ["recommandation 1", "recommandation 2", "recommandation 3"],
+            "delai_realisme": "Très réaliste|Réaliste|Peu réaliste|Irrealiste",
+            "niveau_difficulte": "facile|moyen|difficile|expert",
+            "suggestion_ia": "Suggestion concise pour l'utilisateur",
+            "score_priorite_ia": 0.85,
+            "objectif_recommande": true
+        }}
+
+        Sois honnête, constructif et précis dans ton analyse.
+        Réponds UNIQUEMENT avec le JSON, sans texte supplémentaire.
+        """
+
+
+def suggestion_prompt(obj):
+    return f"""
+        Tu es un assistant expert en gestion d'objectifs.
+        Voici les informations de l'objectif :
+        Titre : {obj.titre}
+        Description : {obj.description}
+        Tags : {', '.join(obj.tags)}
+        Progression actuelle : {obj.progression}%
+        Priorité actuelle : {obj.priorite}
+
+        Propose :
+        1. Une suggestion concrète pour l'utilisateur pour faire progresser cet objectif.
+        2. Un score de priorité entre 0 et 1.
+        3. Indique si cet objectif devrait être recommandé maintenant (true/false).
+
+        Réponds au format JSON :
+        {{
+          "suggestion": "...",
+          "score_priorite": 0.0,
+          "recommande": true/false
+        }}
+        """
+
+
+def complete_fallback(obj, text):
+    """Analyse basique quand la réponse de Gemini n'est pas du JSON valide."""
+    return {
+        "analyse_ia": f"Analyse de l'objectif '{getattr(obj, 'titre', '')}'. Progression actuelle: {getattr(obj, 'progression', 0)}%. Priorité: {getattr(obj, 'priorite', 'Non définie')}.",
+        "points_forts": [
+            "Objectif bien défini et structuré",
+            f"Progression de {getattr(obj, 'progression', 0)}% déjà accomplie",
+            "Ressources et tâches identifiées"
+        ],
+        "points_amelioration": [
+            "Améliorer la planification des délais si nécessaire",
+            "Diversifier les méthodes d'apprentissage"
+        ],
+        "risques": [
+            "Risque de retard si non suivi régulièrement",
+            "Dépendance aux ressources identifiées"
+        ],
+        "recommendations": [
+            "Planifier des sessions régulières de travail",
+            "Suivre la progression hebdomadaire",
+            "Adapter les méthodes en fonction des résultats"
+        ],
+        "delai_realisme": "Réaliste",
+        "niveau_difficulte": "moyen",
+        "suggestion_ia": f"Pour l'objectif '{getattr(obj, 'titre', '')}', continuez vos efforts actuels et révisez régulièrement votre planning pour maintenir la progression.",
+        "score_priorite_ia": 0.7,
+        "objectif_recommande": True
+    }
+
+
+def suggestion_fallback(obj, text):
+    return {"suggestion": text, "score_priorite": 0.5, "recommande": False}
+
+
+def apply_complete(obj, result):
+    obj.analyse_ia = result.get("analyse_ia", "Analyse générée par l'IA")
+    obj.points_forts = result.get("points_forts", [])
+    obj.points_amelioration = result.get("points_amelioration", [])
+    obj.risques = result.get("risques", [])
+    obj.recommendations = result.get("recommendations", [])
+    obj.delai_realisme = result.get("delai_realisme", "Non évalué")
+    obj.niveau_difficulte = result.get("niveau_difficulte", "moyen")
+    obj.suggestion_ia = result.get("suggestion_ia", "Suggestion non disponible")
+    obj.score_priorite_ia = float(result.get("score_priorite_ia", 0.5))
+    obj.objectif_recommande = bool(result.get("objectif_recommande", False))
+
+
+def apply_suggestion(obj, result):
+    obj.suggestion_ia = result.get("suggestion", "")
+    obj.score_priorite_ia = float(result.get("score_priorite", 0.0))
+    obj.objectif_recommande = bool(result.get("recommande", False))
+
+
+# type -> (prompt, réponse non JSON, mise à jour de l'objectif, température, tokens max)
+KINDS = {
+    'complete': (complete_prompt, complete_fallback, apply_complete, 0.3, 1024),
+    'suggestion': (suggestion_prompt, suggestion_fallback, apply_suggestion, 0.7, 256),
+}
+
+
+def get_kind(kind):
+    try:
+        return KINDS[kind]
+    except KeyError:
+        raise AnalysisError(f"Type d'analyse inconnu: {kind}")
+
+
+# À incrémenter quand le texte des prompts change (invalide le cache)
+PROMPT_VERSION = 1
+PROMPT_FIELDS = (
+    'titre', 'description', 'filiere', 'niveau', 'priorite', 'etat', 'progression',
+    'tags', 'taches', 'ressources',
+)
+
+
+def prompt_inputs(obj):
+    """Données de l'objectif reprises dans les prompts.
+
+    L'échéance y figure en date et non en jours restants : ceux-ci changent
+    chaque jour sans que l'objectif ait été modifié.
+    """
+    inputs = {name: getattr(obj, name, None) for name in PROMPT_FIELDS}
+    echeance = getattr(obj, 'date_echeance', None)
+    inputs['date_echeance'] = echeance.date() if hasattr(echeance, 'date') else echeance
+    return inputs
+
+
+def prompt_key(kind, obj):
+    """Clé du cache : modèle, type d'analyse et données stables de l'objectif."""
+    payload = json.dumps([model_name(), kind, PROMPT_VERSION, prompt_inputs(obj)], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+# ========== APPEL GEMINI (QUOTA, REPRISES) ==========
+
+class RateLimiter:
+    """Espace les appels d'au moins ``60 / per_minute`` secondes entre tous les threads."""
+
+    def __init__(self, per_minute, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        """Bloque jusqu'au prochain créneau libre ; renvoie l'attente en secondes."""
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = self.clock()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            self.sleep(delay)
+        return delay
+
+
+_session = None
+_limiter = None
+_client_lock = threading.Lock()
+
+
+def http_session():
+    """Session partagée par les threads du processus (connexions keep-alive)."""
+    global _session
+    with _client_lock:
+        if _session is None:
+            _session = requests.Session()
+        return _session
+
+
+def rate_limiter():
+    global _limiter
+    with _client_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(_setting('GEMINI_RATE_PER_MINUTE', 10))
+        return _limiter
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Délai avant la reprise ``attempt`` (0, 1, ...) : ``Retry-After`` ou exponentiel avec gigue."""
+    if retry_after is not None:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+    base = _setting('GEMINI_BACKOFF_SECONDS', 2.0)
+    return min(60.0, base * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+def extract_text(resp_json):
+    try:
+        return resp_json['candidates'][0]['content']['parts'][0].get('text', '').strip()
+    except (KeyError, IndexError, TypeError):
+        return ""
+
+
+def call_gemini(prompt, temperature, max_tokens):
+    """Texte de la réponse ; lève ``AnalysisError`` après épuisement des reprises."""
+    api_key = _setting('GEMINI_API_KEY', '')
+    if not api_key:
+        raise AnalysisError("Clé API Gemini non trouvée (GEMINI_API_KEY)")
+    data = {
+        "contents": [{"parts": [{"text": prompt}]}],
+        "generationConfig": {
+            "temperature": temperature,
+            "topK": 40,
+            "topP": 0.95,
+            "maxOutputTokens": max_tokens,
+        }
+    }
+    headers = {"Content-Type": "application/json", "x-goog-api-key": api_key}
+    retries = max(0, _setting('GEMINI_MAX_RETRIES', 3))
+    for attempt in range(retries + 1):
+        rate_limiter().wait()
+        retry_after = None
+        try:
+            resp = http_session().post(
+                ENDPOINT.format(model=model_name()), json=data, headers=headers,
+                timeout=(5, _setting('GEMINI_TIMEOUT', 30)),
+            )
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = f"Erreur réseau Gemini: {e}"
+        else:
+            if resp.status_code == 200:
+                text = extract_text(resp.json())
+                if not text:
+                    raise AnalysisError("Réponse vide de l'API Gemini")
+                return text
+            error = f"Erreur API Gemini: {resp.status_code} {resp.text[:200]}".strip()
+            if resp.status_code not in RETRY_STATUSES:
+                raise AnalysisError(error)
+            retry_after = resp.headers.get('Retry-After')
+        if attempt == retries:
+            raise AnalysisError(error)
+        delay = backoff_delay(attempt, retry_after)
+        print(f"⏳ {error} ; nouvel essai dans {delay:.1f}s")
+        time.sleep(delay)
+
+
+def parse_result(text):
+    """JSON de la réponse (balises ```json retirées), ou None s'il est invalide."""
+    text = text.strip()
+    if text.startswith("```json"):
+        text = text[7:]
+    if text.endswith("```"):
+        text = text[:-3]
+    try:
+        result = json.loads(text.strip())
+    except json.JSONDecodeError:
+        return None
+    return result if isinstance(result, dict) else None
+
+
+# ========== ANALYSE ET CACHE ==========
+
+def cached_result(key):
+    entry = AnalysisResult.objects(key=key).only('result').first()
+    return entry.result if entry is not None else None
+
+
+def store_result(key, kind, result):
+    AnalysisResult.objects(key=key).update_one(
+        upsert=True, set__kind=kind, set__result=result, set__created_at=datetime.utcnow()
+    )
+
+
+def save_analysis(obj, kind, result):
+    get_kind(kind)[2](obj, result)
+    obj.derniere_mise_a_jour = datetime.utcnow()
+    obj.save()
+
+
+def run_analysis(obj, kind):
+    """Analyse ``obj`` (cache, sinon Gemini) et l'enregistre ; renvoie ``True`` si servie par le cache."""
+    prompt_for, fallback, _, temperature, max_tokens = get_kind(kind)
+    key = prompt_key(kind, obj)
+    result = cached_result(key)
+    if result is not None:
+        save_analysis(obj, kind, result)
+        return True
+    text = call_gemini(prompt_for(obj), temperature, max_tokens)
+    result = parse_result(text)
+    if result is None:
+        print(f"❌ Réponse non JSON de Gemini: {text[:200]}")
+        # Valeurs par défaut non mises en cache : le prochain essai rappellera l'API
+        result = fallback(obj, text)
+    else:
+        store_result(key, kind, result)
+    save_analysis(obj, kind, result)
+    return False
+
+
+def analyze(obj, kind='complete'):
+    """Appel direct (dans le thread courant) ; ``True`` si l'analyse a été enregistrée."""
+    try:
+        run_analysis(obj, kind)
+        return True
+    except Exception as e:
+        print(f"❌ Erreur lors de l'analyse IA: {e}")
+        return False
+
+
+# ========== FILE D'ANALYSES ==========
+
+def active_job(objective_id, kind='complete'):
+    return AnalysisJob.objects(objective_id=str(objective_id), kind=kind, active=True).first()
+
+
+def latest_job(objective_id, kind='complete'):
+    return AnalysisJob.objects(objective_id=str(objective_id), kind=kind).order_by('-created_at').first()
+
+
+def submit(obj, kind='complete', requested_by=None):
+    """Met l'analyse de ``obj`` en file ; retourne ``(job, created)``.
+
+    Si le résultat est déjà en cache, il est appliqué tout de suite et
+    ``job`` vaut ``None`` ; une analyse déjà active est renvoyée avec
+    ``created=False``.
+    """
+    get_kind(kind)
+    result = cached_result(prompt_key(kind, obj))
+    if result is not None:
+        save_analysis(obj, kind, result)
+        return None, False
+    job = live_job(AnalysisJob, active_job(obj.pk, kind), _setting('GEMINI_ANALYSIS_JOB_TIMEOUT', 300))
+    if job is not None:
+        return job, False
+    job = AnalysisJob(
+        objective_id=str(obj.pk), kind=kind,
+        requested_by=str(requested_by) if requested_by else None,
+    )
+    try:
+        job.save()
+    except NotUniqueError:
+        # Clic concurrent : l'autre requête a gagné
+        return active_job(obj.pk, kind), False
+    executor.submit(run_job, job.pk)
+    return job, True
+
+
+def run_job(job_id):
+    job = start_job(AnalysisJob, job_id, inc__attempts=1)
+    if job is None:
+        return
+    try:
+        obj = Objective.objects(id=job.objective_id).first()
+        if obj is None:
+            raise AnalysisError("Objectif introuvable")
+        run_analysis(obj, job.kind)
+    except Exception as e:
+        print(f"❌ [analyse {job.pk}] ERREUR: {e}")
+        finish_job(AnalysisJob, job.pk, 'failed', error=str(e))
+    else:
+        finish_job(AnalysisJob, job.pk, 'completed')
+
+
+def status_payload(obj, kind='complete'):
+    """Réponse JSON de l'endpoint de suivi."""
+    job = latest_job(obj.pk, kind)
+    return {
+        'status': job.status if job is not None else 'none',
+        'job': job.as_dict() if job is not None else None,
+        'has_analysis': bool(getattr(obj, 'analyse_ia', '')),
+    }
+
+
+executor = JobExecutor('GEMINI_MAX_CONCURRENCY', 2, 'ia-analysis')
@@ -0,0 +1,410 @@
+"""Bilans PDF des objectifs : cache disque et export groupé en zip.
+
+- Les styles reportlab (feuille d'exemple, styles de titres, de tableaux)
+  sont construits une seule fois par processus (``bilan_styles``).
+- Chaque bilan est écrit dans ``BILAN_CACHE_DIR/<id>/<version>.pdf`` ; la
+  version combine ``derniere_mise_a_jour`` et l'empreinte des attributs
+  calculés (la progression par dates évolue chaque jour sans que l'objectif
+  soit modifié). Un objectif inchangé est servi depuis le disque.
+- ``stream_zip`` construit les bilans manquants (dans un pool de
+  ``BILAN_PROCESSES`` processus quand ils sont nombreux) et envoie
+  l'archive au fil des bilans terminés, sans la garder en mémoire.
+
+Le rendu ne dépend que de ``bilan_data`` (valeurs simples) : il peut tourner
+dans un processus sans connexion MongoDB.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from .metrics import compute_metrics
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ========== STYLES PARTAGÉS ==========
+
+@lru_cache(maxsize=None)
+def bilan_styles():
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        spaceAfter=30,
+        alignment=1,  # Centré
+        textColor=colors.HexColor('#2c3e50')
+    ))
+    styles.add(ParagraphStyle(
+        'SectionTitle',
+        parent=styles['Heading2'],
+        fontSize=14,
+        spaceAfter=12,
+        spaceBefore=20,
+        textColor=colors.HexColor('#3498db')
+    ))
+    styles.add(ParagraphStyle(
+        'DateStyle',
+        parent=styles['Normal'],
+        fontSize=10,
+        alignment=1,
+        textColor=colors.gray
+    ))
+    styles.add(ParagraphStyle(
+        'Footer',
+        parent=styles['Normal'],
+        fontSize=8,
+        alignment=1,
+        textColor=colors.gray,
+        spaceBefore=20
+    ))
+    return styles
+
+
+def _list_table_style(header, background, grid):
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor(header)),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor(background)),
+        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor(grid)),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('PADDING', (0, 0), (-1, -1), 6),
+    ])
+
+
+INFO_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 11),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f8f9fa')),
+    ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#dee2e6')),
+    ('FONTSIZE', (0, 1), (-1, -1), 10),
+    ('PADDING', (0, 0), (-1, -1), 6),
+])
+PROGRESSION_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e9ecef')),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 11),
+    ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#dee2e6')),
+    ('PADDING', (0, 0), (-1, -1), 8),
+])
+SCORE_TABLE_STYLE = _list_table_style('#17a2b8', '#e8f4fd', '#b3e0ff')
+TASKS_TABLE_STYLE = _list_table_style('#28a745', '#d4edda', '#c3e6cb')
+RESOURCES_TABLE_STYLE = _list_table_style('#6f42c1', '#e8e2ff', '#d6cfff')
+
+
+# ========== RENDU ==========
+
+def _format_date(value):
+    return value.strftime("%d/%m/%Y %H:%M") if value else 'Non spécifiée'
+
+
+def bilan_data(obj, attributs):
+    """Valeurs nécessaires au rendu (sérialisables, transmises aux processus du pool)."""
+    return {
+        'id': str(obj.id),
+        'titre': obj.titre,
+        'description': obj.description or 'Non spécifiée',
+        'filiere': getattr(obj, 'filiere', 'Non spécifiée'),
+        'niveau': getattr(obj, 'niveau', 'Non spécifié'),
+        'priorite': getattr(obj, 'priorite', 'Non spécifiée'),
+        'etat': getattr(obj, 'etat', 'Non spécifié'),
+        'progression': attributs['progression'],
+        'nb_sessions': attributs['nb_sessions'],
+        'temps_total': attributs['temps_total'],
+        'date_creation': _format_date(obj.date_creation),
+        'date_debut': _format_date(obj.date_debut),
+        'date_echeance': _format_date(obj.date_echeance),
+        'derniere_mise_a_jour': _format_date(obj.derniere_mise_a_jour),
+        'analyse_ia': getattr(obj, 'analyse_ia', '') or '',
+        'score_priorite_ia': getattr(obj, 'score_priorite_ia', 0) or 0,
+        'niveau_difficulte': getattr(obj, 'niveau_difficulte', None) or 'Non évalué',
+        'delai_realisme': getattr(obj, 'delai_realisme', None) or 'Non évalué',
+        'objectif_recommande': bool(getattr(obj, 'objectif_recommande', False)),
+        'points_forts': list(getattr(obj, 'points_forts', None) or []),
+        'recommendations': list(getattr(obj, 'recommendations', None) or []),
+        'taches': list(getattr(obj, 'taches', None) or []),
+        'ressources': list(getattr(obj, 'ressources', None) or []),
+        'tags': list(getattr(obj, 'tags', None) or []),
+    }
+
+
+def build_story(data, generated_at=None):
+    styles = bilan_styles()
+    section_style = styles['SectionTitle']
+    generated_at = generated_at or datetime.now()
+    story = []
+
+    # En-tête avec titre
+    story.append(Paragraph(f"BILAN COMPLET - {data['titre']}", styles['CustomTitle']))
+    story.append(Spacer(1, 10))
+    story.append(Paragraph(f"Généré le {generated_at.strftime('%d/%m/%Y à %H:%M')}", styles['DateStyle']))
+    story.append(Spacer(1, 20))
+
+    # Section 1: Informations générales
+    story.append(Paragraph("📊 INFORMATIONS GÉNÉRALES", section_style))
+    info_data = [
+        ['Titre', data['titre']],
+        ['Description', data['description']],
+        ['Filière', data['filiere']],
+        ['Niveau', data['niveau']],
+        ['Priorité', data['priorite']],
+        ['État', data['etat']],
+        ['Progression', f"{data['progression']}%"],
+        ['Sessions réalisées', str(data['nb_sessions'])],
+        ['Temps total', f"{data['temps_total']} heures"],
+        ['Date création', data['date_creation']],
+        ['Date début', data['date_debut']],
+        ['Date échéance', data['date_echeance']],
+        ['Dernière mise à jour', data['derniere_mise_a_jour']],
+    ]
+    info_table = Table(info_data, colWidths=[150, 350])
+    info_table.setStyle(INFO_TABLE_STYLE)
+    story.append(info_table)
+    story.append(Spacer(1, 25))
+
+    # Section 2: Barre de progression visuelle
+    story.append(Paragraph("📈 PROGRESSION", section_style))
+    progression_table = Table([['Progression actuelle', f"{data['progression']}%"]], colWidths=[200, 300])
+    progression_table.setStyle(PROGRESSION_TABLE_STYLE)
+    story.append(progression_table)
+    story.append(Spacer(1, 15))
+
+    # Section 3: Analyse IA si disponible
+    if data['analyse_ia']:
+        story.append(Paragraph("🤖 ANALYSE INTELLIGENCE ARTIFICIELLE", section_style))
+        score_data = [
+            ['Score de priorité IA', f"{data['score_priorite_ia'] * 100:.1f}%"],
+            ['Difficulté estimée', data['niveau_difficulte'].title()],
+            ['Délai réaliste', data['delai_realisme'].replace('_', ' ').title()],
+            ['Recommandé par IA', 'Oui' if data['objectif_recommande'] else 'Non'],
+        ]
+        score_table = Table(score_data, colWidths=[150, 350])
+        score_table.setStyle(SCORE_TABLE_STYLE)
+        story.append(score_table)
+        story.append(Spacer(1, 15))
+
+        story.append(Paragraph("<b>Analyse globale:</b>", styles['Heading3']))
+        story.append(Paragraph(data['analyse_ia'], styles['Normal']))
+        story.append(Spacer(1, 12))
+
+        for title, points in (("Points forts", data['points_forts']), ("Recommandations", data['recommendations'])):
+            if points:
+                story.append(Paragraph(f"<b>{title}:</b>", styles['Heading3']))
+                for point in points:
+                    story.append(Paragraph(f"• {point}", styles['Normal']))
+                story.append(Spacer(1, 12))
+
+    # Sections 4 et 5: Tâches et ressources
+    for title, header, items, table_style in (
+        ("✅ TÂCHES À RÉALISER", 'Tâche', data['taches'], TASKS_TABLE_STYLE),
+        ("📚 RESSOURCES DISPONIBLES", 'Ressource', data['ressources'], RESOURCES_TABLE_STYLE),
+    ):
+        if items:
+            story.append(Paragraph(title, section_style))
+            rows = [['#', header]] + [[str(i), item] for i, item in enumerate(items, 1)]
+            table = Table(rows, colWidths=[30, 470])
+            table.setStyle(table_style)
+            story.append(table)
+            story.append(Spacer(1, 25))
+
+    # Section 6: Tags
+    if data['tags']:
+        story.append(Paragraph("🏷️ TAGS ET CATÉGORIES", section_style))
+        story.append(Paragraph(", ".join(f"#{tag}" for tag in data['tags']), styles['Normal']))
+        story.append(Spacer(1, 25))
+
+    # Pied de page
+    story.append(Paragraph(f"Bilan généré automatiquement - ID: {data['id']}", styles['Footer']))
+    return story
+
+
+def write_bilan(data, dest):
+    doc = SimpleDocTemplate(dest, pagesize=A4, topMargin=50, bottomMargin=50)
+    doc.build(build_story(data))
+
+
+# ========== CACHE DISQUE ==========
+
+def cache_dir():
+    path = Path(_setting('BILAN_CACHE_DIR', Path(settings.BASE_DIR) / 'var' / 'bilans'))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def bilan_version(obj, attributs):
+    """Change quand l'objectif est modifié ou que ses attributs calculés évoluent."""
+    updated = obj.derniere_mise_a_jour.strftime('%Y%m%d%H%M%S%f') if obj.derniere_mise_a_jour else '0'
+    digest = hashlib.sha1(json.dumps(attributs, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:12]
+    return f"{updated}-{digest}"
+
+
+def bilan_path(obj, attributs):
+    return cache_dir() / str(obj.id) / f"{bilan_version(obj, attributs)}.pdf"
+
+
+def build_bilan_file(data, path):
+    """Écrit le bilan dans ``path`` (fichier temporaire renommé) et supprime les versions précédentes.
+
+    Fonction de niveau module : exécutée telle quelle par les processus du pool.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f"{path.stem}.{os.getpid()}.part")
+    try:
+        with open(partial, 'wb') as dest:
+            write_bilan(data, dest)
+        os.replace(partial, path)
+    except BaseException:
+        try:
+            os.remove(partial)
+        except OSError:
+            pass
+        raise
+    for old in path.parent.glob('*.pdf'):
+        if old != path:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+    return str(path)
+
+
+def cached_bilan(obj):
+    """Chemin du bilan à jour, construit dans le processus courant s'il manque."""
+    attributs = compute_metrics([obj])[obj.pk]
+    path = bilan_path(obj, attributs)
+    if not path.exists():
+        build_bilan_file(bilan_data(obj, attributs), path)
+    return path
+
+
+def bilan_filename(obj, when=None):
+    when = when or datetime.now()
+    return f"bilan_{obj.titre.replace(' ', '_').lower()}_{when.strftime('%Y%m%d_%H%M')}.pdf"
+
+
+# ========== EXPORT GROUPÉ ==========
+
+class _ProcessPool:
+    """Pool de processus créé paresseusement dans chaque processus web (non hérité au fork)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid = None
+
+    def get(self):
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                # 'spawn' : pas de copie des threads ni des connexions du processus web
+                self._pool = ProcessPoolExecutor(
+                    max_workers=max(1, _setting('BILAN_PROCESSES', 2)),
+                    mp_context=multiprocessing.get_context('spawn'),
+                )
+                self._pid = os.getpid()
+            return self._pool
+
+
+process_pool = _ProcessPool()
+
+
+class _ZipBuffer:
+    """Destination non positionnable de ``ZipFile`` : les octets écrits sont récupérés au fil de l'eau."""
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def archive_name(obj, username):
+    return f"{username or obj.user_id}/bilan_{obj.titre.replace(' ', '_').replace('/', '_').lower()}_{obj.id}.pdf"
+
+
+def ready_bilans(objectives, pool=None):
+    """``(objectif, chemin ou exception)`` à mesure que les bilans sont prêts.
+
+    Les bilans déjà en cache sortent en premier. Les autres sont construits
+    dans le pool de processus, ou dans le processus courant s'ils sont moins
+    de ``BILAN_POOL_MIN_PENDING`` (un bilan se rend en quelques millisecondes,
+    le démarrage du pool coûte davantage).
+    """
+    objectives = list(objectives)
+    attributs = compute_metrics(objectives)
+    missing = []
+    for obj in objectives:
+        path = bilan_path(obj, attributs[obj.pk])
+        if path.exists():
+            yield obj, path
+        else:
+            missing.append((obj, bilan_data(obj, attributs[obj.pk]), str(path)))
+
+    if pool is None and len(missing) < _setting('BILAN_POOL_MIN_PENDING', 50):
+        for obj, data, path in missing:
+            try:
+                yield obj, Path(build_bilan_file(data, path))
+            except Exception as e:
+                yield obj, e
+        return
+
+    pool = pool or process_pool.get()
+    pending = {pool.submit(build_bilan_file, data, path): obj for obj, data, path in missing}
+    for future in as_completed(pending):
+        try:
+            yield pending[future], Path(future.result())
+        except Exception as e:
+            yield pending[future], e
+
+
+def stream_zip(objectives, usernames, pool=None):
+    """Générateur des octets du zip (bilans stockés sans recompression)."""
+    buffer = _ZipBuffer()
+    errors = []
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for obj, result in ready_bilans(objectives, pool):
+            if isinstance(result, Exception):
+                print(f"❌ Erreur génération PDF bilan {obj.id}: {result}")
+                errors.append(f"{obj.id} ({obj.titre}): {result}")
+                continue
+            archive.write(result, archive_name(obj, usernames.get(obj.user_id)))
+            yield buffer.drain()
+        if errors:
+            archive.writestr('ERREURS.txt', "\n".join(errors))
+    yield buffer.drain()
@@ -0,0 +1,109 @@
+"""Événements du calendrier des objectifs (``calendar_events_api``).
+
+FullCalendar demande les événements de la période affichée
+(``?start=...&end=...``) ; seuls les objectifs de l'utilisateur dont le début
+ou l'échéance tombe dans cette fenêtre sont lus, via les index
+``(user_id, date_debut)`` et ``(user_id, date_echeance)``.
+
+La version des objectifs d'un utilisateur (``models.objectives_version`` :
+nombre d'objectifs et dernière ``derniere_mise_a_jour``) sert d'ETag / Last-Modified : la navigation d'un
+mois à l'autre déjà vu reçoit un 304 sans relire les objectifs.
+"""
+import hashlib
+from datetime import datetime, timezone as dt_timezone
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from mongoengine.queryset.visitor import Q
+
+from .models import Objective
+
+EVENT_FIELDS = ('id', 'titre', 'date_debut', 'date_echeance')
+
+
+def parse_bound(value):
+    """Borne ``start`` / ``end`` de FullCalendar en datetime UTC naïf (comme en base), ou None."""
+    if not value:
+        return None
+    moment = parse_datetime(value.replace(' ', '+'))  # '+02:00' décodé en ' 02:00' dans l'URL
+    if moment is None:
+        day = parse_date(value[:10])
+        if day is None:
+            return None
+        moment = datetime(day.year, day.month, day.day)
+    if timezone.is_aware(moment):
+        moment = timezone.make_naive(moment, dt_timezone.utc)
+    return moment
+
+
+def _range(field, start, end):
+    conditions = {}
+    if start:
+        conditions[f'{field}__gte'] = start
+    if end:
+        conditions[f'{field}__lt'] = end
+    return Q(**(conditions or {f'{field}__ne': None}))
+
+
+def objectives_in_window(user_id, start=None, end=None):
+    """Objectifs de ``user_id`` qui commencent ou arrivent à échéance dans ``[start, end[``."""
+    window = _range('date_echeance', start, end) | _range('date_debut', start, end)
+    return Objective.objects(user_id=user_id).filter(window).only(*EVENT_FIELDS)
+
+
+def _in_window(value, start, end):
+    return value is not None and (start is None or value >= start) and (end is None or value < end)
+
+
+def _event_date(value):
+    if timezone.is_aware(value):
+        value = value.date()
+    return value.isoformat()
+
+
+def build_events(objectives, start=None, end=None):
+    events = []
+    for obj in objectives:
+        url = f'/objectives/details/{obj.id}/'
+        # Échéance
+        if _in_window(obj.date_echeance, start, end):
+            deadline = _event_date(obj.date_echeance)
+            events.append({
+                'id': str(obj.id),
+                'title': f'Échéance: {obj.titre}',
+                'start': deadline,
+                'end': deadline,
+                'color': '#dc3545',
+                'textColor': 'white',
+                'url': url
+            })
+        # Date de début
+        if _in_window(obj.date_debut, start, end):
+            start_date = _event_date(obj.date_debut)
+            events.append({
+                'id': str(obj.id) + '_start',
+                'title': f'Début: {obj.titre}',
+                'start': start_date,
+                'end': start_date,
+                'color': '#28a745',
+                'textColor': 'white',
+                'url': url
+            })
+    return events
+
+
+def calendar_etag(user_id, state, start_param, end_param):
+    count, last_modified = state
+    stamp = last_modified.isoformat() if last_modified else ''
+    raw = f"{user_id}|{count}|{stamp}|{start_param or ''}|{end_param or ''}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def last_modified_utc(state):
+    """Last-Modified (datetime aware) ; les dates en base sont en UTC naïf."""
+    last_modified = state[1]
+    if last_modified is None:
+        return None
+    if timezone.is_naive(last_modified):
+        last_modified = last_modified.replace(tzinfo=dt_timezone.utc)
+    return last_modified
@@ -0,0 +1,116 @@
+"""Assistant EduBot (``chatbot_api``) : contexte des objectifs et réponses en flux.
+
+- Le contexte du prompt est lu avec ``Objective.objects(user_id=...)`` (index
+  ``user_id``) en ne projetant que les champs utilisés, puis gardé en cache
+  par utilisateur tant que la version de ses objectifs
+  (``objectives_version``) ne change pas.
+- Avec ``Accept: text/event-stream`` (ou ``?stream=1``), la réponse de Gemini
+  est renvoyée en server-sent events au fil de la génération : le premier
+  fragment arrive sans attendre la réponse complète.
+"""
+import json
+import threading
+from collections import OrderedDict
+
+import google.generativeai as genai
+
+from .models import Objective, objectives_version
+
+MODEL_NAME = "gemini-2.5-flash"
+CONTEXT_FIELDS = ('titre', 'etat', 'priorite', 'progression')
+
+PROMPT_TEMPLATE = """
+Tu es EduBot, un assistant éducatif intelligent et motivant qui aide les étudiants à progresser dans leurs objectifs académiques.
+
+CONTEXTE DES OBJECTIFS DE L'UTILISATEUR :
+{context}
+
+QUESTION DE L'UTILISATEUR :
+{message}
+
+GUIDELINES POUR TA RÉPONSE :
+- Sois encourageant, positif et constructif
+- Propose des conseils pratiques et réalisables
+- Si tu parles d'un objectif spécifique, référence-le clairement
+- Garde tes réponses concises mais utiles (max 3-4 phrases)
+- Adapte ton ton à la situation : motivant pour les défis, félicitations pour les progrès
+- Si la question n'est pas liée aux objectifs, redirige gentiment vers le sujet
+
+RÉPONSE :
+"""
+
+
+def format_context(objectives):
+    return "\n".join([
+        f"- {obj.titre} (État: {obj.etat}, Priorité: {obj.priorite}, Progression: {getattr(obj, 'progression', 0)}%)"
+        for obj in objectives
+    ]) or "Aucun objectif enregistré."
+
+
+class ContextCache:
+    """Contexte de chaque utilisateur, valable pour une version de ses objectifs."""
+
+    def __init__(self, max_users=1000):
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, user_id):
+        """``(contexte, nombre d'objectifs)`` ; relu seulement si la version a changé."""
+        version = objectives_version(user_id)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(user_id)
+                return entry[1], entry[2]
+        objectives = list(Objective.objects(user_id=user_id).only(*CONTEXT_FIELDS))
+        context, count = format_context(objectives), len(objectives)
+        with self._lock:
+            self._entries[user_id] = (version, context, count)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+        return context, count
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+context_cache = ContextCache()
+
+
+def build_prompt(context, message):
+    return PROMPT_TEMPLATE.format(context=context, message=message)
+
+
+def wants_stream(request):
+    return 'text/event-stream' in request.headers.get('Accept', '') or request.GET.get('stream') == '1'
+
+
+def sse(data, event=None):
+    """Un message server-sent events (données JSON)."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def generate_reply(prompt):
+    return genai.GenerativeModel(MODEL_NAME).generate_content(prompt).text
+
+
+def stream_reply(prompt, objectifs_count):
+    """Générateur SSE : ``{"delta": ...}`` par fragment, puis ``done`` ou ``error``."""
+    try:
+        for chunk in genai.GenerativeModel(MODEL_NAME).generate_content(prompt, stream=True):
+            try:
+                text = chunk.text
+            except ValueError:
+                # Fragment sans texte (filtré par la modération de Gemini)
+                continue
+            if text:
+                yield sse({"delta": text})
+    except Exception as e:
+        print(f"Erreur dans chatbot_api (flux): {e}")
+        yield sse({"error": f"Erreur du chatbot: {str(e)}", "status": "error"}, event="error")
+        return
+    yield sse({"status": "success", "objectifs_count": objectifs_count}, event="done")
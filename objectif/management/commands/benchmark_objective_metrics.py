@@ -0,0 +1,63 @@
+import random
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from objectif.metrics import compute_metrics
+from objectif.models import Objective
+from objectif.views import calculer_tous_les_attributs
+
+
+def synthetic_objectives(count, seed=0):
+    """Objectifs non enregistrés couvrant les cas de calcul (dates, états, tâches...)."""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    objectives = []
+    for i in range(count):
+        debut = now + timedelta(days=rng.randint(-60, 10)) if rng.random() > 0.1 else None
+        echeance = debut + timedelta(days=rng.randint(-5, 90)) if debut and rng.random() > 0.1 else None
+        objectives.append(Objective(
+            id=f"{i:024x}", user_id="benchmark", titre=f"Objectif {i}", filiere="info", niveau="L3",
+            priorite=rng.choice(['haute', 'moyenne', 'basse']),
+            etat=rng.choice(['non commencé', 'en cours', 'terminé']),
+            date_debut=debut, date_echeance=echeance,
+            derniere_mise_a_jour=now - timedelta(days=rng.randint(0, 20)),
+            progression=rng.choice([0.0, 0.0, rng.uniform(1, 100)]),
+            temps_total=rng.choice([0.0, rng.uniform(0, 300)]),
+            nb_sessions=rng.randint(0, 40),
+            taches=[f"tâche {t}" for t in range(rng.randint(0, 25))],
+        ))
+    return objectives
+
+
+class Command(BaseCommand):
+    help = ("Compare le calcul des attributs des objectifs un par un "
+            "(calculer_tous_les_attributs) et par lot (compute_metrics)")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=500, help="Nombre d'objectifs synthétiques")
+        parser.add_argument("--runs", type=int, default=5)
+
+    def handle(self, *args, **options):
+        objectives = synthetic_objectives(max(1, options["count"]))
+        runs = max(1, options["runs"])
+
+        expected = {obj.pk: calculer_tous_les_attributs(obj) for obj in objectives}
+        if compute_metrics(objectives) != expected:
+            raise CommandError("Les deux calculs divergent")
+
+        self.stdout.write(f"{'calcul':<12}{'objectifs':>10}{'moyenne ms':>12}{'min ms':>10}")
+        results = {}
+        for name, compute in (
+            ("unitaire", lambda: [calculer_tous_les_attributs(obj) for obj in objectives]),
+            ("par lot", lambda: compute_metrics(objectives)),
+        ):
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                compute()
+                timings.append((time.perf_counter() - start) * 1000)
+            results[name] = min(timings)
+            self.stdout.write(f"{name:<12}{len(objectives):>10}{sum(timings) / runs:>12.2f}{min(timings):>10.2f}")
+        self.stdout.write(f"Accélération: x{results['unitaire'] / results['par lot']:.1f}")
@@ -0,0 +1,148 @@
+"""Calcul par lot des attributs dérivés des objectifs.
+
+``compute_metrics(objectifs)`` produit, pour une liste ou un curseur
+d'objectifs, les mêmes valeurs que ``views.calculer_tous_les_attributs``
+(progression, temps total, sessions, jours restants, efficacité) mais en une
+seule passe : les dates sont converties une fois en colonnes NumPy
+``datetime64[D]`` et la progression par dates, réutilisée par les calculs
+par priorité et par tâches, n'est calculée qu'une fois.
+
+Pour un curseur, ne charger que ``METRIC_FIELDS`` :
+
+    compute_metrics(Objective.objects(user_id=uid).only(*METRIC_FIELDS))
+"""
+from datetime import date
+
+import numpy as np
+from django.utils import timezone
+
+METRIC_FIELDS = (
+    'id', 'date_debut', 'date_echeance', 'derniere_mise_a_jour', 'etat', 'priorite',
+    'taches', 'progression', 'temps_total', 'nb_sessions',
+)
+
+PROGRESSION_ETAT = {'terminé': 100, 'en cours': 50, 'en attente': 10}
+FACTEUR_PRIORITE = {'haute': 1.3, 'moyenne': 1.0, 'basse': 0.7}
+# Dates + État + Priorité + Tâches
+POIDS = (0.4, 0.3, 0.2, 0.1)
+HEURES_PAR_JOUR = 2
+HEURES_PAR_SESSION = 1.5
+JOURS_SANS_MAJ = 7
+
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _day(value):
+    """Jour (nombre de jours depuis 1970) d'une date ou d'un datetime ; None si absent."""
+    if value is None:
+        return None
+    return (value.date() if hasattr(value, 'date') else value).toordinal() - EPOCH_ORDINAL
+
+
+def _day_column(days):
+    # Passage par des flottants : None devient NaN puis NaT, bien plus rapide
+    # que la conversion d'objets date par NumPy
+    return np.array(days, dtype=np.float64).astype('datetime64[D]')
+
+
+def _row(obj):
+    """Champs utiles d'un objectif. Pour un document MongoEngine, les valeurs brutes
+    (``_data``) évitent le déréférencement des ``ListField`` à chaque accès."""
+    data = getattr(obj, '_data', None) or vars(obj)
+    return (
+        obj.pk if hasattr(obj, 'pk') else obj.id,
+        _day(data.get('date_debut')), _day(data.get('date_echeance')), _day(data.get('derniere_mise_a_jour')),
+        data.get('etat', 'en attente'), data.get('priorite', 'moyenne'), len(data.get('taches') or []),
+        data.get('progression', 0) or 0, data.get('temps_total', 0), data.get('nb_sessions', 1),
+    )
+
+
+def _divide(numerator, denominator):
+    """Division élément par élément ; 0 là où le dénominateur est nul."""
+    return np.divide(numerator, denominator, out=np.zeros(len(numerator)), where=denominator != 0)
+
+
+def efficacite_label(progression, temps_total):
+    if temps_total == 0 or progression == 0:
+        return "N/A"
+    efficacite = progression / temps_total if temps_total > 0 else 0
+    if efficacite > 3:
+        return "🚀 Excellente"
+    elif efficacite > 1.5:
+        return "👍 Bonne"
+    elif efficacite > 0.5:
+        return "📊 Moyenne"
+    return "🐌 Faible"
+
+
+def compute_metrics(objectives, today=None):
+    """``{obj.pk: {'progression', 'temps_total', 'nb_sessions', 'jours_restants', 'efficacite'}}``."""
+    objectives = list(objectives)
+    if not objectives:
+        return {}
+    today = np.datetime64(_day(today or timezone.now().date()), 'D')
+
+    # Une seule lecture des champs par objectif, puis des colonnes
+    rows = [_row(obj) for obj in objectives]
+    ids, debut, echeance, maj, etats, priorites, nb_taches, manuelles, temps, sessions_saisies = zip(*rows)
+    debut = _day_column(debut)
+    echeance = _day_column(echeance)
+    maj = _day_column(maj)
+    has_dates = ~np.isnat(debut) & ~np.isnat(echeance)
+    has_echeance = ~np.isnat(echeance)
+
+    # Durées en jours (0 là où une date manque)
+    duree = np.where(has_dates, (echeance - debut).astype('timedelta64[D]').astype(np.int64), 0)
+    ecoule = np.where(has_dates, (today - debut).astype('timedelta64[D]').astype(np.int64), 0)
+    restants = np.where(has_echeance, (echeance - today).astype('timedelta64[D]').astype(np.int64), 0)
+
+    # Progression par dates : pourcentage du temps écoulé, calculée une seule fois
+    ratio = np.trunc(_divide(ecoule, duree) * 100)
+    par_dates = np.where(ecoule < 0, 0, np.where(ecoule > duree, 100, np.where(duree > 0, np.minimum(ratio, 100), 0)))
+    par_dates = np.where(has_dates, par_dates, 0).astype(np.int64)
+
+    par_etat = np.array([PROGRESSION_ETAT.get(etat, 0) for etat in etats])
+    facteur = np.array([FACTEUR_PRIORITE.get(priorite, 1.0) for priorite in priorites])
+    par_priorite = np.minimum(np.trunc(par_dates * facteur), 100)
+    nb_taches = np.array(nb_taches)
+    complexite = np.minimum(nb_taches / 10, 2.0)
+    par_taches = np.where(nb_taches > 0, np.minimum(np.trunc(_divide(par_dates, complexite)), 100), 0)
+
+    ponderee = par_dates * POIDS[0] + par_etat * POIDS[1] + par_priorite * POIDS[2] + par_taches * POIDS[3]
+    sans_maj = ~np.isnat(maj) & (np.where(np.isnat(maj), today, maj) < today - np.timedelta64(JOURS_SANS_MAJ, 'D'))
+    ponderee = np.where(sans_maj, ponderee * 0.9, ponderee)
+    intelligente = np.minimum(np.trunc(ponderee), 100).astype(np.int64)
+
+    estime = (duree * HEURES_PAR_JOUR).tolist()
+
+    metrics = {}
+    for pk, manuelle, auto, temps_total, nb_sessions, dates, estime_i, a_echeance, jours in zip(
+            ids, manuelles, intelligente.tolist(), temps, sessions_saisies,
+            has_dates.tolist(), estime, has_echeance.tolist(), restants.tolist()):
+        # Progression manuelle prioritaire
+        progression = manuelle if manuelle > 0 else auto
+
+        if dates and not temps_total > estime_i:
+            temps_total = estime_i
+
+        if temps_total > 0:
+            sessions = int(temps_total / HEURES_PAR_SESSION)
+            if not nb_sessions > sessions:
+                nb_sessions = sessions
+
+        if not a_echeance:
+            jours_restants = "-"
+        elif jours < 0:
+            jours_restants = "Dépassé"
+        else:
+            jours_restants = jours
+
+        metrics[pk] = {
+            'progression': progression,
+            'temps_total': temps_total,
+            'nb_sessions': nb_sessions,
+            'jours_restants': jours_restants,
+            'efficacite': efficacite_label(progression, temps_total),
+        }
+    return metrics
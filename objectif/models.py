@@ -1,12 +1,8 @@
 from mongoengine import (
     Document, StringField, DateTimeField, ListField,
-    FloatField, IntField, BooleanField
+    FloatField, IntField, BooleanField, DictField
 )
 from datetime import datetime
-import os
-import json
-import requests
-from django.utils import timezone
 
 class Objective(Document):
     # 🔹 Relation avec l’utilisateur Django/Mongo
@@ -53,165 +49,111 @@ class Objective(Document):
     meta = {
         'collection': 'objectifs',
         'ordering': ['-date_creation'],
-        'indexes': ['user_id', 'etat', 'priorite']
+        'indexes': [
+            'user_id', 'etat', 'priorite',
+            # Calendrier : fenêtre de dates par utilisateur et version (voir calendar_events.py)
+            ('user_id', 'date_echeance'),
+            ('user_id', 'date_debut'),
+            ('user_id', '-derniere_mise_a_jour'),
+        ]
     }
 
     def generate_ia_suggestion(self):
-        """Génère une suggestion IA basique"""
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            return
-
-        prompt = f"""
-        Tu es un assistant expert en gestion d'objectifs.
-        Voici les informations de l'objectif :
-        Titre : {self.titre}
-        Description : {self.description}
-        Tags : {', '.join(self.tags)}
-        Progression actuelle : {self.progression}%
-        Priorité actuelle : {self.priorite}
-
-        Propose :
-        1. Une suggestion concrète pour l'utilisateur pour faire progresser cet objectif.
-        2. Un score de priorité entre 0 et 1.
-        3. Indique si cet objectif devrait être recommandé maintenant (true/false).
-
-        Réponds au format JSON :
-        {{
-          "suggestion": "...",
-          "score_priorite": 0.0,
-          "recommande": true/false
-        }}
-        """
-
-        endpoint = "https://api.generativelanguage.googleapis.com/v1/models/gemini-2.5-flash-lite:generateContent"
-        headers = {
-            "Content-Type": "application/json",
-            "x-goog-api-key": api_key
-        }
-        data = {
-            "prompt": {"text": prompt},
-            "model": "gemini-2.0-flash-lite",
-            "temperature": 0.7,
-            "maxOutputTokens": 150
-        }
-
-        resp = requests.post(endpoint, json=data, headers=headers)
-        if resp.status_code != 200:
-            return
-
-        resp_json = resp.json()
-        text = resp_json.get("candidates", [{}])[0].get("output", "")
-        try:
-            result = json.loads(text)
-            self.suggestion_ia = result.get("suggestion", "")
-            self.score_priorite_ia = result.get("score_priorite", 0.0)
-            self.objectif_recommande = result.get("recommande", False)
-        except json.JSONDecodeError:
-            self.suggestion_ia = text
-            self.score_priorite_ia = 0.5
-            self.objectif_recommande = False
-
-        self.derniere_mise_a_jour = datetime.utcnow()
-        self.save()
+        """Génère une suggestion IA basique (appel direct, avec cache ; voir objectif/analysis.py)"""
+        from .analysis import analyze
+        return analyze(self, 'suggestion')
 
     def generate_complete_ia_analysis(self):
-        """Génère une analyse IA complète et détaillée"""
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            return
-
-        # Préparer les données pour l'analyse
-        jours_restants = ""
-        if self.date_echeance:
-            aujourd_hui = timezone.now().date()
-            if hasattr(self.date_echeance, 'date'):
-                date_echeance = self.date_echeance.date()
-            else:
-                date_echeance = self.date_echeance
-            jours_restants = (date_echeance - aujourd_hui).days
-
-        prompt = f"""
-        Tu es un expert en analyse d'objectifs académiques et professionnels.
-
-        OBJECTIF À ANALYSER :
-        - Titre : {self.titre}
-        - Description : {self.description}
-        - Filière : {self.filiere}
-        - Niveau : {self.niveau}
-        - Priorité : {self.priorite}
-        - État : {self.etat}
-        - Progression : {self.progression}%
-        - Tags : {', '.join(self.tags)}
-        - Tâches prévues : {', '.join(self.taches)}
-        - Ressources : {', '.join(self.ressources)}
-        - Jours restants : {jours_restants if jours_restants else 'Non défini'}
-
-        EFFECTUE UNE ANALYSE COMPLÈTE ET RÉPONDS STRICTEMENT EN JSON :
-
-        {{
-            "analyse_ia": "Analyse textuelle complète de 3-4 phrases",
-            "points_forts": ["point 1", "point 2", "point 3"],
-            "points_amelioration": ["point 1", "point 2", "point 3"],
-            "risques": ["risque 1", "risque 2"],
-            "recommendations": ["reco 1", "reco 2", "reco 3"],
-            "delai_realisme": "Très réaliste|Réaliste|Peu réaliste|Irrealiste",
-            "niveau_difficulte": "facile|moyen|difficile|expert",
-            "suggestion_ia": "Suggestion concise pour l'utilisateur",
-            "score_priorite_ia": 0.85,
-            "objectif_recommande": true
-        }}
-
-        Sois honnête, constructif et précis dans ton analyse.
-        """
-
-        endpoint = "https://api.generativelanguage.googleapis.com/v1/models/gemini-2.5-flash-lite:generateContent"
-        headers = {
-            "Content-Type": "application/json",
-            "x-goog-api-key": api_key
-        }
-        data = {
-            "prompt": {"text": prompt},
-            "model": "gemini-2.0-flash-lite",
-            "temperature": 0.3,
-            "maxOutputTokens": 800
-        }
-
-        try:
-            resp = requests.post(endpoint, json=data, headers=headers)
-            if resp.status_code == 200:
-                resp_json = resp.json()
-                text = resp_json.get("candidates", [{}])[0].get("output", "")
-
-                # Nettoyer la réponse
-                text = text.strip()
-                if text.startswith("```json"):
-                    text = text[7:]
-                if text.endswith("```"):
-                    text = text[:-3]
-
-                result = json.loads(text)
-
-                # Mettre à jour tous les champs
-                self.analyse_ia = result.get("analyse_ia", "")
-                self.points_forts = result.get("points_forts", [])
-                self.points_amelioration = result.get("points_amelioration", [])
-                self.risques = result.get("risques", [])
-                self.recommendations = result.get("recommendations", [])
-                self.delai_realisme = result.get("delai_realisme", "")
-                self.niveau_difficulte = result.get("niveau_difficulte", "moyen")
-                self.suggestion_ia = result.get("suggestion_ia", "")
-                self.score_priorite_ia = result.get("score_priorite_ia", 0.5)
-                self.objectif_recommande = result.get("objectif_recommande", False)
-
-                self.derniere_mise_a_jour = datetime.utcnow()
-                self.save()
-
-                return True
-
-        except Exception as e:
-            print(f"Erreur lors de l'analyse IA: {e}")
-            return False
+        """Génère une analyse IA complète et détaillée (appel direct, avec cache ; voir objectif/analysis.py)"""
+        from .analysis import analyze
+        return analyze(self, 'complete')
 
     def __str__(self):
         return f"{self.titre} ({self.etat})"    
+
+
+def objectives_version(user_id):
+    """``(nombre d'objectifs, dernière mise à jour)`` de l'utilisateur.
+
+    Change à chaque création, modification ou suppression ; servi par l'index
+    ``(user_id, -derniere_mise_a_jour)``.
+    """
+    objectives = Objective.objects(user_id=user_id)
+    latest = objectives.order_by('-derniere_mise_a_jour').only('derniere_mise_a_jour').first()
+    return objectives.count(), latest.derniere_mise_a_jour if latest else None
+
+
+class AnalysisJob(Document):
+    """
+    Analyse IA (Gemini) d'un objectif exécutée hors requête (voir objectif/analysis.py)
+    """
+    STATUS_CHOICES = [
+        ('queued', 'En file d\'attente'),
+        ('running', 'En cours'),
+        ('completed', 'Terminé'),
+        ('failed', 'Échec'),
+    ]
+    ACTIVE_STATUSES = ('queued', 'running')
+
+    objective_id = StringField(max_length=24, required=True)
+    kind = StringField(max_length=20, choices=['complete', 'suggestion'], default='complete')
+    requested_by = StringField(max_length=24)
+    status = StringField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    # Vrai tant que l'analyse est en file ou en cours : une seule par objectif et par type
+    active = BooleanField(default=True)
+    attempts = IntField(default=0)
+    error = StringField()
+    created_at = DateTimeField(default=datetime.utcnow)
+    started_at = DateTimeField(null=True)
+    finished_at = DateTimeField(null=True)
+
+    meta = {
+        'collection': 'objectif_analysisjob',
+        'ordering': ['-created_at'],
+        'indexes': [
+            ('objective_id', 'kind', '-created_at'),
+            {
+                'fields': ['objective_id', 'kind'],
+                'unique': True,
+                'partialFilterExpression': {'active': True},
+                'name': 'one_active_analysis_per_objective',
+            },
+        ]
+    }
+
+    def __str__(self):
+        return f"AnalysisJob {self.pk} ({self.status})"
+
+    @property
+    def is_active(self):
+        return self.status in self.ACTIVE_STATUSES
+
+    def as_dict(self):
+        return {
+            'id': str(self.pk),
+            'kind': self.kind,
+            'status': self.status,
+            'attempts': self.attempts,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class AnalysisResult(Document):
+    """
+    Réponse de Gemini mise en cache par empreinte du prompt : un objectif
+    inchangé ne rappelle pas l'API
+    """
+    key = StringField(max_length=40, required=True, unique=True)
+    kind = StringField(max_length=20)
+    result = DictField()
+    created_at = DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        'collection': 'objectif_analysisresult',
+        'indexes': [
+            # Purge automatique par MongoDB après 30 jours
+            {'fields': ['created_at'], 'expireAfterSeconds': 30 * 24 * 3600},
+        ]
+    }
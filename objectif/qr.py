@@ -0,0 +1,81 @@
+"""QR codes des objectifs (PNG ou SVG), encodés et rendus une seule fois.
+
+Le contenu d'un QR code ne dépend que de l'URL encodée, du format et de la
+taille des modules : la matrice et l'image rendue sont mémorisées par
+processus, et la vue les sert avec un ETag fort (empreinte du contenu) et
+un ``Cache-Control`` privé et long, l'URL d'un objectif ne changeant jamais.
+"""
+import hashlib
+import io
+from functools import lru_cache
+
+import qrcode
+from PIL import Image
+
+FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+DEFAULT_BOX_SIZE = 10
+MAX_BOX_SIZE = 40
+BORDER = 4
+
+
+@lru_cache(maxsize=1024)
+def qr_matrix(data):
+    """Modules (bordure comprise) : tuple de lignes de booléens, ``True`` = noir."""
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        border=BORDER,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    return tuple(tuple(row) for row in qr.get_matrix())
+
+
+def render_png(matrix, box_size):
+    size = len(matrix)
+    img = Image.new('1', (size, size), 1)
+    img.putdata([0 if dark else 1 for row in matrix for dark in row])
+    img = img.resize((size * box_size, size * box_size), Image.NEAREST)
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def render_svg(matrix, box_size):
+    """SVG compact : un seul chemin, les modules noirs consécutifs d'une ligne fusionnés."""
+    size = len(matrix)
+    parts = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < size:
+            if not row[x]:
+                x += 1
+                continue
+            start = x
+            while x < size and row[x]:
+                x += 1
+            parts.append(f"M{start} {y}h{x - start}v1h-{x - start}z")
+    pixels = size * box_size
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{pixels}" height="{pixels}" '
+        f'viewBox="0 0 {size} {size}" shape-rendering="crispEdges">'
+        f'<rect width="{size}" height="{size}" fill="#fff"/>'
+        f'<path d="{"".join(parts)}" fill="#000"/></svg>'
+    ).encode('utf-8')
+
+
+def box_size_from(value):
+    """Taille des modules demandée (``?size=``), bornée ; défaut si invalide."""
+    try:
+        return min(max(int(value), 1), MAX_BOX_SIZE)
+    except (TypeError, ValueError):
+        return DEFAULT_BOX_SIZE
+
+
+@lru_cache(maxsize=2048)
+def qr_image(data, fmt='png', box_size=DEFAULT_BOX_SIZE):
+    """``(contenu, type MIME, ETag)`` du QR code de ``data``."""
+    matrix = qr_matrix(data)
+    body = render_svg(matrix, box_size) if fmt == 'svg' else render_png(matrix, box_size)
+    etag = hashlib.sha1(body).hexdigest()[:20]
+    return body, FORMATS.get(fmt, FORMATS['png']), f'"{etag}"'
@@ -1,3 +1,407 @@
-from django.test import TestCase
+import io
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from . import analysis, bilans, calendar_events, chatbot, metrics, qr, views
+from .management.commands.benchmark_objective_metrics import synthetic_objectives
+
+
+def _objective(pk, debut=None, echeance=None):
+    return SimpleNamespace(id=pk, titre=f'Objectif {pk}', date_debut=debut, date_echeance=echeance)
+
+
+class CalendarEventsTests(SimpleTestCase):
+    def test_parse_bound_from_fullcalendar(self):
+        self.assertEqual(calendar_events.parse_bound('2025-03-31T00:00:00+02:00'), datetime(2025, 3, 30, 22, 0))
+        # '+' non encodé dans l'URL
+        self.assertEqual(calendar_events.parse_bound('2025-03-31T00:00:00 02:00'), datetime(2025, 3, 30, 22, 0))
+        self.assertEqual(calendar_events.parse_bound('2025-03-31'), datetime(2025, 3, 31))
+        self.assertIsNone(calendar_events.parse_bound('demain'))
+        self.assertIsNone(calendar_events.parse_bound(None))
+
+    def test_window_query_is_scoped_to_user(self):
+        with mock.patch.object(calendar_events.Objective, 'objects') as objects:
+            calendar_events.objectives_in_window('42', datetime(2025, 3, 1), datetime(2025, 4, 1))
+        objects.assert_called_once_with(user_id='42')
+        window = objects.return_value.filter.call_args.args[0].to_query(calendar_events.Objective)
+        self.assertEqual(
+            window['$or'],
+            [
+                {'date_echeance': {'$gte': datetime(2025, 3, 1), '$lt': datetime(2025, 4, 1)}},
+                {'date_debut': {'$gte': datetime(2025, 3, 1), '$lt': datetime(2025, 4, 1)}},
+            ],
+        )
+        objects.return_value.filter.return_value.only.assert_called_once_with(*calendar_events.EVENT_FIELDS)
+
+    def test_events_outside_window_are_skipped(self):
+        objectives = [
+            _objective('a', debut=datetime(2025, 2, 10), echeance=datetime(2025, 3, 15)),
+            _objective('b', debut=datetime(2025, 3, 2)),
+        ]
+        events = calendar_events.build_events(objectives, datetime(2025, 3, 1), datetime(2025, 4, 1))
+        self.assertEqual([e['id'] for e in events], ['a', 'b_start'])
+        self.assertEqual(events[0]['start'], '2025-03-15T00:00:00')
+        self.assertEqual(events[0]['url'], '/objectives/details/a/')
+
+    def test_etag_depends_on_version_and_window(self):
+        state = (3, datetime(2025, 3, 1, 10, 0))
+        etag = calendar_events.calendar_etag('42', state, '2025-03-01', '2025-04-01')
+        self.assertEqual(etag, calendar_events.calendar_etag('42', state, '2025-03-01', '2025-04-01'))
+        self.assertNotEqual(etag, calendar_events.calendar_etag('42', (2, state[1]), '2025-03-01', '2025-04-01'))
+        self.assertNotEqual(etag, calendar_events.calendar_etag('42', state, '2025-04-01', '2025-05-01'))
+        self.assertNotEqual(etag, calendar_events.calendar_etag('7', state, '2025-03-01', '2025-04-01'))
+
+
+class CalendarApiTests(SimpleTestCase):
+    def _get(self, **headers):
+        request = RequestFactory().get('/objectives/calendar/api/', {'start': '2025-03-01', 'end': '2025-04-01'}, **headers)
+        request.user = SimpleNamespace(id=42, is_authenticated=True)
+        return views.calendar_events_api(request)
+
+    def test_not_modified_skips_objective_query(self):
+        state = (1, datetime(2025, 3, 1, 10, 0))
+        objectives = [_objective('a', echeance=datetime(2025, 3, 15))]
+        with mock.patch.object(views, 'objectives_version', return_value=state), \
+                mock.patch.object(calendar_events, 'objectives_in_window', return_value=objectives) as window:
+            response = self._get()
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Last-Modified'], 'Sat, 01 Mar 2025 10:00:00 GMT')
+            self.assertIn('private', response['Cache-Control'])
+            window.assert_called_once_with('42', datetime(2025, 3, 1), datetime(2025, 4, 1))
+
+            cached = self._get(HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(cached.status_code, 304)
+            window.assert_called_once()
+
+
+class FakeChunk:
+    def __init__(self, text):
+        self._text = text
+
+    @property
+    def text(self):
+        if self._text is None:
+            raise ValueError('bloqué')
+        return self._text
+
+
+class ChatbotTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = chatbot.ContextCache(max_users=2)
+        self.objectives = [
+            SimpleNamespace(titre='Réussir le partiel', etat='en cours', priorite='haute', progression=40.0),
+        ]
+
+    def test_context_reloaded_only_when_version_changes(self):
+        version = (1, datetime(2025, 3, 1))
+        with mock.patch.object(chatbot, 'objectives_version', side_effect=lambda uid: version), \
+                mock.patch.object(chatbot.Objective, 'objects') as objects:
+            objects.return_value.only.return_value = self.objectives
+            context, count = self.cache.get('42')
+            self.assertEqual(self.cache.get('42'), (context, count))
+            objects.assert_called_once_with(user_id='42')
+            objects.return_value.only.assert_called_once_with(*chatbot.CONTEXT_FIELDS)
+
+            version = (2, datetime(2025, 3, 2))
+            self.cache.get('42')
+            self.assertEqual(objects.call_count, 2)
+        self.assertEqual(count, 1)
+        self.assertIn('- Réussir le partiel (État: en cours, Priorité: haute, Progression: 40.0%)', context)
+
+    def test_stream_reply_emits_deltas_then_done(self):
+        model = mock.Mock()
+        model.generate_content.return_value = iter([FakeChunk('Bon'), FakeChunk(None), FakeChunk('jour !')])
+        with mock.patch.object(chatbot.genai, 'GenerativeModel', return_value=model):
+            events = list(chatbot.stream_reply('prompt', 3))
+        model.generate_content.assert_called_once_with('prompt', stream=True)
+        self.assertEqual(events, [
+            'data: {"delta": "Bon"}\n\n',
+            'data: {"delta": "jour !"}\n\n',
+            'event: done\ndata: {"status": "success", "objectifs_count": 3}\n\n',
+        ])
+
+    def test_stream_reply_reports_errors_as_event(self):
+        with mock.patch.object(chatbot.genai, 'GenerativeModel', side_effect=RuntimeError('quota')):
+            events = list(chatbot.stream_reply('prompt', 0))
+        self.assertEqual(len(events), 1)
+        self.assertTrue(events[0].startswith('event: error\n'))
+
+    def test_api_streams_when_client_accepts_event_stream(self):
+        request = RequestFactory().post('/objectives/chatbot/api/', {'message': 'Comment avancer ?'},
+                                        HTTP_ACCEPT='text/event-stream')
+        request.user = SimpleNamespace(id=42, is_authenticated=True)
+        with mock.patch.object(chatbot.context_cache, 'get', return_value=('ctx', 1)) as get, \
+                mock.patch.object(chatbot, 'stream_reply', return_value=iter(['data: {}\n\n'])):
+            response = views.chatbot_api(request)
+        get.assert_called_once_with('42')
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(b''.join(response.streaming_content), b'data: {}\n\n')
+
+
+class MetricsTests(SimpleTestCase):
+    def setUp(self):
+        now = datetime(2025, 3, 10, 15, 30)
+        patcher = mock.patch.object(views.timezone, 'now', return_value=now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.today = now.date()
+
+    def test_batch_matches_per_object_computation(self):
+        objectives = synthetic_objectives(300, seed=3)
+        expected = {obj.pk: views.calculer_tous_les_attributs(obj) for obj in objectives}
+        self.assertEqual(metrics.compute_metrics(objectives, today=self.today), expected)
+
+    def test_edge_cases(self):
+        objectives = [
+            # Dates absentes : valeurs saisies conservées
+            SimpleNamespace(id='a', date_debut=None, date_echeance=None, derniere_mise_a_jour=None, etat='en cours',
+                            priorite='haute', taches=[], progression=0.0, temps_total=0.0, nb_sessions=0),
+            # Échéance dépassée, pas de mise à jour depuis plus d'une semaine
+            SimpleNamespace(id='b', date_debut=datetime(2025, 1, 1), date_echeance=date(2025, 3, 1),
+                            derniere_mise_a_jour=datetime(2025, 2, 1), etat='terminé', priorite='basse',
+                            taches=['t'] * 30, progression=0.0, temps_total=500.0, nb_sessions=3),
+            # Progression manuelle prioritaire, même jour de début et d'échéance
+            SimpleNamespace(id='c', date_debut=datetime(2025, 3, 10, 8), date_echeance=datetime(2025, 3, 10, 20),
+                            derniere_mise_a_jour=datetime(2025, 3, 10), etat='en cours', priorite='moyenne',
+                            taches=['t'], progression=42.5, temps_total=0.0, nb_sessions=0),
+        ]
+        expected = {obj.id: views.calculer_tous_les_attributs(obj) for obj in objectives}
+        result = metrics.compute_metrics(objectives, today=self.today)
+        self.assertEqual(result, expected)
+        self.assertEqual(result['b']['jours_restants'], 'Dépassé')
+        self.assertEqual(result['a']['jours_restants'], '-')
+        self.assertEqual(result['c']['progression'], 42.5)
+        self.assertEqual(metrics.compute_metrics([]), {})
+
+
+def _analysed_objective(**fields):
+    values = dict(
+        pk='64b000000000000000000001', titre='Réussir le partiel', description='Réseaux', filiere='info',
+        niveau='L3', priorite='haute', etat='en cours', progression=40.0, tags=['réseaux'], taches=['TD 1'],
+        ressources=[], date_echeance=None, analyse_ia='', save=mock.Mock(),
+    )
+    values.update(fields)
+    return SimpleNamespace(**values)
+
+
+def _gemini_response(status, text='', headers=None):
+    body = {'candidates': [{'content': {'parts': [{'text': text}]}}]}
+    return mock.Mock(status_code=status, text=text, headers=headers or {}, json=mock.Mock(return_value=body))
+
+
+@override_settings(GEMINI_API_KEY='test', GEMINI_MAX_RETRIES=2)
+class AnalysisTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(analysis, 'rate_limiter', return_value=analysis.RateLimiter(0))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_rate_limiter_spaces_calls(self):
+        clock = [100.0]
+        waits = []
+        limiter = analysis.RateLimiter(30, clock=lambda: clock[0], sleep=waits.append)
+        self.assertEqual([limiter.wait(), limiter.wait(), limiter.wait()], [0.0, 2.0, 4.0])
+        clock[0] = 110.0
+        self.assertEqual(limiter.wait(), 0.0)
+        self.assertEqual(waits, [2.0, 4.0])
+
+    def test_call_retries_rate_limited_requests(self):
+        session = mock.Mock()
+        session.post.side_effect = [
+            _gemini_response(429, headers={'Retry-After': '7'}),
+            _gemini_response(503),
+            _gemini_response(200, '{"analyse_ia": "ok"}'),
+        ]
+        with mock.patch.object(analysis, 'http_session', return_value=session), \
+                mock.patch.object(analysis.time, 'sleep') as sleep, \
+                mock.patch.object(analysis.random, 'uniform', return_value=1.0):
+            text = analysis.call_gemini('prompt', 0.3, 1024)
+        self.assertEqual(text, '{"analyse_ia": "ok"}')
+        self.assertEqual([c.args[0] for c in sleep.call_args_list], [7.0, 4.0])
+        self.assertEqual(session.post.call_args.kwargs['headers']['x-goog-api-key'], 'test')
+
+    def test_call_gives_up_on_client_errors(self):
+        session = mock.Mock()
+        session.post.return_value = _gemini_response(400, 'clé invalide')
+        with mock.patch.object(analysis, 'http_session', return_value=session), \
+                self.assertRaises(analysis.AnalysisError):
+            analysis.call_gemini('prompt', 0.3, 1024)
+        session.post.assert_called_once()
+
+    def test_unchanged_objective_is_served_from_cache(self):
+        obj = _analysed_objective()
+        cached = {'analyse_ia': 'Analyse en cache', 'score_priorite_ia': 0.9}
+        with mock.patch.object(analysis, 'cached_result', return_value=cached) as lookup, \
+                mock.patch.object(analysis, 'call_gemini') as call:
+            self.assertTrue(analysis.run_analysis(obj, 'complete'))
+        call.assert_not_called()
+        lookup.assert_called_once_with(analysis.prompt_key('complete', obj))
+        self.assertEqual(obj.analyse_ia, 'Analyse en cache')
+        obj.save.assert_called_once()
+
+        changed = _analysed_objective(progression=60.0)
+        self.assertNotEqual(analysis.prompt_key('complete', obj), analysis.prompt_key('complete', changed))
+        self.assertNotEqual(analysis.prompt_key('complete', obj), analysis.prompt_key('suggestion', obj))
+
+    def test_cache_key_does_not_change_with_the_day(self):
+        obj = _analysed_objective(date_echeance=datetime(2025, 6, 30, 18))
+        prompts, keys = [], []
+        for today in (datetime(2025, 3, 10, 9), datetime(2025, 3, 11, 9)):
+            with mock.patch.object(analysis.timezone, 'now', return_value=today):
+                prompts.append(analysis.complete_prompt(obj))
+                keys.append(analysis.prompt_key('complete', obj))
+        # Les jours restants changent dans le prompt, pas dans la clé du cache
+        self.assertNotEqual(prompts[0], prompts[1])
+        self.assertEqual(keys[0], keys[1])
+        moved = _analysed_objective(date_echeance=datetime(2025, 7, 1, 18))
+        self.assertNotEqual(keys[0], analysis.prompt_key('complete', moved))
+
+    def test_only_valid_responses_are_cached(self):
+        obj = _analysed_objective()
+        with mock.patch.object(analysis, 'cached_result', return_value=None), \
+                mock.patch.object(analysis, 'store_result') as store, \
+                mock.patch.object(analysis, 'call_gemini', return_value='```json\n{"suggestion": "Réviser", "recommande": true}\n```'):
+            self.assertFalse(analysis.run_analysis(obj, 'suggestion'))
+        store.assert_called_once()
+        self.assertEqual((obj.suggestion_ia, obj.objectif_recommande), ('Réviser', True))
+
+        with mock.patch.object(analysis, 'cached_result', return_value=None), \
+                mock.patch.object(analysis, 'store_result') as store, \
+                mock.patch.object(analysis, 'call_gemini', return_value='pas du JSON'):
+            analysis.run_analysis(obj, 'complete')
+        store.assert_not_called()
+        self.assertTrue(obj.analyse_ia.startswith("Analyse de l'objectif"))
+
+    def test_submit_joins_active_job(self):
+        obj = _analysed_objective()
+        running = SimpleNamespace(created_at=datetime.utcnow())
+        with mock.patch.object(analysis, 'cached_result', return_value=None), \
+                mock.patch.object(analysis, 'active_job', return_value=running), \
+                mock.patch.object(analysis.executor, 'submit') as submit:
+            self.assertEqual(analysis.submit(obj), (running, False))
+        submit.assert_not_called()
+
+    def test_submit_applies_cached_result_without_job(self):
+        obj = _analysed_objective()
+        with mock.patch.object(analysis, 'cached_result', return_value={'analyse_ia': 'déjà faite'}), \
+                mock.patch.object(analysis, 'active_job') as active, \
+                mock.patch.object(analysis.executor, 'submit') as submit:
+            self.assertEqual(analysis.submit(obj), (None, False))
+        active.assert_not_called()
+        submit.assert_not_called()
+        self.assertEqual(obj.analyse_ia, 'déjà faite')
+
+
+class BilanTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        override = override_settings(BILAN_CACHE_DIR=directory.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.objectives = synthetic_objectives(3, seed=5)
+
+    def test_styles_are_built_once(self):
+        self.assertIs(bilans.bilan_styles(), bilans.bilan_styles())
+        self.assertIn('SectionTitle', bilans.bilan_styles())
+
+    def test_bilan_is_cached_until_objective_changes(self):
+        obj = self.objectives[0]
+        path = bilans.cached_bilan(obj)
+        self.assertTrue(path.read_bytes().startswith(b'%PDF'))
+        with mock.patch.object(bilans, 'build_bilan_file') as build:
+            self.assertEqual(bilans.cached_bilan(obj), path)
+        build.assert_not_called()
+
+        obj.derniere_mise_a_jour += timedelta(minutes=5)
+        updated = bilans.cached_bilan(obj)
+        self.assertNotEqual(updated, path)
+        self.assertEqual(list(path.parent.glob('*.pdf')), [updated])
+
+    def test_zip_contains_every_bilan(self):
+        bilans.cached_bilan(self.objectives[0])
+        usernames = {'benchmark': 'alice'}
+        with ThreadPoolExecutor(max_workers=2) as pool, \
+                mock.patch.object(bilans, 'build_bilan_file', wraps=bilans.build_bilan_file) as build:
+            data = b''.join(bilans.stream_zip(self.objectives, usernames, pool=pool))
+        # Le premier bilan est déjà en cache
+        self.assertEqual(build.call_count, 2)
+        archive = zipfile.ZipFile(io.BytesIO(data))
+        names = archive.namelist()
+        self.assertEqual(len(names), 3)
+        self.assertTrue(all(name.startswith('alice/bilan_objectif_') for name in names))
+        self.assertTrue(archive.read(names[0]).startswith(b'%PDF'))
+
+    def test_zip_lists_failed_bilans(self):
+        with ThreadPoolExecutor(max_workers=1) as pool, \
+                mock.patch.object(bilans, 'build_bilan_file', side_effect=RuntimeError('rendu')):
+            data = b''.join(bilans.stream_zip(self.objectives[:1], {}, pool=pool))
+        archive = zipfile.ZipFile(io.BytesIO(data))
+        self.assertEqual(archive.namelist(), ['ERREURS.txt'])
+        self.assertIn(b'rendu', archive.read('ERREURS.txt'))
+
+
+class QrCodeTests(SimpleTestCase):
+    def _get(self, obj_id='64b000000000000000000001', **params):
+        headers = {k: params.pop(k) for k in list(params) if k.startswith('HTTP_')}
+        request = RequestFactory().get(f'/objectives/qrcode/{obj_id}/', params, **headers)
+        request.user = SimpleNamespace(id=42, is_authenticated=True)
+        return views.generate_qrcode(request, obj_id)
+
+    def test_png_matches_qrcode_library_rendering(self):
+        import qrcode
+        from PIL import Image, ImageChops
+        data = 'http://testserver/objectives/details/64b000000000000000000001/'
+        reference = qrcode.QRCode(version=1, error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=10, border=4)
+        reference.add_data(data)
+        reference.make(fit=True)
+        expected = reference.make_image(fill_color="black", back_color="white").get_image().convert('L')
+        body, content_type, _ = qr.qr_image(data)
+        self.assertEqual(content_type, 'image/png')
+        self.assertIsNone(ImageChops.difference(expected, Image.open(io.BytesIO(body)).convert('L')).getbbox())
+
+    def test_svg_merges_runs_of_dark_modules(self):
+        matrix = (
+            (False, True, True, False),
+            (True, False, False, True),
+            (False, False, False, False),
+            (True, True, True, True),
+        )
+        svg = qr.render_svg(matrix, 5).decode()
+        self.assertIn('width="20"', svg)
+        self.assertIn('d="M1 0h2v1h-2zM0 1h1v1h-1zM3 1h1v1h-1zM0 3h4v1h-4z"', svg)
+
+    def test_response_is_cacheable_and_revalidated_without_lookup(self):
+        with mock.patch.object(views.Objective, 'objects') as objects:
+            response = self._get(format='svg')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Type'], 'image/svg+xml')
+            self.assertIn('immutable', response['Cache-Control'])
+            # Vue réservée aux utilisateurs connectés : pas de cache partagé
+            self.assertIn('private', response['Cache-Control'])
+            self.assertNotIn('public', response['Cache-Control'])
+
+            cached = self._get(format='svg', HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(cached.status_code, 304)
+            # Une vérification d'existence par requête, pour l'ETag comme pour la vue
+            self.assertEqual(objects.get.call_count, 2)
+            self.assertNotEqual(self._get()['ETag'], response['ETag'])
+
+    def test_missing_objective_is_not_cached(self):
+        etag = qr.qr_image('http://testserver/objectives/details/64b000000000000000000001/')[2]
+        with mock.patch.object(views.Objective, 'objects') as objects, \
+                mock.patch.object(views, '_qrcode_image') as image:
+            objects.get.side_effect = views.Objective.DoesNotExist
+            response = self._get()
+            revalidated = self._get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('Cache-Control'))
+        self.assertEqual(revalidated.status_code, 404)
+        image.assert_not_called()
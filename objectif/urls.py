@@ -11,6 +11,10 @@
     path('chatbot/', views.chatbot_view, name='chatbot'),
     path('chatbot/api/', views.chatbot_api, name='chatbot_api'),  # Garder chatbot_api pour l'API
 
+    # Calendrier (avant '<str:obj_id>/' qui capturerait 'calendar')
+    path('calendar/', views.objective_calendar, name='calendar'),
+    path('calendar/api/', views.calendar_events_api, name='calendar_events_api'),
+
     # Détails et QR Code
     path('details/<str:obj_id>/', views.objective_details, name='objective_details'),
     path('qrcode/<str:obj_id>/', views.generate_qrcode, name='generate_qrcode'),
@@ -18,16 +22,15 @@
     path("<str:obj_id>/", views.objective_details, name="detail"),  # ✅ FIX HERE
     path("<str:obj_id>/qrcode/", views.generate_qrcode, name="qrcode"),  # ✅ ADD THIS
 
-    # Calendrier
-    path('calendar/', views.objective_calendar, name='calendar'),
-    path('calendar/api/', views.calendar_events_api, name='calendar_events_api'),
      path('details/<str:obj_id>/', views.objective_details, name='details'),
     path('details/<str:obj_id>/ia-analysis/', views.trigger_ia_analysis, name='trigger_ia_analysis'),
     path('api/<str:obj_id>/ia-analysis/', views.get_ia_analysis, name='get_ia_analysis'),
+    path('api/<str:obj_id>/ia-analysis/status/', views.ia_analysis_status, name='ia_analysis_status'),
     path('assistant/', views.chatbot_view, name='assistant'),
 
 
     path('bilan-pdf/<str:obj_id>/', views.generate_pdf_bilan, name='generate_pdf_bilan'),
+    path('bilans/export/', views.export_bilans, name='export_bilans'),
 
 
 ]
@@ -1,10 +1,11 @@
 # ai_summary.py
-from transformers import pipeline
 import os
 
+from searchx.model_registry import registry as model_registry
+
 os.environ['TRANSFORMERS_CACHE'] = os.path.join(os.getcwd(), 'transformers_cache')
 
-_summarizer = None
+SUMMARY_MODEL = "facebook/bart-large-cnn"
 
 MAX_CHARS = 1000  # ou 1024 tokens approximativement
 
@@ -18,13 +19,11 @@ def split_text(text, max_chars=MAX_CHARS):
     return segments
 
 def generate_summary(text):
-    global _summarizer
-    if _summarizer is None:
-        _summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
+    summarizer = model_registry.pipeline("summarization", SUMMARY_MODEL)
 
     segments = split_text(text)
     summaries = []
     for segment in segments:
-        result = _summarizer(segment, max_length=150, min_length=40, do_sample=False)
+        result = summarizer(segment, max_length=150, min_length=40, do_sample=False)
         summaries.append(result[0]['summary_text'])
     return " ".join(summaries)
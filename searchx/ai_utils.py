@@ -11,17 +11,20 @@
 
 # Advanced AI: HuggingFace Transformers
 try:
-    from transformers import pipeline, AutoTokenizer, AutoModel
+    # Sondage seulement : les modèles sont chargés par model_registry
+    import transformers  # noqa: F401
     HF_AVAILABLE = True
 except Exception:
     HF_AVAILABLE = False
 
+from .model_registry import registry as model_registry
+
 # Génération de texte avec HuggingFace
 def hf_generate_text(prompt, model_name="gpt2", max_length=100):
     try:
         if not HF_AVAILABLE:
             return "Erreur génération HF: transformers non installé"
-        generator = pipeline("text-generation", model=model_name)
+        generator = model_registry.pipeline("text-generation", model_name)
         result = generator(prompt, max_length=max_length, num_return_sequences=1)
         return result[0]["generated_text"]
     except Exception as e:
@@ -32,8 +35,7 @@ def hf_get_embedding(text, model_name="sentence-transformers/all-MiniLM-L6-v2"):
     try:
         if not HF_AVAILABLE:
             return f"Erreur embedding HF: transformers non installé"
-        tokenizer = AutoTokenizer.from_pretrained(model_name)
-        model = AutoModel.from_pretrained(model_name)
+        tokenizer, model = model_registry.encoder(model_name)
         inputs = tokenizer(text, return_tensors="pt")
         with torch.no_grad():
             outputs = model(**inputs)
@@ -42,12 +44,37 @@ def hf_get_embedding(text, model_name="sentence-transformers/all-MiniLM-L6-v2"):
     except Exception as e:
         return f"Erreur embedding HF: {str(e)}"
 
+
+def hf_get_embeddings(texts, model_name="sentence-transformers/all-MiniLM-L6-v2", batch_size=32):
+    """Embeddings de plusieurs textes en lots (matrice numpy n x d).
+    Le modèle n'est chargé qu'une fois pour tout le lot ; la moyenne est
+    pondérée par le masque d'attention pour ignorer le padding.
+    """
+    try:
+        if not HF_AVAILABLE:
+            return "Erreur embedding HF: transformers non installé"
+        tokenizer, model = model_registry.encoder(model_name)
+        chunks = []
+        for start in range(0, len(texts), batch_size):
+            batch = list(texts[start:start + batch_size])
+            inputs = tokenizer(batch, return_tensors="pt", padding=True, truncation=True)
+            with torch.no_grad():
+                outputs = model(**inputs)
+            mask = inputs["attention_mask"].unsqueeze(-1).to(outputs.last_hidden_state.dtype)
+            summed = (outputs.last_hidden_state * mask).sum(dim=1)
+            chunks.append((summed / mask.sum(dim=1).clamp(min=1e-9)).numpy())
+        if not chunks:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack(chunks)
+    except Exception as e:
+        return f"Erreur embedding HF: {str(e)}"
+
 # Classification de texte avec HuggingFace
 def hf_classify_text(text, model_name="distilbert-base-uncased-finetuned-sst-2-english"):
     try:
         if not HF_AVAILABLE:
             return f"Erreur classification HF: transformers non installé"
-        classifier = pipeline("text-classification", model=model_name)
+        classifier = model_registry.pipeline("text-classification", model_name)
         result = classifier(text)
         return result
     except Exception as e:
@@ -212,6 +239,7 @@ def get_ai_status():
         'openai_available': bool(OPENAI_AVAILABLE),
         'hf_available': bool(HF_AVAILABLE),
         'tesseract_available': bool(TESSERACT_AVAILABLE),
+        'models': model_registry.stats(),
     }
     return info
 
@@ -283,7 +311,10 @@ def semantic_expand(query):
     return seeds
 
 def compute_similarity(text1, text2):
-    """Calcule la similarité entre deux textes."""
+    """Calcule la similarité entre deux textes.
+    Ponctuel uniquement : pour scorer un texte contre tous les concepts ou
+    collections, utiliser ``corpus_index`` (vectorizer ajusté une seule fois).
+    """
     try:
         vectorizer = TfidfVectorizer()
         tfidf_matrix = vectorizer.fit_transform([text1, text2])
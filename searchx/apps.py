@@ -4,3 +4,6 @@
 class SearchxConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'searchx'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,201 @@
+"""Cached TF-IDF index over Concepts and Collections.
+
+The vectorizer is fitted once per process and the sparse document matrix is
+kept in memory. Before each query the index compares a cheap fingerprint
+(row count + latest ``updated_at``) of every source table: changed rows are
+re-vectorized with the existing vocabulary and deleted rows are dropped; the
+vectorizer is only refitted when too much of the corpus changed since the
+last fit. Because the fingerprint lives in the database, writes made by
+other gunicorn workers are picked up too (see ``signals.py`` for the
+``updated_at`` bumps on membership changes).
+"""
+import threading
+
+import numpy as np
+from django.db.models import Count, Max
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+
+class DocSource:
+    """Where one kind of document comes from and how it is turned into text."""
+
+    def __init__(self, kind, queryset, to_text):
+        self.kind = kind
+        self._queryset = queryset
+        self.to_text = to_text
+
+    def queryset(self):
+        return self._queryset()
+
+
+class CorpusIndex:
+    def __init__(self, sources, refit_ratio=0.2, **vectorizer_kwargs):
+        self.sources = {s.kind: s for s in sources}
+        self.refit_ratio = refit_ratio
+        self.vectorizer_kwargs = vectorizer_kwargs
+        self._lock = threading.RLock()
+        self._reset()
+        self.fits = 0
+
+    def _reset(self):
+        self.vectorizer = None
+        self.matrix = None
+        self.keys = []
+        self._positions = {}
+        self._fingerprints = {}
+        self._changed_since_fit = 0
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+    def invalidate(self):
+        with self._lock:
+            self._reset()
+
+    def _fingerprint(self, source):
+        agg = source.queryset().aggregate(n=Count("id"), last=Max("updated_at"))
+        return agg["n"], agg["last"]
+
+    def _set_rows(self, keys, matrix):
+        self.keys = list(keys)
+        self.matrix = matrix
+        self._positions = {key: i for i, key in enumerate(self.keys)}
+
+    def _fit(self, fingerprints):
+        keys, docs = [], []
+        for kind, source in self.sources.items():
+            for obj in source.queryset():
+                keys.append((kind, obj.id))
+                docs.append(source.to_text(obj))
+        self._reset()
+        self._fingerprints = fingerprints
+        if not docs:
+            return
+        vectorizer = TfidfVectorizer(**self.vectorizer_kwargs)
+        try:
+            matrix = vectorizer.fit_transform(docs).tocsr()
+        except ValueError:
+            # Empty vocabulary (only stop words / blank rows)
+            return
+        self.vectorizer = vectorizer
+        self._set_rows(keys, matrix)
+        self.fits += 1
+
+    def _apply_changes(self, kind, previous, current):
+        source = self.sources[kind]
+        qs = source.queryset()
+        changed = list(qs.filter(updated_at__gte=previous[1])) if previous[1] else list(qs)
+        drop = {(kind, obj.id) for obj in changed}
+        if current[0] != previous[0] + sum(1 for obj in changed if (kind, obj.id) not in self._positions):
+            alive = set(qs.values_list("id", flat=True))
+            drop |= {key for key in self.keys if key[0] == kind and key[1] not in alive}
+        keep = [i for i, key in enumerate(self.keys) if key not in drop]
+        keys = [self.keys[i] for i in keep]
+        blocks = [self.matrix[keep]]
+        if changed:
+            keys.extend((kind, obj.id) for obj in changed)
+            blocks.append(self.vectorizer.transform([source.to_text(obj) for obj in changed]))
+        self._set_rows(keys, sparse.vstack(blocks).tocsr())
+        self._changed_since_fit += len(drop | {(kind, obj.id) for obj in changed})
+
+    def refresh(self):
+        with self._lock:
+            current = {kind: self._fingerprint(source) for kind, source in self.sources.items()}
+            if self.vectorizer is None:
+                if current != self._fingerprints or not self._fingerprints:
+                    self._fit(current)
+                return
+            for kind, fingerprint in current.items():
+                previous = self._fingerprints.get(kind)
+                if previous != fingerprint:
+                    self._apply_changes(kind, previous, fingerprint)
+            self._fingerprints = current
+            if self._changed_since_fit > self.refit_ratio * max(len(self.keys), 1):
+                self._fit(current)
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+    def _scores(self, text):
+        self.refresh()
+        with self._lock:
+            if self.vectorizer is None or self.matrix is None:
+                return [], np.zeros(0)
+            q_vec = self.vectorizer.transform([text or ""])
+            # Rows are L2-normalised by TfidfVectorizer: the dot product is the cosine
+            scores = np.asarray((self.matrix @ q_vec.T).todense()).ravel()
+            return self.keys, scores
+
+    def query(self, text, k=10, kinds=None):
+        """Top ``k`` documents as ``[(kind, id, score), ...]``, best first."""
+        keys, scores = self._scores(text)
+        if kinds is not None:
+            mask = np.array([key[0] in kinds for key in keys], dtype=bool)
+            scores = np.where(mask, scores, -1.0)
+        k = min(k, int((scores > 0).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(keys[i][0], keys[i][1], float(scores[i])) for i in top]
+
+    def scores(self, text, kind):
+        """``{id: score}`` for every document of ``kind`` in one sparse product."""
+        keys, scores = self._scores(text)
+        return {key[1]: float(score) for key, score in zip(keys, scores) if key[0] == kind}
+
+
+def _concept_doc(c):
+    return f"{c.name or ''}. {c.description or ''}. Niveau: {c.level or ''}"
+
+
+def _collection_doc(col):
+    return f"{col.name or ''}. {col.description or ''}. Filiere: {col.filiere or ''}. Niveau: {col.level or ''}"
+
+
+def collection_profile_text(col) -> str:
+    """Collection text used for recommendations (includes concept names and resources)."""
+    concept_names = ', '.join(c.name for c in col.concepts.all())
+    resources_text = '\n'.join([str(r) for r in (col.resources or [])])
+    return f"{col.name}. {col.description}. {col.filiere}. {col.level}. {concept_names}. {resources_text}"
+
+
+def _build_indexes():
+    from .models import Collection, Concept
+    from .serializers import prefetch_concepts
+    knowledge = CorpusIndex(
+        [
+            DocSource("concept", lambda: Concept.objects.only("id", "name", "description", "level", "updated_at"),
+                      _concept_doc),
+            DocSource("collection", lambda: Collection.objects.only(
+                "id", "name", "description", "filiere", "level", "updated_at"), _collection_doc),
+        ],
+        max_features=5000, ngram_range=(1, 2),
+    )
+    collections = CorpusIndex(
+        [DocSource("collection", lambda: prefetch_concepts(Collection.objects.all()), collection_profile_text)],
+    )
+    return knowledge, collections
+
+
+_indexes = None
+_indexes_lock = threading.Lock()
+
+
+def _get(which):
+    global _indexes
+    with _indexes_lock:
+        if _indexes is None:
+            _indexes = dict(zip(("knowledge", "collections"), _build_indexes()))
+        return _indexes[which]
+
+
+def knowledge_index() -> CorpusIndex:
+    """Concepts + Collections, as used by ``api_ai_ask`` / ``api_ai_describe``."""
+    return _get("knowledge")
+
+
+def collection_index() -> CorpusIndex:
+    """Collections with their concepts and resources, as used by ``api_recommendations``."""
+    return _get("collections")
@@ -0,0 +1,364 @@
+"""Persistent embedding index for Concepts.
+
+Concept vectors are computed once, L2-normalised and stored as ``.npy``
+files that are memory-mapped on load, so a semantic query costs one
+embedding of the query text plus a single matrix-vector product.
+The index is kept in sync by the Concept signals (see ``signals.py``):
+each change is appended to a journal, the base files are only rewritten
+when the journal is compacted. Only the models listed in
+``SEARCHX_EMBEDDING_MODELS`` get an index.
+"""
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialised within a process
+    fcntl = None
+
+DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+def concept_text(concept) -> str:
+    return f"{concept.name}. {concept.description}".strip()
+
+
+def _normalize(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def index_dir() -> Path:
+    return Path(getattr(settings, "SEARCHX_INDEX_DIR", Path(settings.BASE_DIR) / "var" / "searchx"))
+
+
+class EmbeddingStore:
+    """Concept id -> normalised vector matrix for one embedding model.
+
+    The base matrix (``vectors.npy`` / ``ids.npy``) is memory-mapped and only
+    rewritten by ``build`` or a compaction. A Concept save or delete appends
+    one fixed-size record (id, live flag, vector) to ``journal.bin``; records
+    are replayed on load, and once the journal exceeds ``compact_ratio`` of
+    the base (and at least ``compact_min`` records) it is folded back into the
+    base. Replaying a record twice is harmless, so a reader that sees a new
+    base before the journal is truncated stays correct.
+    """
+
+    compact_min = 256
+    compact_ratio = 0.2
+
+    def __init__(self, model_name=DEFAULT_MODEL, directory=None, embed_fn=None):
+        self.model_name = model_name
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self.directory = Path(directory or index_dir()) / slug
+        self._embed_fn = embed_fn
+        self._lock = threading.RLock()
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._matrix = None
+        self._positions = {}
+        self._dead = np.zeros(0, dtype=bool)
+        self._extra = {}
+        self._extra_arrays = None
+        self._mtime = None
+        self._journal_offset = 0
+        self._journal_records = 0
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+    @property
+    def ids_path(self):
+        return self.directory / "ids.npy"
+
+    @property
+    def vectors_path(self):
+        return self.directory / "vectors.npy"
+
+    @property
+    def journal_path(self):
+        return self.directory / "journal.bin"
+
+    @property
+    def dim(self):
+        if self._matrix is None or self._matrix.ndim != 2 or not self._matrix.shape[1]:
+            return None
+        return self._matrix.shape[1]
+
+    def exists(self) -> bool:
+        return self.ids_path.exists() and self.vectors_path.exists()
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return int(len(self._ids) - self._dead.sum()) + len(self._extra)
+
+    def _embed(self, texts):
+        if self._embed_fn is not None:
+            vectors = self._embed_fn(texts)
+        else:
+            from . import ai_utils
+            vectors = ai_utils.hf_get_embeddings(texts, model_name=self.model_name)
+        if isinstance(vectors, str):
+            return None
+        return _normalize(vectors)
+
+    @contextmanager
+    def _file_lock(self):
+        """Serialise writers across workers (journal appends and base rewrites)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / ".lock", "a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _record_dtype(self):
+        return np.dtype([("id", "<i8"), ("live", "u1"), ("vector", "<f4", (self.dim,))])
+
+    def _set(self, ids, matrix):
+        self._ids = np.asarray(ids, dtype=np.int64)
+        self._matrix = matrix
+        self._positions = {int(cid): i for i, cid in enumerate(self._ids)}
+        self._dead = np.zeros(len(self._ids), dtype=bool)
+        self._extra = {}
+        self._extra_arrays = None
+        self._journal_offset = 0
+        self._journal_records = 0
+
+    def _load(self):
+        ids = np.load(self.ids_path)
+        matrix = np.load(self.vectors_path, mmap_mode="r")
+        if len(ids) != matrix.shape[0]:
+            # Half-written pair from a concurrent writer: keep what we have
+            return
+        self._set(ids, matrix)
+        self._mtime = os.stat(self.ids_path).st_mtime_ns
+        self._replay()
+
+    def _apply(self, concept_id, vector):
+        """Overlay one change on the base: ``vector`` None means removal."""
+        pos = self._positions.get(concept_id)
+        if pos is not None and not self._dead[pos]:
+            # Copy-on-write: searches may still hold the previous mask
+            self._dead = self._dead.copy()
+            self._dead[pos] = True
+        if vector is None:
+            self._extra.pop(concept_id, None)
+        else:
+            self._extra[concept_id] = vector
+        self._extra_arrays = None
+
+    def _replay(self):
+        """Apply the journal records appended since the last read."""
+        if self.dim is None or not self.journal_path.exists():
+            return
+        size = self.journal_path.stat().st_size
+        if size < self._journal_offset:
+            # Truncated by a compaction in another worker: reload on next access
+            self._mtime = None
+            return
+        dtype = self._record_dtype()
+        count = (size - self._journal_offset) // dtype.itemsize
+        if count <= 0:
+            return
+        records = np.fromfile(self.journal_path, dtype=dtype, count=count, offset=self._journal_offset)
+        for record in records:
+            self._apply(int(record["id"]), np.array(record["vector"]) if record["live"] else None)
+        self._journal_offset += count * dtype.itemsize
+        self._journal_records += count
+
+    def _refresh(self):
+        """Reload when another process rewrote the base, replay its journal appends."""
+        if not self.exists():
+            return
+        mtime = os.stat(self.ids_path).st_mtime_ns
+        if mtime != self._mtime:
+            self._load()
+        else:
+            self._replay()
+
+    def _overlay(self):
+        """``(ids, matrix)`` of the concepts changed since the base was written."""
+        if self._extra_arrays is None:
+            ids = np.fromiter(self._extra.keys(), dtype=np.int64, count=len(self._extra))
+            matrix = np.vstack(list(self._extra.values())) if self._extra else None
+            self._extra_arrays = (ids, matrix)
+        return self._extra_arrays
+
+    def _write_base(self, ids, matrix):
+        """Rewrite the base files and empty the journal (caller holds both locks)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        matrix = matrix if matrix is not None else np.zeros((0, 0), dtype=np.float32)
+        for path, data in ((self.vectors_path, matrix), (self.ids_path, np.asarray(ids, dtype=np.int64))):
+            tmp = path.with_suffix(".tmp.npy")
+            np.save(tmp, data)
+            os.replace(tmp, path)
+        self.journal_path.write_bytes(b"")
+        meta = {"model": self.model_name, "count": int(len(ids))}
+        (self.directory / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+        self._load()
+
+    def _compact(self):
+        keep = ~self._dead
+        ids = self._ids[keep]
+        matrix = np.asarray(self._matrix[keep]) if self._matrix is not None and len(ids) else None
+        extra_ids, extra_matrix = self._overlay()
+        if len(extra_ids):
+            ids = np.concatenate([ids, extra_ids])
+            matrix = extra_matrix if matrix is None else np.vstack([matrix, extra_matrix])
+        self._write_base(ids, matrix)
+
+    def _append(self, concept_id, vector):
+        """Journal one change (caller holds both locks), compacting when it grows too long."""
+        record = np.zeros(1, dtype=self._record_dtype())
+        record["id"] = concept_id
+        if vector is not None:
+            record["live"] = 1
+            record["vector"] = vector
+        with open(self.journal_path, "ab") as handle:
+            handle.write(record.tobytes())
+        # Picks up our record and any appended before it by other workers
+        self._replay()
+        if self._journal_records >= max(self.compact_min, self.compact_ratio * len(self._ids)):
+            self._compact()
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+    def build(self, concepts=None) -> bool:
+        """(Re)compute the whole index. Returns False if embeddings are unavailable."""
+        from .models import Concept
+        if concepts is None:
+            concepts = Concept.objects.only("id", "name", "description").order_by("id")
+        concepts = list(concepts)
+        vectors = self._embed([concept_text(c) for c in concepts]) if concepts else None
+        if concepts and vectors is None:
+            return False
+        with self._lock, self._file_lock():
+            self._write_base([c.id for c in concepts], vectors)
+        return True
+
+    def upsert(self, concept) -> bool:
+        vector = self._embed([concept_text(concept)])
+        if vector is None:
+            return False
+        with self._lock, self._file_lock():
+            self._refresh()
+            if self.dim != vector.shape[1]:
+                # Empty base (or another dimension): nothing worth journaling
+                self._apply(int(concept.id), vector[0])
+                self._compact()
+            else:
+                self._append(int(concept.id), vector[0])
+        return True
+
+    def remove(self, concept_id):
+        concept_id = int(concept_id)
+        with self._lock, self._file_lock():
+            self._refresh()
+            pos = self._positions.get(concept_id)
+            if concept_id not in self._extra and (pos is None or self._dead[pos]):
+                return
+            self._append(concept_id, None)
+
+    def compact(self):
+        """Fold the journal into the base files now."""
+        with self._lock, self._file_lock():
+            self._refresh()
+            if self._journal_records:
+                self._compact()
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+    def search(self, text, top_k=10):
+        """Return ``[(concept_id, similarity), ...]`` best first, or None if the
+        query (or the initial build) could not be embedded."""
+        with self._lock:
+            self._refresh()
+            if self._mtime is None and not self.build():
+                return None
+            ids, matrix, dead = self._ids, self._matrix, self._dead
+            extra_ids, extra_matrix = self._overlay()
+        query = self._embed([text])
+        if query is None:
+            return None
+        if matrix is not None and len(ids):
+            scores = matrix @ query[0]
+            if dead.any():
+                ids, scores = ids[~dead], scores[~dead]
+        else:
+            ids, scores = ids[:0], np.zeros(0, dtype=np.float32)
+        if len(extra_ids):
+            ids = np.concatenate([ids, extra_ids])
+            scores = np.concatenate([scores, extra_matrix @ query[0]])
+        k = min(max(int(top_k), 0), len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(ids[i]), float(scores[i])) for i in top]
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def allowed_models():
+    """Models a client may query (``SEARCHX_EMBEDDING_MODELS``); the first is the default."""
+    return list(getattr(settings, "SEARCHX_EMBEDDING_MODELS", None) or [DEFAULT_MODEL])
+
+
+def resolve_model(model_name):
+    """``model_name`` if it is allowed, otherwise the default model."""
+    allowed = allowed_models()
+    return model_name if model_name in allowed else allowed[0]
+
+
+def get_store(model_name=None) -> EmbeddingStore:
+    """Process-wide store for ``model_name`` (one per gunicorn worker).
+
+    Raises ValueError for a model outside the allowlist: each store embeds the
+    whole corpus and is kept up to date on every Concept save.
+    """
+    model_name = model_name or allowed_models()[0]
+    if model_name not in allowed_models():
+        raise ValueError(f"Embedding model not allowed: {model_name}")
+    key = (str(index_dir()), model_name)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = EmbeddingStore(model_name)
+        return store
+
+
+def persisted_stores():
+    """Stores that already exist on disk (and therefore need incremental updates).
+    Indexes left behind by a model removed from the allowlist are ignored."""
+    root = index_dir()
+    if not root.is_dir():
+        return []
+    allowed = allowed_models()
+    stores = []
+    for meta_path in root.glob("*/meta.json"):
+        try:
+            model_name = json.loads(meta_path.read_text(encoding="utf-8"))["model"]
+        except Exception:
+            continue
+        if model_name in allowed:
+            stores.append(get_store(model_name))
+    return stores
@@ -0,0 +1,160 @@
+"""Buffered ingestion of interaction beacons.
+
+``api_log_interaction`` only enqueues the event and answers 202. A daemon
+thread per worker process drains the bounded queue and writes batches with
+one ``bulk_create`` (plus one profile update) either when
+``SEARCHX_INGEST_BATCH_SIZE`` events are waiting or every
+``SEARCHX_INGEST_FLUSH_SECONDS``. When the queue is full new events are
+rejected and counted as dropped. Pending events are flushed on worker exit
+(``atexit`` and gunicorn's ``worker_exit`` hook).
+
+Set ``SEARCHX_INGEST_ASYNC = False`` to write inline (tests, management
+scripts).
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from . import profiles
+from .models import UserInteraction
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class InteractionBuffer:
+    def __init__(self, max_size=None, batch_size=None, flush_interval=None):
+        self.max_size = max_size or _setting("SEARCHX_INGEST_QUEUE_SIZE", 10000)
+        self.batch_size = batch_size or _setting("SEARCHX_INGEST_BATCH_SIZE", 200)
+        self.flush_interval = flush_interval or _setting("SEARCHX_INGEST_FLUSH_SECONDS", 2.0)
+        self._queue = queue.Queue(maxsize=self.max_size)
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self.counters = {"enqueued": 0, "flushed": 0, "dropped": 0, "failed": 0, "batches": 0}
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def stats(self):
+        with self._lock:
+            data = dict(self.counters)
+        data["pending"] = self._queue.qsize()
+        return data
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+    def submit(self, event) -> bool:
+        """Queue one event; False when the buffer is full (event dropped)."""
+        event.setdefault("created_at", timezone.now())
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self._count("dropped")
+            return False
+        self._count("enqueued")
+        self._ensure_worker()
+        return True
+
+    def _ensure_worker(self):
+        # Threads do not survive fork: (re)start lazily in each gunicorn worker
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="searchx-ingestion", daemon=True)
+            self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    # ------------------------------------------------------------------
+    def _drain(self, wait):
+        """Collect up to ``batch_size`` events, waiting at most ``wait`` seconds."""
+        batch = []
+        deadline = time.monotonic() + wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                batch = self._drain(self.flush_interval)
+                if batch:
+                    self._write(batch)
+        finally:
+            close_old_connections()
+
+    def _write(self, batch):
+        with self._write_lock:
+            try:
+                with transaction.atomic():
+                    UserInteraction.objects.bulk_create([
+                        UserInteraction(
+                            user_id=e.get("user_id"),
+                            user_key=e.get("user_key") or "",
+                            event_type=e["event_type"],
+                            query=e.get("query", ""),
+                            content_type=e.get("content_type", ""),
+                            content_id=e.get("content_id", ""),
+                            metadata=e.get("metadata") or {},
+                            created_at=e.get("created_at") or timezone.now(),
+                        )
+                        for e in batch
+                    ], batch_size=500)
+                    profiles.record_interactions(batch)
+            except Exception as e:
+                self._count("failed", len(batch))
+                print(f"[searchx] Échec de l'écriture de {len(batch)} interactions: {e}")
+            else:
+                self._count("flushed", len(batch))
+                self._count("batches")
+
+    def flush(self):
+        """Write everything pending from the calling thread."""
+        while True:
+            batch = self._drain(0)
+            if not batch:
+                return
+            self._write(batch)
+
+    def shutdown(self, timeout=5.0):
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout)
+        self.flush()
+
+
+buffer = InteractionBuffer()
+atexit.register(buffer.shutdown)
+
+
+def ingest(event) -> bool:
+    """Entry point used by the view: buffered, or inline when async is disabled."""
+    if not _setting("SEARCHX_INGEST_ASYNC", True):
+        event.setdefault("created_at", timezone.now())
+        buffer._write([event])
+        return True
+    return buffer.submit(event)
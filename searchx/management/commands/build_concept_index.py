@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from searchx import embedding_store
+
+
+class Command(BaseCommand):
+    help = "Calcule (ou recalcule) l'index d'embeddings des concepts utilisé par /api/search/semantic-emb."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", default=None, help="Modèle de SEARCHX_EMBEDDING_MODELS (défaut : le premier)")
+
+    def handle(self, *args, **options):
+        try:
+            store = embedding_store.get_store(options["model"])
+        except ValueError as e:
+            raise CommandError(str(e))
+        if not store.build():
+            raise CommandError("Embeddings indisponibles (transformers/torch non installés ?)")
+        self.stdout.write(self.style.SUCCESS(f"{len(store)} concepts indexés dans {store.directory}"))
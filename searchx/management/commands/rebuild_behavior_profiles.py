@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from searchx import profiles
+from searchx.models import BehaviorProfile
+
+
+class Command(BaseCommand):
+    help = "Recalcule les profils de comportement (recommandations) depuis l'historique UserInteraction."
+
+    def handle(self, *args, **options):
+        profiles.rebuild_profiles()
+        self.stdout.write(self.style.SUCCESS(f"{BehaviorProfile.objects.count()} profils reconstruits"))
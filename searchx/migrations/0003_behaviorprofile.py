@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('searchx', '0002_userinteraction'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BehaviorProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_key', models.CharField(blank=True, max_length=64, unique=True)),
+                ('filiere_weights', models.JSONField(blank=True, default=dict)),
+                ('concept_weights', models.JSONField(blank=True, default=dict)),
+                ('recent_queries', models.JSONField(blank=True, default=list)),
+                ('event_count', models.PositiveIntegerField(default=0)),
+                ('decayed_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
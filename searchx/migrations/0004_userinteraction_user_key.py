@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 05:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('searchx', '0003_behaviorprofile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userinteraction',
+            name='user_key',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,178 @@
+"""Process-wide registry for HuggingFace models and pipelines.
+
+Each gunicorn worker loads a given model once and reuses it for every
+request. Models are loaded lazily (one loader per key, other keys are not
+blocked), and evicted least-recently-used when the registry exceeds
+``AI_MODEL_MAX_LOADED`` entries or ``AI_MODEL_MEMORY_BUDGET_MB``, or when a
+model has been idle for ``AI_MODEL_IDLE_TIMEOUT`` seconds.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+def _model_size_bytes(obj) -> int:
+    """Approximate parameter memory of a torch model or a pipeline."""
+    models = []
+    if isinstance(obj, tuple):
+        models.extend(obj)
+    else:
+        models.append(getattr(obj, "model", obj))
+    total = 0
+    for model in models:
+        params = getattr(model, "parameters", None)
+        if not callable(params):
+            continue
+        try:
+            total += sum(p.numel() * p.element_size() for p in params())
+        except Exception:
+            pass
+    return total
+
+
+def _load_pipeline(task, model_name):
+    from transformers import pipeline
+    return pipeline(task, model=model_name)
+
+
+def _load_encoder(model_name):
+    from transformers import AutoModel, AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name)
+    model.eval()
+    return tokenizer, model
+
+
+class _Entry:
+    __slots__ = ("value", "size", "last_used", "hits")
+
+    def __init__(self, value, size):
+        self.value = value
+        self.size = size
+        self.last_used = time.monotonic()
+        self.hits = 0
+
+
+class ModelRegistry:
+    def __init__(self, max_loaded=None, idle_timeout=None, memory_budget_mb=None):
+        self.max_loaded = max_loaded
+        self.idle_timeout = idle_timeout
+        self.memory_budget_mb = memory_budget_mb
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.loads = 0
+        self.evictions = 0
+
+    # Limits default to settings so tests can override them per case
+    def _limit(self, attr, setting, default):
+        value = getattr(self, attr)
+        return value if value is not None else getattr(settings, setting, default)
+
+    def get(self, key, loader):
+        """Return the object cached under ``key``, calling ``loader()`` on a miss."""
+        with self._lock:
+            self._expire_idle()
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._touch(key, entry)
+                return entry.value
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._touch(key, entry)
+                    return entry.value
+            value = loader()
+            entry = _Entry(value, _model_size_bytes(value))
+            with self._lock:
+                self._entries[key] = entry
+                self._touch(key, entry)
+                self.loads += 1
+                self._enforce_limits(keep=key)
+                self._key_locks.pop(key, None)
+            return value
+
+    def pipeline(self, task, model_name):
+        return self.get(("pipeline", task, model_name), lambda: _load_pipeline(task, model_name))
+
+    def encoder(self, model_name):
+        """``(tokenizer, model)`` pair for raw hidden-state embeddings."""
+        return self.get(("encoder", model_name), lambda: _load_encoder(model_name))
+
+    def _touch(self, key, entry):
+        entry.last_used = time.monotonic()
+        entry.hits += 1
+        self._entries.move_to_end(key)
+
+    def _expire_idle(self):
+        timeout = self._limit("idle_timeout", "AI_MODEL_IDLE_TIMEOUT", 0)
+        if not timeout:
+            return
+        now = time.monotonic()
+        for key in [k for k, e in self._entries.items() if now - e.last_used > timeout]:
+            del self._entries[key]
+            self.evictions += 1
+
+    def _enforce_limits(self, keep):
+        max_loaded = self._limit("max_loaded", "AI_MODEL_MAX_LOADED", 0)
+        budget = self._limit("memory_budget_mb", "AI_MODEL_MEMORY_BUDGET_MB", 0) * 1024 * 1024
+
+        def over():
+            if max_loaded and len(self._entries) > max_loaded:
+                return True
+            return bool(budget) and sum(e.size for e in self._entries.values()) > budget
+
+        while over():
+            victim = next((k for k in self._entries if k != keep), None)
+            if victim is None:
+                break
+            del self._entries[victim]
+            self.evictions += 1
+
+    def evict(self, key=None):
+        with self._lock:
+            if key is None:
+                self.evictions += len(self._entries)
+                self._entries.clear()
+            elif self._entries.pop(key, None) is not None:
+                self.evictions += 1
+
+    def warm_up(self, specs=None):
+        """Preload models, e.g. from gunicorn's ``post_worker_init``.
+        ``specs`` is an iterable of ``"task:model"`` strings (``encoder:<model>``
+        for embedding encoders); defaults to ``AI_MODEL_WARMUP``.
+        """
+        if specs is None:
+            specs = getattr(settings, "AI_MODEL_WARMUP", [])
+        loaded = []
+        for spec in specs:
+            task, _, model_name = spec.partition(":")
+            if not model_name:
+                continue
+            try:
+                if task == "encoder":
+                    self.encoder(model_name)
+                else:
+                    self.pipeline(task, model_name)
+                loaded.append(spec)
+            except Exception as e:
+                print(f"[model_registry] Préchargement impossible pour {spec}: {e}")
+        return loaded
+
+    def stats(self):
+        with self._lock:
+            return {
+                "loaded": [
+                    {"key": ":".join(k), "size_mb": round(e.size / (1024 * 1024), 1), "hits": e.hits}
+                    for k, e in self._entries.items()
+                ],
+                "loads": self.loads,
+                "evictions": self.evictions,
+            }
+
+
+registry = ModelRegistry()
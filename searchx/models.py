@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 class Concept(models.Model):
     name = models.CharField(max_length=200)
@@ -34,12 +35,33 @@ class UserInteraction(models.Model):
         ("click", "click"),
     )
     user = models.ForeignKey(getattr(settings, 'AUTH_USER_MODEL', 'auth.User'), null=True, blank=True, on_delete=models.SET_NULL)
+    # Profile key used when the event was recorded (see profiles.user_key): Mongo users have no FK
+    user_key = models.CharField(max_length=64, blank=True, default="")
     event_type = models.CharField(max_length=20, choices=EVENT_CHOICES)
     query = models.TextField(blank=True)
     content_type = models.CharField(max_length=50, blank=True)
     content_id = models.CharField(max_length=100, blank=True)
     metadata = models.JSONField(default=dict, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the beacon is received, not when the ingestion buffer writes it
+    created_at = models.DateTimeField(default=timezone.now)
 
     def __str__(self) -> str:
         return f"{self.user_id or 'anon'}:{self.event_type}:{self.created_at:%Y-%m-%d %H:%M}"
+
+
+class BehaviorProfile(models.Model):
+    """Materialized, time-decayed behavior signals used by the recommender.
+
+    ``user_key`` is the authenticated user's pk as a string; the empty key
+    holds the profile aggregated over every interaction (anonymous visitors).
+    """
+    user_key = models.CharField(max_length=64, unique=True, blank=True)
+    filiere_weights = models.JSONField(default=dict, blank=True)
+    concept_weights = models.JSONField(default=dict, blank=True)
+    recent_queries = models.JSONField(default=list, blank=True)
+    event_count = models.PositiveIntegerField(default=0)
+    decayed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.user_key or 'global'}:{self.event_count}"
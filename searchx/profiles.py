@@ -0,0 +1,123 @@
+"""Incrementally maintained behavior profiles for ``api_recommendations``.
+
+Each logged interaction folds its filiere / concept ids / query into the
+user's profile and into the global profile (``user_key=""``). Existing
+weights are decayed exponentially (``SEARCHX_BEHAVIOR_HALF_LIFE_DAYS``)
+before the new event is added, so old habits fade without keeping or
+rescanning the raw history. The recommender reads one row.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import BehaviorProfile, UserInteraction
+
+GLOBAL_KEY = ""
+MAX_KEYS = 200
+MAX_QUERIES = 10
+
+
+def user_key(request) -> str:
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return str(user.pk)
+    return GLOBAL_KEY
+
+
+def _decay_factor(since, now):
+    half_life = float(getattr(settings, "SEARCHX_BEHAVIOR_HALF_LIFE_DAYS", 14))
+    if since is None or half_life <= 0:
+        return 1.0
+    days = max((now - since).total_seconds(), 0.0) / 86400.0
+    return 0.5 ** (days / half_life)
+
+
+def _scale(weights, factor):
+    if factor == 1.0:
+        return dict(weights)
+    return {k: w * factor for k, w in weights.items() if w * factor >= 1e-3}
+
+
+def _prune(weights):
+    if len(weights) <= MAX_KEYS:
+        return weights
+    return dict(sorted(weights.items(), key=lambda kv: -kv[1])[:MAX_KEYS])
+
+
+def _apply(profile, events):
+    """Fold ``events`` (oldest first) into ``profile`` in memory."""
+    for event in events:
+        at = event.get("created_at") or timezone.now()
+        if profile.decayed_at is not None and at < profile.decayed_at:
+            # Late event: age it instead of rewinding the profile clock
+            weight = _decay_factor(at, profile.decayed_at)
+        else:
+            decay = _decay_factor(profile.decayed_at, at)
+            profile.filiere_weights = _scale(profile.filiere_weights, decay)
+            profile.concept_weights = _scale(profile.concept_weights, decay)
+            profile.decayed_at = at
+            weight = 1.0
+        meta = event.get("metadata") or {}
+        if meta.get("filiere"):
+            key = str(meta["filiere"])
+            profile.filiere_weights[key] = profile.filiere_weights.get(key, 0.0) + weight
+        if meta.get("concept_ids"):
+            try:
+                for cid in meta["concept_ids"]:
+                    profile.concept_weights[str(cid)] = profile.concept_weights.get(str(cid), 0.0) + weight
+            except TypeError:
+                pass
+        if event.get("query"):
+            profile.recent_queries = (list(profile.recent_queries) + [event["query"]])[-MAX_QUERIES:]
+        profile.event_count += 1
+    profile.filiere_weights = _prune(profile.filiere_weights)
+    profile.concept_weights = _prune(profile.concept_weights)
+
+
+def record_interactions(events):
+    """Update profiles for a batch of events.
+
+    ``events`` are dicts with ``user_key``, ``query``, ``metadata`` and an
+    optional ``created_at``; every event also feeds the global profile.
+    """
+    by_key = {}
+    for event in events:
+        by_key.setdefault(GLOBAL_KEY, []).append(event)
+        if event.get("user_key"):
+            by_key.setdefault(event["user_key"], []).append(event)
+    with transaction.atomic():
+        existing = {
+            p.user_key: p
+            for p in BehaviorProfile.objects.select_for_update().filter(user_key__in=list(by_key))
+        }
+        for key, key_events in by_key.items():
+            profile = existing.get(key) or BehaviorProfile(user_key=key)
+            _apply(profile, sorted(key_events, key=lambda e: e.get("created_at") or timezone.now()))
+            profile.save()
+
+
+def record_interaction(user_key, query="", metadata=None, created_at=None):
+    record_interactions([{"user_key": user_key, "query": query, "metadata": metadata or {}, "created_at": created_at}])
+
+
+def get_profile(key):
+    return BehaviorProfile.objects.filter(user_key=key).first()
+
+
+def rebuild_profiles(batch_size=2000):
+    """Recompute every profile from the raw UserInteraction history."""
+    BehaviorProfile.objects.all().delete()
+    events = []
+    for it in UserInteraction.objects.order_by("created_at").iterator(chunk_size=batch_size):
+        events.append({
+            # Same key as the live path; rows logged before user_key was stored fall back to the FK
+            "user_key": it.user_key or (str(it.user_id) if it.user_id else GLOBAL_KEY),
+            "query": it.query,
+            "metadata": it.metadata,
+            "created_at": it.created_at,
+        })
+        if len(events) >= batch_size:
+            record_interactions(events)
+            events = []
+    if events:
+        record_interactions(events)
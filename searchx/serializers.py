@@ -0,0 +1,44 @@
+"""Bulk serialization helpers for Collections.
+
+Every collection endpoint goes through these so that concepts are loaded
+for the whole page in one prefetch query (and counts via one annotation)
+instead of one ``col.concepts`` query per collection.
+"""
+from django.db.models import Count, Prefetch
+
+from .models import Concept
+
+
+def prefetch_concepts(qs):
+    return qs.prefetch_related(Prefetch("concepts", queryset=Concept.objects.only("id", "name", "level")))
+
+
+def annotate_concept_count(qs):
+    return qs.annotate(concept_count=Count("concepts", distinct=True))
+
+
+def concept_summary(c):
+    return {"id": c.id, "name": c.name, "level": c.level}
+
+
+def concept_ids(col):
+    """Ids of the collection's concepts, read from the prefetch cache."""
+    return [c.id for c in col.concepts.all()]
+
+
+def serialize_collection(col, **extra):
+    data = {
+        "id": col.id,
+        "name": col.name,
+        "description": col.description,
+        "filiere": col.filiere,
+        "level": col.level,
+        "concepts": [concept_summary(c) for c in col.concepts.all()],
+        "resources": col.resources,
+    }
+    data.update(extra)
+    return data
+
+
+def serialize_collections(qs):
+    return [serialize_collection(col) for col in prefetch_concepts(qs)]
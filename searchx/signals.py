@@ -0,0 +1,58 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import embedding_store, token_index
+from .models import Collection, Concept
+
+
+def _sync_embeddings(action, *args):
+    for store in embedding_store.persisted_stores():
+        try:
+            getattr(store, action)(*args)
+        except Exception as e:
+            print(f"[searchx] Mise à jour de l'index d'embeddings impossible ({store.model_name}): {e}")
+
+
+def _sync_token_indexes(action, *args):
+    for index in token_index.loaded_indexes():
+        getattr(index, action)(*args)
+
+
+def _touch_collections(**filters):
+    # Collection texts embed their concept names: bump updated_at so the
+    # corpus index fingerprint (count + max updated_at) sees the change
+    Collection.objects.filter(**filters).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Concept)
+def concept_saved(sender, instance, created, **kwargs):
+    if not created:
+        _touch_collections(concepts=instance)
+    transaction.on_commit(lambda: _sync_token_indexes("add", instance))
+    transaction.on_commit(lambda: _sync_embeddings("upsert", instance))
+
+
+@receiver(pre_delete, sender=Concept)
+def concept_deleting(sender, instance, **kwargs):
+    _touch_collections(concepts=instance)
+
+
+@receiver(post_delete, sender=Concept)
+def concept_deleted(sender, instance, **kwargs):
+    concept_id = instance.pk
+    transaction.on_commit(lambda: _sync_token_indexes("remove", concept_id))
+    transaction.on_commit(lambda: _sync_embeddings("remove", concept_id))
+
+
+@receiver(m2m_changed, sender=Collection.concepts.through)
+def collection_concepts_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            _touch_collections(pk=instance.pk)
+    elif action in ("post_add", "post_remove") and pk_set:
+        _touch_collections(pk__in=pk_set)
+    elif action == "pre_clear":
+        # concept.collections.clear(): pk_set is not provided, touch them before they are unlinked
+        _touch_collections(concepts=instance)
@@ -1,3 +1,349 @@
-from django.test import TestCase
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
 
-# Create your tests here.
+import numpy as np
+from django.test import TestCase, override_settings
+
+from . import embedding_store
+from .models import Concept
+
+
+def fake_embeddings(texts, model_name=None):
+    """Deterministic bag-of-letters vectors, good enough to rank by overlap."""
+    out = np.zeros((len(texts), 26), dtype=np.float32)
+    for i, text in enumerate(texts):
+        for ch in text.lower():
+            if 'a' <= ch <= 'z':
+                out[i, ord(ch) - 97] += 1
+    return out
+
+
+class EmbeddingStoreTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.pile = Concept.objects.create(name='Pile', description='LIFO')
+        self.file = Concept.objects.create(name='File', description='FIFO')
+
+    def make_store(self):
+        return embedding_store.EmbeddingStore(directory=self.tmp.name, embed_fn=fake_embeddings)
+
+    def test_search_builds_and_persists_index(self):
+        store = self.make_store()
+        hits = store.search('pile lifo', top_k=1)
+        self.assertEqual(hits[0][0], self.pile.id)
+        self.assertTrue(store.exists())
+        reloaded = self.make_store()
+        self.assertEqual(len(reloaded), 2)
+        self.assertIsInstance(reloaded._matrix, np.memmap)
+
+    def test_upsert_and_remove(self):
+        store = self.make_store()
+        store.build()
+        graphe = Concept.objects.create(name='Graphe', description='sommets et arcs')
+        store.upsert(graphe)
+        self.assertEqual(store.search('graphe sommets', top_k=1)[0][0], graphe.id)
+        store.remove(self.pile.id)
+        self.assertNotIn(self.pile.id, [cid for cid, _ in store.search('pile', top_k=10)])
+        self.assertEqual(len(self.make_store()), 2)
+
+    def test_updates_are_journaled_then_compacted(self):
+        store = self.make_store()
+        store.build()
+        base_mtime = store.vectors_path.stat().st_mtime_ns
+        graphe = Concept.objects.create(name='Graphe', description='sommets et arcs')
+        store.upsert(graphe)
+        store.remove(self.file.id)
+        # the base is untouched, another instance replays the journal
+        self.assertEqual(store.vectors_path.stat().st_mtime_ns, base_mtime)
+        reloaded = self.make_store()
+        self.assertEqual(reloaded.search('graphe sommets', top_k=1)[0][0], graphe.id)
+        self.assertNotIn(self.file.id, [cid for cid, _ in reloaded.search('file fifo', top_k=10)])
+        reloaded.compact()
+        self.assertEqual(reloaded.journal_path.stat().st_size, 0)
+        self.assertEqual(sorted(np.load(reloaded.ids_path).tolist()), sorted([self.pile.id, graphe.id]))
+        self.assertEqual(len(store), 2)
+
+    def test_journal_compacts_past_threshold(self):
+        store = self.make_store()
+        store.compact_min = 3
+        store.build()
+        for i in range(3):
+            store.upsert(Concept.objects.create(name=f'Arbre {i}', description='noeuds'))
+        self.assertEqual(store.journal_path.stat().st_size, 0)
+        self.assertEqual(len(np.load(store.ids_path)), 5)
+
+    def test_only_allowed_models_get_a_store(self):
+        with override_settings(SEARCHX_EMBEDDING_MODELS=['modele/a', 'modele/b']):
+            self.assertEqual(embedding_store.resolve_model('modele/b'), 'modele/b')
+            self.assertEqual(embedding_store.resolve_model('../../autre'), 'modele/a')
+            self.assertEqual(embedding_store.get_store().model_name, 'modele/a')
+            with self.assertRaises(ValueError):
+                embedding_store.get_store('autre/modele')
+
+    def test_unavailable_embeddings_return_none(self):
+        store = embedding_store.EmbeddingStore(directory=self.tmp.name, embed_fn=lambda texts: "Erreur")
+        self.assertIsNone(store.search('pile'))
+
+    def test_semantic_emb_endpoint_uses_index(self):
+        with override_settings(SEARCHX_INDEX_DIR=self.tmp.name), \
+                patch('searchx.ai_utils.hf_get_embeddings', side_effect=fake_embeddings) as mock_emb, \
+                patch('searchx.ai_utils.semantic_expand', return_value=[]):
+            body = {"query": "pile lifo", "top_k": 1}
+            resp = self.client.post('/api/search/semantic-emb', data=json.dumps(body), content_type='application/json')
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(resp.json()['results'][0]['id'], self.pile.id)
+            # one batched call for the corpus, one for the query
+            self.assertEqual(mock_emb.call_count, 2)
+            self.client.post('/api/search/semantic-emb', data=json.dumps(body), content_type='application/json')
+            self.assertEqual(mock_emb.call_count, 3)
+
+    def test_semantic_emb_endpoint_ignores_unlisted_model(self):
+        with override_settings(SEARCHX_INDEX_DIR=self.tmp.name), \
+                patch('searchx.ai_utils.hf_get_embeddings', side_effect=fake_embeddings) as mock_emb, \
+                patch('searchx.ai_utils.semantic_expand', return_value=[]):
+            body = {"query": "pile lifo", "top_k": 1, "model": "someone/huge-model"}
+            resp = self.client.post('/api/search/semantic-emb', data=json.dumps(body), content_type='application/json')
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual({c.kwargs['model_name'] for c in mock_emb.call_args_list}, {embedding_store.DEFAULT_MODEL})
+            self.assertEqual([p.name for p in Path(self.tmp.name).iterdir()], ['sentence-transformers_all-MiniLM-L6-v2'])
+
+
+class CorpusIndexTests(TestCase):
+    def setUp(self):
+        from . import corpus_index
+        from .models import Collection
+        self.corpus_index = corpus_index
+        self.pile = Concept.objects.create(name='Pile', description='structure LIFO empiler depiler')
+        self.file = Concept.objects.create(name='File', description='structure FIFO enfiler')
+        self.algo = Collection.objects.create(name='Algorithmique', description='tri rapide et recherche', filiere='info')
+        self.algo.concepts.set([self.pile])
+        self.index = corpus_index.CorpusIndex(
+            [
+                corpus_index.DocSource('concept', lambda: Concept.objects.all(), corpus_index._concept_doc),
+                corpus_index.DocSource('collection', lambda: Collection.objects.prefetch_related('concepts'),
+                                       corpus_index.collection_profile_text),
+            ],
+            refit_ratio=10,
+        )
+
+    def test_query_ranks_without_refitting(self):
+        kind, concept_id, score = self.index.query('lifo empiler', k=1)[0]
+        self.assertEqual((kind, concept_id), ('concept', self.pile.id))
+        self.assertGreater(score, 0)
+        self.index.query('fifo')
+        self.assertEqual(self.index.fits, 1)
+
+    def test_changes_are_applied_incrementally(self):
+        self.index.query('pile')
+        self.file.description = 'structure FIFO tri'
+        self.file.save()
+        Concept.objects.filter(pk=self.pile.pk).delete()
+        hits = self.index.query('fifo', k=5)
+        self.assertEqual(hits[0][1], self.file.id)
+        self.assertNotIn(('concept', self.pile.id), self.index.keys)
+        self.assertEqual(self.index.fits, 1)
+
+    def test_membership_change_refreshes_collection_text(self):
+        # collection documents carry their concept names
+        self.assertEqual(self.index.scores('file', 'collection')[self.algo.id], 0.0)
+        self.algo.concepts.add(self.file)
+        self.assertGreater(self.index.scores('file', 'collection')[self.algo.id], 0.0)
+
+    def test_recommendations_use_single_index_fit(self):
+        self.corpus_index._indexes = None
+        self.addCleanup(setattr, self.corpus_index, '_indexes', None)
+        resp = self.client.get('/api/recommendations', {'q': 'tri rapide'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()['results'][0]['id'], self.algo.id)
+        self.assertEqual(self.corpus_index.collection_index().fits, 1)
+
+
+class TokenIndexTests(TestCase):
+    def setUp(self):
+        from . import token_index
+        self.token_index = token_index
+        self.pile = Concept.objects.create(name='Pile', description='structure lifo', level='L1')
+        self.file = Concept.objects.create(name='File', description='structure fifo fifo', level='L1')
+        self.index = token_index.TokenIndex(token_index.FULL_FIELDS)
+
+    def test_scores_match_brute_force(self):
+        query = {'structure', 'lifo', 'l1'}
+        self.assertEqual(self.index.overlap(query), [(self.pile.id, 3), (self.file.id, 2)])
+        # |Q ∩ D| / |Q ∪ D| with D = {pile, structure, lifo, l1}
+        self.assertEqual(self.index.jaccard(query, limit=1), [(self.pile.id, 3 / 4)])
+        self.assertEqual(self.index.bm25({'fifo'})[0][0], self.file.id)
+
+    def test_add_remove_and_refresh(self):
+        self.index.refresh()
+        graphe = Concept(name='Graphe', description='sommets', level='')
+        graphe.save()
+        self.assertEqual(self.index.overlap({'sommets'}), [(graphe.id, 1)])
+        self.index.remove(self.pile.id)
+        self.assertEqual(self.index.overlap({'lifo'}), [])
+        Concept.objects.filter(pk=self.file.pk).delete()
+        self.index.refresh()
+        self.assertEqual(len(self.index), 2)
+
+    def test_semantic_endpoint_does_not_scan_concepts(self):
+        self.token_index._indexes.clear()
+        self.addCleanup(self.token_index._indexes.clear)
+        self.client.get('/api/search/semantic', {'q': 'lifo'})
+        with self.assertNumQueries(3):  # fingerprint, matched concepts, related collections
+            resp = self.client.get('/api/search/semantic', {'q': 'lifo', 'scoring': 'bm25'})
+        self.assertEqual([c['id'] for c in resp.json()['concepts']], [self.pile.id])
+
+
+class CollectionQueryCountTests(TestCase):
+    """Collection endpoints must not issue one concepts query per collection."""
+
+    def add_collections(self, n):
+        from .models import Collection
+        concepts = [Concept.objects.create(name=f'C{i}', description='algo') for i in range(3)]
+        for i in range(n):
+            col = Collection.objects.create(name=f'Col {i}', description='algo tri', filiere='info')
+            col.concepts.set(concepts)
+
+    def count_queries(self, path, params=None):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        self.client.get(path, params or {})  # warm process-level indexes
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(path, params or {})
+        self.assertEqual(resp.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def assert_constant(self, path, params=None):
+        self.add_collections(2)
+        small = self.count_queries(path, params)
+        self.add_collections(10)
+        self.assertEqual(self.count_queries(path, params), small)
+
+    def test_collections(self):
+        self.assert_constant('/api/collections/')
+
+    def test_trends(self):
+        self.assert_constant('/api/trends/')
+
+    def test_semantic(self):
+        self.assert_constant('/api/search/semantic', {'q': 'algo'})
+
+    def test_recommendations(self):
+        from . import corpus_index
+        self.addCleanup(setattr, corpus_index, '_indexes', None)
+        self.assert_constant('/api/recommendations', {'q': 'tri'})
+
+    def test_collection_detail(self):
+        from .models import Collection
+        self.add_collections(1)
+        pk = Collection.objects.get().pk
+        with self.assertNumQueries(2):
+            resp = self.client.get(f'/api/collections/{pk}')
+        self.assertEqual(len(resp.json()['concepts']), 3)
+
+
+@override_settings(SEARCHX_INGEST_ASYNC=False)
+class BehaviorProfileTests(TestCase):
+    def log(self, **payload):
+        return self.client.post('/api/interactions/log', data=json.dumps(payload), content_type='application/json')
+
+    def test_log_interaction_updates_global_profile(self):
+        from .models import BehaviorProfile
+        self.log(query='tri', metadata={'filiere': 'info', 'concept_ids': [1, 2]})
+        self.log(query='graphes', metadata={'filiere': 'info'})
+        profile = BehaviorProfile.objects.get(user_key='')
+        self.assertEqual(profile.event_count, 2)
+        self.assertAlmostEqual(profile.filiere_weights['info'], 2.0, places=3)
+        self.assertEqual(sorted(profile.concept_weights), ['1', '2'])
+        self.assertAlmostEqual(profile.concept_weights['1'], 1.0, places=3)
+        self.assertEqual(profile.recent_queries, ['tri', 'graphes'])
+
+    def test_old_events_decay(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from . import profiles
+        now = timezone.now()
+        with self.settings(SEARCHX_BEHAVIOR_HALF_LIFE_DAYS=7):
+            profiles.record_interaction('u1', metadata={'filiere': 'math'}, created_at=now - timedelta(days=7))
+            profiles.record_interaction('u1', metadata={'filiere': 'info'}, created_at=now)
+        weights = profiles.get_profile('u1').filiere_weights
+        self.assertAlmostEqual(weights['math'], 0.5, places=3)
+        self.assertAlmostEqual(weights['info'], 1.0, places=3)
+
+    def test_rebuild_matches_live_profiles(self):
+        from types import SimpleNamespace
+        from django.test import RequestFactory
+        from . import profiles, views
+        from .models import BehaviorProfile
+        # Application (MongoEngine) user: no UserInteraction.user FK, profile keyed on its pk
+        mongo_user = SimpleNamespace(pk='65f0c0ffee', is_authenticated=True)
+        for filiere in ('info', 'math', 'info'):
+            request = RequestFactory().post('/api/interactions/log', data=json.dumps({'metadata': {'filiere': filiere}}),
+                                            content_type='application/json')
+            request.user = mongo_user
+            views.api_log_interaction(request)
+
+        def snapshot():
+            return {
+                p.user_key: (p.event_count, {k: round(w, 3) for k, w in p.filiere_weights.items()})
+                for p in BehaviorProfile.objects.all()
+            }
+        live = snapshot()
+        self.assertEqual(live['65f0c0ffee'], (3, {'info': 2.0, 'math': 1.0}))
+        profiles.rebuild_profiles()
+        self.assertEqual(snapshot(), live)
+
+    def test_recommendations_read_profile_in_one_query(self):
+        from .models import Collection
+        from . import corpus_index
+        self.addCleanup(setattr, corpus_index, '_indexes', None)
+        Collection.objects.create(name='Maths', filiere='math')
+        info = Collection.objects.create(name='Programmation', filiere='info')
+        self.log(metadata={'filiere': 'info'})
+        resp = self.client.get('/api/recommendations', {'alpha': '0.01'})
+        self.assertEqual(resp.json()['results'][0]['id'], info.id)
+
+
+class IngestionTests(TestCase):
+    def event(self, **extra):
+        return dict({'event_type': 'click', 'user_key': '', 'metadata': {'filiere': 'info'}}, **extra)
+
+    def test_buffer_flushes_in_one_batch_and_counts_drops(self):
+        from .ingestion import InteractionBuffer
+        from .models import UserInteraction
+        buf = InteractionBuffer(max_size=3, batch_size=10, flush_interval=1)
+        buf._ensure_worker = lambda: None  # drive the consumer from the test thread
+        self.assertTrue(all(buf.submit(self.event(query=str(i))) for i in range(3)))
+        self.assertFalse(buf.submit(self.event()))
+        # one bulk INSERT + one profile read/write, wrapped in (nested) savepoints
+        with self.assertNumQueries(7):
+            buf.flush()
+        self.assertEqual(UserInteraction.objects.count(), 3)
+        self.assertEqual(buf.stats(), {'enqueued': 3, 'flushed': 3, 'dropped': 1, 'failed': 0, 'batches': 1, 'pending': 0})
+
+    def test_rows_keep_the_time_the_event_was_received(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from .ingestion import InteractionBuffer
+        from .models import UserInteraction
+        buf = InteractionBuffer(batch_size=10)
+        buf._ensure_worker = lambda: None
+        received = timezone.now() - timedelta(minutes=5)
+        buf.submit(self.event(created_at=received))
+        buf.flush()
+        self.assertEqual(UserInteraction.objects.get().created_at, received)
+
+    def test_endpoint_returns_202_and_503_when_full(self):
+        from . import ingestion
+        from .ingestion import InteractionBuffer
+        buf = InteractionBuffer(max_size=1)
+        buf._ensure_worker = lambda: None
+        with patch.object(ingestion, 'buffer', buf):
+            first = self.client.post('/api/interactions/log', data='{}', content_type='application/json')
+            second = self.client.post('/api/interactions/log', data='{}', content_type='application/json')
+            stats = self.client.get('/api/interactions/stats/').json()
+        self.assertEqual(first.status_code, 202)
+        self.assertEqual(second.status_code, 503)
+        self.assertEqual((stats['pending'], stats['dropped']), (1, 1))
@@ -8,4 +8,41 @@ def test_compute_similarity(self):
         text2 = "Le machine learning est une branche de l'IA."
         similarity = ai_utils.compute_similarity(text1, text2)
         self.assertGreaterEqual(similarity, 0)
-        self.assertLessEqual(similarity, 1)
\ No newline at end of file
+        self.assertLessEqual(similarity, 1)
+
+class ModelRegistryTests(TestCase):
+    def test_loads_once_and_evicts_lru(self):
+        from .model_registry import ModelRegistry
+        registry = ModelRegistry(max_loaded=2, idle_timeout=0, memory_budget_mb=0)
+        calls = []
+        loader = lambda name: (lambda: calls.append(name) or name.upper())
+        self.assertEqual(registry.get(('a',), loader('a')), 'A')
+        self.assertEqual(registry.get(('a',), loader('a')), 'A')
+        registry.get(('b',), loader('b'))
+        registry.get(('a',), loader('a'))  # 'b' becomes least recently used
+        registry.get(('c',), loader('c'))
+        self.assertEqual(calls, ['a', 'b', 'c'])
+        registry.get(('b',), loader('b'))
+        self.assertEqual(calls, ['a', 'b', 'c', 'b'])
+        self.assertEqual(registry.evictions, 2)
+
+    def test_concurrent_requests_share_one_load(self):
+        import threading
+        import time
+        from .model_registry import ModelRegistry
+        registry = ModelRegistry(max_loaded=0, idle_timeout=0, memory_budget_mb=0)
+        calls = []
+
+        def slow_loader():
+            calls.append(1)
+            time.sleep(0.05)
+            return object()
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get(('m',), slow_loader))) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(set(map(id, results))), 1)
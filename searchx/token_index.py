@@ -0,0 +1,168 @@
+"""In-process inverted index over Concept tokens.
+
+Postings map ``token -> {concept_id: term frequency}`` and per-document
+lengths are kept alongside, so overlap, Jaccard and BM25 scores only visit
+the concepts that share at least one token with the query. Tokenization is
+the same ``lower().split()`` the search endpoints always used.
+
+The index is updated by the Concept signals of this process; a cheap
+fingerprint (count + max ``updated_at``) is checked before queries so that
+writes made by other workers are folded in as well.
+"""
+import heapq
+import math
+import threading
+from collections import Counter
+
+from django.db.models import Count, Max
+
+
+def tokenize(text):
+    return (text or "").lower().split()
+
+
+class TokenIndex:
+    def __init__(self, fields):
+        self.fields = fields
+        self._lock = threading.RLock()
+        self._postings = {}
+        self._doc_tokens = {}
+        self._doc_len = {}
+        self._total_len = 0
+        self._fingerprint = None
+
+    def text(self, concept):
+        return " ".join(str(getattr(concept, f) or "") for f in self.fields)
+
+    def __len__(self):
+        return len(self._doc_len)
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+    def add(self, concept):
+        tf = Counter(tokenize(self.text(concept)))
+        with self._lock:
+            self._discard(concept.id)
+            for token, n in tf.items():
+                self._postings.setdefault(token, {})[concept.id] = n
+            self._doc_tokens[concept.id] = frozenset(tf)
+            self._doc_len[concept.id] = sum(tf.values())
+            self._total_len += self._doc_len[concept.id]
+
+    def remove(self, concept_id):
+        with self._lock:
+            self._discard(concept_id)
+
+    def _discard(self, concept_id):
+        tokens = self._doc_tokens.pop(concept_id, None)
+        if tokens is None:
+            return
+        for token in tokens:
+            posting = self._postings.get(token)
+            if posting is not None:
+                posting.pop(concept_id, None)
+                if not posting:
+                    del self._postings[token]
+        self._total_len -= self._doc_len.pop(concept_id, 0)
+
+    def _queryset(self):
+        from .models import Concept
+        return Concept.objects.only("id", "updated_at", *self.fields)
+
+    def refresh(self):
+        """Fold in rows changed since the last check (cheap when nothing changed)."""
+        qs = self._queryset()
+        agg = qs.aggregate(n=Count("id"), last=Max("updated_at"))
+        fingerprint = (agg["n"], agg["last"])
+        with self._lock:
+            previous = self._fingerprint
+            if previous == fingerprint:
+                return
+            changed = qs.filter(updated_at__gte=previous[1]) if previous and previous[1] else qs
+            for concept in changed:
+                self.add(concept)
+            if len(self._doc_len) != fingerprint[0]:
+                alive = set(qs.values_list("id", flat=True))
+                for concept_id in [cid for cid in self._doc_len if cid not in alive]:
+                    self._discard(concept_id)
+            self._fingerprint = fingerprint
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+    def tokens(self, concept_id):
+        return set(self._doc_tokens.get(concept_id, ()))
+
+    def _overlaps(self, query_tokens):
+        counts = Counter()
+        for token in query_tokens:
+            for concept_id in self._postings.get(token, ()):
+                counts[concept_id] += 1
+        return counts
+
+    @staticmethod
+    def _top(scores, limit):
+        items = scores.items()
+        key = lambda item: (-item[1], item[0])
+        if limit is None:
+            return sorted(items, key=key)
+        return heapq.nsmallest(limit, items, key=key)
+
+    def overlap(self, query_tokens, limit=None):
+        """``[(concept_id, shared distinct tokens), ...]`` best first."""
+        query_tokens = set(query_tokens)
+        self.refresh()
+        with self._lock:
+            return self._top(self._overlaps(query_tokens), limit)
+
+    def jaccard(self, query_tokens, limit=None):
+        """``[(concept_id, |Q ∩ D| / |Q ∪ D|), ...]`` for concepts sharing a token."""
+        query_tokens = set(query_tokens)
+        self.refresh()
+        with self._lock:
+            scores = {
+                concept_id: inter / ((len(query_tokens) + len(self._doc_tokens[concept_id]) - inter) or 1)
+                for concept_id, inter in self._overlaps(query_tokens).items()
+            }
+            return self._top(scores, limit)
+
+    def bm25(self, query_tokens, limit=None, k1=1.5, b=0.75):
+        query_tokens = set(query_tokens)
+        self.refresh()
+        with self._lock:
+            n_docs = len(self._doc_len)
+            if not n_docs:
+                return []
+            avgdl = (self._total_len / n_docs) or 1.0
+            scores = Counter()
+            for token in query_tokens:
+                posting = self._postings.get(token)
+                if not posting:
+                    continue
+                idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+                for concept_id, tf in posting.items():
+                    norm = k1 * (1 - b + b * self._doc_len[concept_id] / avgdl)
+                    scores[concept_id] += idf * tf * (k1 + 1) / (tf + norm)
+            return self._top(scores, limit)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+# name + description + level (keyword/semantic search) and name + description (similarity)
+FULL_FIELDS = ("name", "description", "level")
+BASE_FIELDS = ("name", "description")
+
+
+def get_index(fields=FULL_FIELDS) -> TokenIndex:
+    with _indexes_lock:
+        index = _indexes.get(fields)
+        if index is None:
+            index = _indexes[fields] = TokenIndex(fields)
+        return index
+
+
+def loaded_indexes():
+    with _indexes_lock:
+        return list(_indexes.values())
@@ -49,4 +49,5 @@
     path("api/recommendations/", views.api_recommendations),
     path("api/interactions/log", views.api_log_interaction, name="api_log_interaction"),
     path("api/interactions/log/", views.api_log_interaction),
+    path("api/interactions/stats/", views.api_interaction_stats, name="api_interaction_stats"),
 ]
@@ -4,13 +4,13 @@
 from django.urls import reverse
 from django.db.models import Q
 from django.utils import timezone
-from collections import Counter
 import json
-import numpy as np
 from django.conf import settings
+from django.contrib.auth import get_user_model
 from web_project import TemplateLayout
 
 from .models import Concept, Collection, UserInteraction
+from . import corpus_index, embedding_store, ingestion, profiles, serializers, token_index
 from .forms import ConceptForm, CollectionForm
 
 def search_page(request):
@@ -193,39 +193,16 @@ def parse_resources(val):
         if concept_ids:
             col.concepts.set(Concept.objects.filter(id__in=concept_ids))
         return JsonResponse({"id": col.id}, status=201)
-    cols = []
-    for col in Collection.objects.all().order_by("name"):
-        cols.append({
-            "id": col.id,
-            "name": col.name,
-            "description": col.description,
-            "filiere": col.filiere,
-            "level": col.level,
-            "concepts": [
-                {"id": c.id, "name": c.name, "level": c.level} for c in col.concepts.all()
-            ],
-            "resources": col.resources,
-        })
+    cols = serializers.serialize_collections(Collection.objects.all().order_by("name"))
     return JsonResponse({"results": cols})
 
 
 def api_collection_detail(request, pk: int):
     try:
-        col = Collection.objects.get(pk=pk)
+        col = serializers.prefetch_concepts(Collection.objects.all()).get(pk=pk)
     except Collection.DoesNotExist:
         raise Http404
-    data = {
-        "id": col.id,
-        "name": col.name,
-        "description": col.description,
-        "filiere": col.filiere,
-        "level": col.level,
-        "concepts": [
-            {"id": c.id, "name": c.name, "level": c.level} for c in col.concepts.all()
-        ],
-        "resources": col.resources,
-    }
-    return JsonResponse(data)
+    return JsonResponse(serializers.serialize_collection(col))
 
 
 def api_search(request):
@@ -261,7 +238,8 @@ def api_search(request):
 
 @csrf_exempt
 def api_search_semantic(request):
-    # Support POST (JSON {text} or {query, filiere}) and GET (?q=)
+    # Support POST (JSON {text} or {query, filiere, scoring}) and GET (?q=&scoring=)
+    # scoring: "overlap" (shared tokens, default) or "bm25"; both served by the inverted token index
     try:
         if request.method == "POST":
             try:
@@ -270,24 +248,22 @@ def api_search_semantic(request):
                 payload = {}
             text = (payload.get("text") or payload.get("query") or "").strip()
             filiere = (payload.get("filiere") or "").strip()
+            scoring = (payload.get("scoring") or "overlap").strip().lower()
         elif request.method == "GET":
             text = (request.GET.get("q") or "").strip()
             filiere = (request.GET.get("filiere") or "").strip()
+            scoring = (request.GET.get("scoring") or "overlap").strip().lower()
         else:
             return JsonResponse({"error": "Method not allowed"}, status=405)
 
         if not text:
             return JsonResponse({"query": text, "filiere": filiere, "concepts": [], "collections": [], "resources": []})
 
-        tokens = set(text.lower().split())
-        scored = []
-        for c in Concept.objects.all():
-            corpus = f"{c.name} {c.description} {c.level}".lower().split()
-            score = len(tokens.intersection(corpus))
-            if score:
-                scored.append((score, c))
-        scored.sort(key=lambda x: -x[0])
-        top = scored[:20]
+        tokens = token_index.tokenize(text)
+        index = token_index.get_index(token_index.FULL_FIELDS)
+        ranked = index.bm25(tokens, limit=20) if scoring == "bm25" else index.overlap(tokens, limit=20)
+        concept_map = Concept.objects.in_bulk([cid for cid, _ in ranked])
+        top = [(round(score, 4), concept_map[cid]) for cid, score in ranked if cid in concept_map]
         # Concepts payload
         concepts_payload = [
             {"id": c.id, "name": c.name, "description": c.description, "level": c.level, "score": s}
@@ -298,12 +274,13 @@ def api_search_semantic(request):
         col_qs = Collection.objects.filter(concepts__id__in=concept_ids).distinct()
         if filiere:
             col_qs = col_qs.filter(filiere__iexact=filiere)
+        col_qs = serializers.prefetch_concepts(col_qs)
         collections_payload = []
         resources_payload = []
         # Simple scoring: number of matched concepts per collection
         matched_set = set(concept_ids)
         for col in col_qs:
-            col_concept_ids = set(col.concepts.values_list("id", flat=True))
+            col_concept_ids = set(serializers.concept_ids(col))
             overlap = len(matched_set.intersection(col_concept_ids))
             collections_payload.append({
                 "id": col.id,
@@ -350,7 +327,8 @@ def api_search_semantic_emb(request):
             payload = {}
         text = (payload.get('query') or payload.get('text') or '').strip()
         top_k = int(payload.get('top_k', 10) or 10)
-        model = (payload.get('model') or 'sentence-transformers/all-MiniLM-L6-v2').strip()
+        # Unknown models fall back to the default: each model gets a full corpus index
+        model = embedding_store.resolve_model((payload.get('model') or '').strip())
     else:
         # For GET requests, redirect to the HTML tester page instead of returning raw JSON
         q = (request.GET.get('q') or '').strip()
@@ -360,20 +338,15 @@ def api_search_semantic_emb(request):
     if not text:
         return JsonResponse({"query": text, "results": []})
 
-    # Try embeddings first; otherwise fall back to token overlap similarity
+    # Try embeddings first (persistent concept index); otherwise fall back to token overlap similarity
     results = []
-    q_vec = ai_utils.hf_get_embedding(text, model_name=model)
-    if not isinstance(q_vec, str):
-        for c in Concept.objects.all():
-            c_text = f"{c.name}. {c.description}".strip()
-            if not c_text:
-                continue
-            c_vec = ai_utils.hf_get_embedding(c_text, model_name=model)
-            if isinstance(c_vec, str):
-                # If a concept embedding fails, skip it (continue with others)
+    hits = embedding_store.get_store(model).search(text, top_k=top_k)
+    if hits is not None:
+        by_id = Concept.objects.in_bulk([cid for cid, _ in hits])
+        for cid, sim in hits:
+            c = by_id.get(cid)
+            if c is None:
                 continue
-            denom = (np.linalg.norm(q_vec) * np.linalg.norm(c_vec)) or 1.0
-            sim = float(np.dot(q_vec, c_vec) / denom)
             results.append({
                 "id": c.id,
                 "name": c.name,
@@ -382,16 +355,12 @@ def api_search_semantic_emb(request):
             })
     else:
         # Fallback: token-based similarity (no embeddings available)
-        tokens = set(text.lower().split())
-        for c in Concept.objects.all():
-            corpus_tokens = set(f"{c.name} {c.description} {c.level}".lower().split())
-            if not corpus_tokens:
+        ranked = token_index.get_index(token_index.FULL_FIELDS).jaccard(token_index.tokenize(text), limit=top_k)
+        concept_map = Concept.objects.in_bulk([cid for cid, _ in ranked])
+        for cid, sim in ranked:
+            c = concept_map.get(cid)
+            if c is None:
                 continue
-            inter = len(tokens.intersection(corpus_tokens))
-            if inter == 0:
-                continue
-            union = len(tokens.union(corpus_tokens)) or 1
-            sim = inter / union
             results.append({
                 "id": c.id,
                 "name": c.name,
@@ -469,32 +438,30 @@ def api_search_similarity(request):
         resource_text = (request.GET.get("resource_text") or "").strip()
     else:
         return JsonResponse({"error": "Method not allowed"}, status=405)
+    index = token_index.get_index(token_index.BASE_FIELDS)
     base_tokens = set()
     if concept_id:
         try:
             c = Concept.objects.get(pk=concept_id)
-            base_tokens = set(f"{c.name} {c.description}".lower().split())
-        except Concept.DoesNotExist:
+            base_tokens = set(token_index.tokenize(index.text(c)))
+        except (Concept.DoesNotExist, ValueError):
             base_tokens = set()
     elif resource_text:
-        base_tokens = set(resource_text.lower().split())
+        base_tokens = set(token_index.tokenize(resource_text))
     else:
         return JsonResponse({"results": []})
-    results = []
-    for other in Concept.objects.all():
-        tokens = set(f"{other.name} {other.description}".lower().split())
-        inter = len(base_tokens.intersection(tokens))
-        union = len(base_tokens.union(tokens)) or 1
-        sim = inter / union
-        if sim > 0:
-            results.append({
-                "id": other.id,
-                "name": other.name,
-                "description": other.description,
-                "similarity": round(sim, 4),
-            })
-    results.sort(key=lambda r: -r["similarity"])
-    return JsonResponse({"results": results[:20]})
+    ranked = index.jaccard(base_tokens, limit=20)
+    concept_map = Concept.objects.in_bulk([cid for cid, _ in ranked])
+    results = [
+        {
+            "id": cid,
+            "name": concept_map[cid].name,
+            "description": concept_map[cid].description,
+            "similarity": round(sim, 4),
+        }
+        for cid, sim in ranked if cid in concept_map
+    ]
+    return JsonResponse({"results": results})
 
 
 # --------------------- Recommendations & Interactions ---------------------
@@ -504,7 +471,9 @@ def api_search_similarity(request):
 @csrf_exempt
 def api_log_interaction(request):
     """POST JSON {event_type, query, content_type, content_id, metadata}
-    Saves a lightweight user interaction for behavior-based recommendations.
+    Queues a lightweight user interaction for behavior-based recommendations.
+    Events are written in batches by the ingestion buffer (see ingestion.py):
+    the endpoint answers 202 right away, or 503 when the buffer is full.
     """
     if request.method != "POST":
         return JsonResponse({"error": "POST required"}, status=400)
@@ -513,15 +482,27 @@ def api_log_interaction(request):
     except Exception:
         payload = {}
     evt = (payload.get("event_type") or "").strip() or "click"
-    ui = UserInteraction.objects.create(
-        user=request.user if getattr(request, 'user', None) and request.user.is_authenticated else None,
-        event_type=evt if evt in dict(UserInteraction.EVENT_CHOICES) else "click",
-        query=payload.get("query", ""),
-        content_type=payload.get("content_type", ""),
-        content_id=str(payload.get("content_id", "")),
-        metadata=payload.get("metadata") or {},
-    )
-    return JsonResponse({"ok": True, "id": ui.id})
+    user = getattr(request, 'user', None)
+    accepted = ingestion.ingest({
+        # Only Django (SQL) users can be stored on the FK; Mongo users still get a profile via user_key
+        "user_id": user.pk if isinstance(user, get_user_model()) else None,
+        "user_key": profiles.user_key(request),
+        "event_type": evt if evt in dict(UserInteraction.EVENT_CHOICES) else "click",
+        "query": payload.get("query", ""),
+        "content_type": payload.get("content_type", ""),
+        "content_id": str(payload.get("content_id", "")),
+        "metadata": payload.get("metadata") or {},
+    })
+    if not accepted:
+        resp = JsonResponse({"ok": False, "error": "busy"}, status=503)
+        resp["Retry-After"] = "1"
+        return resp
+    return JsonResponse({"ok": True, "queued": True}, status=202)
+
+
+def api_interaction_stats(request):
+    """Counters of the interaction ingestion buffer for this worker."""
+    return JsonResponse(ingestion.buffer.stats())
 
 
 @csrf_exempt
@@ -553,50 +534,22 @@ def api_recommendations(request):
     qs = Collection.objects.all()
     if filiere:
         qs = qs.filter(filiere__iexact=filiere)
-    candidates = list(qs)
-
-    # Build user behavior profile from recent interactions
-    user = request.user if getattr(request, 'user', None) and request.user.is_authenticated else None
-    recent = UserInteraction.objects.all()
-    if user:
-        recent = recent.filter(user=user)
-    recent = recent.order_by('-created_at')[:200]
-
-    # Behavior signals
-    filiere_counts = Counter()
-    concept_counts = Counter()
-    queries = []
-    for it in recent:
-        if it.query:
-            queries.append(it.query)
-        # Extract any filiere or concept IDs from metadata if present
-        meta = it.metadata or {}
-        if meta.get('filiere'):
-            filiere_counts[meta['filiere']] += 1
-        if meta.get('concept_ids'):
-            try:
-                for cid in meta['concept_ids']:
-                    concept_counts[str(cid)] += 1
-            except Exception:
-                pass
+    candidates = list(serializers.prefetch_concepts(qs))
+
+    # Behavior signals: precomputed, time-decayed profile (see profiles.py)
+    profile = profiles.get_profile(profiles.user_key(request))
+    filiere_counts = profile.filiere_weights if profile else {}
+    concept_counts = profile.concept_weights if profile else {}
+    queries = profile.recent_queries if profile else []
 
     # Content query: prefer current q; otherwise aggregate recent queries
     if not q and queries:
         q = ' \n '.join(queries[-10:])[:2000]
 
-    # Precompute content vectors via pairwise similarity using existing util
-    def to_text(col: Collection) -> str:
-        concept_names = ', '.join(col.concepts.values_list('name', flat=True))
-        resources_text = '\n'.join([str(r) for r in (col.resources or [])])
-        return f"{col.name}. {col.description}. {col.filiere}. {col.level}. {concept_names}. {resources_text}"
-
+    # Content similarity: one sparse product against the cached collection index
     content_scores = {}
     if q:
-        for col in candidates:
-            content_scores[col.id] = float(ai_utils.compute_similarity(q, to_text(col)) or 0.0)
-    else:
-        for col in candidates:
-            content_scores[col.id] = 0.0
+        content_scores = corpus_index.collection_index().scores(q, 'collection')
 
     # Behavior scoring: boost by user's preferred filiere and concepts
     max_fil = max(filiere_counts.values()) if filiere_counts else 0
@@ -608,7 +561,7 @@ def behavior_score(col: Collection) -> float:
             bf += (filiere_counts.get(col.filiere, 0) / (max_fil or 1)) * 0.6
         # overlap concepts
         if concept_counts:
-            col_cids = [str(cid) for cid in col.concepts.values_list('id', flat=True)]
+            col_cids = [str(cid) for cid in serializers.concept_ids(col)]
             overlap = sum(concept_counts.get(cid, 0) for cid in col_cids)
             bf += (overlap / (max_con or 1)) * 0.4
         return bf
@@ -619,20 +572,12 @@ def behavior_score(col: Collection) -> float:
         cs = content_scores.get(col.id, 0.0)
         bs = behavior_score(col)
         score = alpha * cs + (1 - alpha) * bs
-        results.append({
-            "id": col.id,
-            "name": col.name,
-            "description": col.description,
-            "filiere": col.filiere,
-            "level": col.level,
-            "content_score": round(cs, 4),
-            "behavior_score": round(bs, 4),
-            "score": round(score, 4),
-            "resources": col.resources,
-            "concepts": [
-                {"id": c.id, "name": c.name, "level": c.level} for c in col.concepts.all()
-            ],
-        })
+        results.append(serializers.serialize_collection(
+            col,
+            content_score=round(cs, 4),
+            behavior_score=round(bs, 4),
+            score=round(score, 4),
+        ))
 
     results.sort(key=lambda r: -r["score"])
     return JsonResponse({
@@ -649,13 +594,13 @@ def api_trends(request):
     if filiere:
         qs = qs.filter(filiere__iexact=filiere)
     data = []
-    for col in qs:
+    for col in serializers.annotate_concept_count(qs):
         data.append({
             "collection_id": col.id,
             "collection": col.name,
             "filiere": col.filiere,
             "level": col.level,
-            "concept_count": col.concepts.count(),
+            "concept_count": col.concept_count,
             "resource_count": len(col.resources),
         })
     data.sort(key=lambda x: (-(x["resource_count"]), -(x["concept_count"]), x["collection"]))
@@ -812,33 +757,22 @@ def api_ai_describe(request):
     def synthesize_local_description() -> str:
         # Local, no-key synthesis from existing data
         # 1) collect top similar concepts
-        sims = []
+        index = corpus_index.knowledge_index()
         try:
-            for c in Concept.objects.all():
-                base = f"{c.name} {c.description}".strip()
-                s = float(ai_utils.compute_similarity(name, base) or 0.0)
-                if s > 0:
-                    sims.append((s, c))
+            hits = index.query(name, k=3, kinds={'concept'})
+            concept_map = Concept.objects.in_bulk([oid for _, oid, _ in hits])
+            top = [concept_map[oid] for _, oid, _ in hits if oid in concept_map]
         except Exception:
-            sims = []
-        sims.sort(key=lambda x: -x[0])
-        top = [c for _, c in sims[:3]]
+            top = []
         # 2) build 2-3 sentences using available fields
         parts = []
         if obj_type == 'collection':
             # Try infer filiere/level from closest collection names
             try:
-                col_sims = []
-                for col in Collection.objects.all():
-                    base = f"{col.name} {col.description} {col.filiere} {col.level}".strip()
-                    s = float(ai_utils.compute_similarity(name, base) or 0.0)
-                    if s > 0:
-                        col_sims.append((s, col))
-                col_sims.sort(key=lambda x: -x[0])
-                if col_sims:
-                    best_col = col_sims[0][1]
-                    if best_col.filiere:
-                        parts.append(f"Cette collection s'inscrit dans la filière {best_col.filiere} et vise le niveau {best_col.level or 'débutant'}.")
+                col_hits = index.query(name, k=1, kinds={'collection'})
+                best_col = Collection.objects.filter(pk=col_hits[0][1]).first() if col_hits else None
+                if best_col and best_col.filiere:
+                    parts.append(f"Cette collection s'inscrit dans la filière {best_col.filiere} et vise le niveau {best_col.level or 'débutant'}.")
             except Exception:
                 pass
         # Describe the concept/collection itself
@@ -912,29 +846,16 @@ def api_ai_ask(request):
 
     def synthesize_local_answer(q: str) -> str:
         q_clean = (q or '').strip()
-        # Try TF-IDF similarity for better ranking
+        # Rank concepts and collections with the cached TF-IDF corpus index
         try:
-            from sklearn.feature_extraction.text import TfidfVectorizer
-            from sklearn.metrics.pairwise import cosine_similarity
-            # Build small corpus from Concepts and Collections
-            concept_items = list(Concept.objects.all().only('name', 'description', 'level'))
-            collection_items = list(Collection.objects.all().only('name', 'description', 'filiere', 'level'))
-            docs = []
-            meta = []
-            for c in concept_items:
-                docs.append(f"{c.name or ''}. {c.description or ''}. Niveau: {c.level or ''}")
-                meta.append(('concept', c))
-            for col in collection_items:
-                docs.append(f"{col.name or ''}. {col.description or ''}. Filiere: {col.filiere or ''}. Niveau: {col.level or ''}")
-                meta.append(('collection', col))
-            if not docs:
-                raise RuntimeError('empty-corpus')
-            vectorizer = TfidfVectorizer(max_features=5000, ngram_range=(1,2))
-            X = vectorizer.fit_transform(docs + [q_clean])
-            q_vec = X[-1]
-            sims = cosine_similarity(X[:-1], q_vec)
-            ranked = sorted([(float(sims[i][0]), meta[i]) for i in range(len(meta))], key=lambda x: -x[0])
-            topk = ranked[:5]
+            hits = corpus_index.knowledge_index().query(q_clean, k=5)
+            concept_map = Concept.objects.in_bulk([oid for kind, oid, _ in hits if kind == 'concept'])
+            collection_map = Collection.objects.in_bulk([oid for kind, oid, _ in hits if kind == 'collection'])
+            topk = []
+            for kind, oid, score in hits:
+                obj = (concept_map if kind == 'concept' else collection_map).get(oid)
+                if obj is not None:
+                    topk.append((score, (kind, obj)))
             # Compose concise answer
             lines = [f"Réponse synthétique sur \"{q_clean}\" (mode local):"]
             # Top concept hint
@@ -957,16 +878,9 @@ def synthesize_local_answer(q: str) -> str:
             return "\n".join(lines)
         except Exception:
             # Fallback to simple token overlap if sklearn not available
-            ql = (q or '').lower()
-            tokens = set(ql.split())
-            scored = []
-            for c in Concept.objects.all():
-                corpus = f"{c.name} {c.description} {c.level}".lower().split()
-                score = len(tokens.intersection(corpus))
-                if score:
-                    scored.append((score, c))
-            scored.sort(key=lambda x: -x[0])
-            top = [c for _, c in scored[:5]]
+            ranked = token_index.get_index(token_index.FULL_FIELDS).overlap(token_index.tokenize(q), limit=5)
+            concept_map = Concept.objects.in_bulk([cid for cid, _ in ranked])
+            top = [concept_map[cid] for cid, _ in ranked if cid in concept_map]
             col_qs = Collection.objects.filter(concepts__in=top).distinct()[:5]
             related = ', '.join([c.name for c in top]) if top else ''
             lines = [f"Réponse synthétique sur \"{q_clean}\" (mode local):"]
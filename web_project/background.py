@@ -0,0 +1,66 @@
+"""Tâches en arrière-plan dans le processus web.
+
+Utilisé par les exports PDF (``exports/jobs.py``) et les analyses IA des
+objectifs (``objectif/analysis.py``). Une tâche est un document MongoEngine
+avec les champs ``status``, ``active``, ``created_at``, ``started_at`` et
+``finished_at`` : ``active`` reste vrai tant qu'elle est en file ou en cours,
+ce qui permet un index unique partiel (une seule tâche active par clé).
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from django.conf import settings
+
+
+class JobExecutor:
+    """Pool de threads créé paresseusement dans chaque processus (non hérité au fork).
+
+    La taille est lue dans le réglage ``workers_setting`` à la création du pool.
+    """
+
+    def __init__(self, workers_setting, default_workers, thread_name_prefix):
+        self.workers_setting = workers_setting
+        self.default_workers = default_workers
+        self.thread_name_prefix = thread_name_prefix
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid = None
+
+    def submit(self, fn, *args):
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                workers = getattr(settings, self.workers_setting, self.default_workers)
+                self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix=self.thread_name_prefix)
+                self._pid = os.getpid()
+            return self._pool.submit(fn, *args)
+
+
+def start_job(model, job_id, **updates):
+    """Passe la tâche de ``queued`` à ``running`` ; None si un autre thread l'a déjà prise."""
+    return model.objects(id=job_id, status='queued').modify(
+        new=True, set__status='running', set__started_at=datetime.utcnow(), **updates
+    )
+
+
+def finish_job(model, job_id, status, **fields):
+    """Statut final de la tâche ; elle libère sa place dans l'index des tâches actives."""
+    updates = {f'set__{name}': value for name, value in fields.items()}
+    model.objects(id=job_id).update(
+        set__status=status, set__active=False, set__finished_at=datetime.utcnow(), **updates
+    )
+
+
+def live_job(model, job, timeout):
+    """``job`` s'il est actif depuis moins de ``timeout`` secondes, sinon None.
+
+    Au-delà, le processus qui l'exécutait a été arrêté : la tâche est marquée
+    en échec pour qu'une nouvelle demande puisse la remplacer.
+    """
+    if job is None:
+        return None
+    if job.created_at > datetime.utcnow() - timedelta(seconds=timeout):
+        return job
+    finish_job(model, job.pk, 'failed', error='Délai dépassé')
+    return None